@@ -0,0 +1,358 @@
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+
+from config import fg_in_range
+from analytics.priors_model import (
+    call_prior_alpha,
+    posterior_mean,
+    counts_from_live,
+    derived_pass_conditionals,
+    pressure_prior_alpha,
+    timeout_prior_alpha,
+    fourth_tri_prior,
+)
+from analytics.ep_model import ep_pre, epa_for_row, next_state_from_result
+from analytics.tendencies import TendencySnapshot
+from tracing import span, traced
+
+# Situation fields echoed back as "latest"
+LATEST_COLS = [
+    "play_no", "quarter", "clock_bucket", "hurry_up", "down", "dist_bucket",
+    "field_zone", "goal_to_go", "def_shell", "pressure",
+]
+
+# Columns the dashboard reads; filled in when a caller (e.g. the HTTP service) omits them
+LIVE_DEFAULTS = {
+    "clock_bucket": "OTHER", "dist_bucket": "UNK", "field_zone": "UNK", "goal_to_go": False,
+    "hurry_up": False, "pv_possession": "PV_DEF", "down": 1, "quarter": 1,
+    "def_shell": None, "pressure": None, "call_type": None,
+}
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _pct(x):
+    try:
+        if x is None:
+            return "NA"
+        return f"{100*float(x):.0f}%"
+    except Exception:
+        return "NA"
+
+def map_4th_tri_from_call_type(ct: str) -> str:
+    ct = str(ct)
+    if ct == "PUNT":
+        return "PUNT"
+    if ct == "FIELD_GOAL":
+        return "FIELD_GOAL"
+    return "GO"
+
+def build_result_dict(row: dict) -> dict:
+    return {
+        "first_down": bool(row.get("first_down", False)),
+        "td": bool(row.get("td", False)),
+        "yards_bucket": str(row.get("yards_bucket", "NA")),
+        "turnover": str(row.get("turnover", "NONE") if row.get("turnover") is not None else "NONE"),
+    }
+
+def build_state_pre_dict(row: dict) -> dict:
+    return {
+        "down": int(row.get("down", 1)),
+        "dist_bucket": str(row.get("dist_bucket", "UNK")),
+        "field_zone": str(row.get("field_zone", "UNK")),
+        "clock_bucket": str(row.get("clock_bucket", "OTHER")),
+        "goal_to_go": bool(row.get("goal_to_go", False)),
+    }
+
+def prepare_live(plays) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Normalize one session/game's plays; returns (df_live, df_labeled).
+    """
+    if plays is None:
+        return pd.DataFrame(), pd.DataFrame()
+    df_live = plays.copy() if isinstance(plays, pd.DataFrame) else pd.DataFrame(list(plays))
+    if df_live.empty:
+        return df_live, pd.DataFrame()
+
+    for c, default in LIVE_DEFAULTS.items():
+        if c not in df_live.columns:
+            df_live[c] = default
+    if "play_no" not in df_live.columns:
+        df_live["play_no"] = range(1, len(df_live) + 1)
+
+    # normalize
+    df_live["clock_bucket"] = df_live.get("clock_bucket", "OTHER").fillna("OTHER").astype(str)
+    df_live["dist_bucket"] = df_live.get("dist_bucket", "UNK").fillna("UNK").astype(str)
+    df_live["field_zone"] = df_live.get("field_zone", "UNK").fillna("UNK").astype(str)
+    df_live["goal_to_go"] = df_live.get("goal_to_go", False).fillna(False).astype(bool)
+    df_live["hurry_up"] = df_live.get("hurry_up", False).fillna(False).astype(bool)
+    df_live["pv_possession"] = df_live.get("pv_possession", "PV_DEF").fillna("PV_DEF").astype(str)
+    df_live["down"] = pd.to_numeric(df_live.get("down", 1), errors="coerce").fillna(1).astype(int)
+    df_live["quarter"] = pd.to_numeric(df_live.get("quarter", 1), errors="coerce").fillna(1).astype(int)
+
+    df_labeled = df_live[df_live.get("call_type").notna()].copy() if "call_type" in df_live.columns else pd.DataFrame()
+    return df_live, df_labeled
+
+def compute_previews(df_labeled: pd.DataFrame, latest: Dict[str, Any], league_mix_cfb: float,
+                     prior_strength: float) -> Dict[str, Any]:
+    """
+    3rd->4th and TD->2pt previews. They depend only on the latest labeled play's
+    result and on the labeled counts, which is what analytics/speculate.py relies on.
+    """
+    latest_labeled = df_labeled.tail(1).iloc[0].to_dict() if not df_labeled.empty else None
+
+    # 3rd->4th preview
+    fourth = None
+    if latest_labeled is not None:
+        res = build_result_dict(latest_labeled)
+        st_pre = build_state_pre_dict(latest_labeled)
+
+        preview_state4 = None
+        if int(st_pre["down"]) == 3 and (not res["first_down"]) and (not res["td"]) and res["turnover"] == "NONE":
+            try:
+                preview_state4 = next_state_from_result(st_pre, res)
+            except Exception:
+                preview_state4 = {"down": 4, "dist_bucket": st_pre["dist_bucket"], "field_zone": st_pre["field_zone"], "clock_bucket": st_pre["clock_bucket"], "goal_to_go": st_pre["goal_to_go"]}
+
+        if preview_state4 is not None and int(preview_state4.get("down", 0)) == 4:
+            cond4 = {
+                "pv_possession": latest.get("pv_possession", "PV_DEF"),
+                "quarter": int(latest.get("quarter", 1)),
+                "down": 4,
+                "dist_bucket": str(preview_state4.get("dist_bucket", "UNK")),
+                "field_zone": str(preview_state4.get("field_zone", "UNK")),
+                "clock_bucket": str(preview_state4.get("clock_bucket", "OTHER")),
+                "hurry_up": bool(latest.get("hurry_up", False)),
+                "goal_to_go": bool(preview_state4.get("goal_to_go", False)),
+            }
+            in_range4 = fg_in_range(cond4["field_zone"], league_mix_cfb)
+
+            df_4 = df_labeled[df_labeled["down"] == 4].copy() if (not df_labeled.empty and "down" in df_labeled.columns) else pd.DataFrame()
+            if not df_4.empty:
+                df_4["fourth_tri"] = df_4["call_type"].astype(str).map(map_4th_tri_from_call_type)
+                live_counts_4tri = counts_from_live(df_4, cond4, label_col="fourth_tri")
+            else:
+                live_counts_4tri = {}
+
+            prior_4tri = fourth_tri_prior(
+                dist_bucket=cond4["dist_bucket"],
+                field_zone=cond4["field_zone"],
+                league_mix_cfb=league_mix_cfb,
+                strength=prior_strength,
+                fg_in_range=in_range4
+            )
+            post_4tri = posterior_mean(prior_4tri, live_counts_4tri)
+            fourth = {
+                "4th_dist_bucket": cond4["dist_bucket"],
+                "4th_field_zone": cond4["field_zone"],
+                "fg_in_range": in_range4,
+                "p_GO": post_4tri.get("GO", 0.0),
+                "p_PUNT": post_4tri.get("PUNT", 0.0),
+                "p_FIELD_GOAL": post_4tri.get("FIELD_GOAL", 0.0),
+                "p_NO_GO (derived)": 1.0 - post_4tri.get("GO", 0.0),
+            }
+
+    # TD -> 2pt preview
+    two_pt = None
+    if latest_labeled is not None and bool(latest_labeled.get("td", False)):
+        vc = df_labeled[df_labeled.get("two_pt_decision").notna()]["two_pt_decision"].value_counts().to_dict() if ("two_pt_decision" in df_labeled.columns) else {}
+        prior_2 = {"KICK": 36 * prior_strength, "TWO": 4 * prior_strength}
+        post_2 = posterior_mean(prior_2, vc)
+        two_pt = {"p_KICK": post_2.get("KICK", 0.0), "p_TWO": post_2.get("TWO", 0.0)}
+
+    return {"fourth": fourth, "two_pt": two_pt}
+
+def compute_situation(df_live: pd.DataFrame, df_labeled: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Slider-independent part of the dashboard: the latest play's condition and the
+    live counts each posterior adds to its prior (what sweep_sensitivity needs).
+    """
+    latest = df_live.tail(1).iloc[0].to_dict()
+    latest_labeled = df_labeled.tail(1).iloc[0].to_dict() if not df_labeled.empty else None
+
+    after_first_down = bool(latest_labeled.get("first_down", False)) if latest_labeled is not None else False
+
+    cond = {
+        "pv_possession": latest.get("pv_possession", "PV_DEF"),
+        "quarter": int(latest.get("quarter", 1)),
+        "down": int(latest.get("down", 1)),
+        "dist_bucket": latest.get("dist_bucket", "UNK"),
+        "field_zone": latest.get("field_zone", "UNK"),
+        "clock_bucket": latest.get("clock_bucket", "OTHER"),
+        "hurry_up": bool(latest.get("hurry_up", False)),
+        "goal_to_go": bool(latest.get("goal_to_go", False)),
+    }
+
+    with span("dashboard.counts"):
+        live_counts_call = counts_from_live(df_labeled, cond, label_col="call_type") if not df_labeled.empty else {}
+
+        df_press = df_live[df_live.get("pressure").notna()].copy() if "pressure" in df_live.columns else pd.DataFrame()
+        live_counts_press = counts_from_live(df_press, cond, label_col="pressure") if not df_press.empty else {}
+
+        df_to = df_live[df_live.get("timeout_used").notna()].copy() if "timeout_used" in df_live.columns else pd.DataFrame()
+        if not df_to.empty:
+            df_to["timeout_used_label"] = df_to["timeout_used"].map(lambda x: "YES" if bool(x) else "NO")
+            live_counts_to = counts_from_live(df_to, cond, label_col="timeout_used_label")
+        else:
+            live_counts_to = {}
+
+    return {
+        "latest": {k: latest.get(k) for k in LATEST_COLS},
+        "cond": cond,
+        "after_first_down": after_first_down,
+        "counts": {"call": live_counts_call, "pressure": live_counts_press, "timeout": live_counts_to},
+    }
+
+def compute_epa(df_live: pd.DataFrame, df_labeled: pd.DataFrame, league_mix_cfb: float) -> Dict[str, Any]:
+    """
+    EPA of the last labeled play and the per-play EPA table (moves with the league mix only).
+    """
+    latest_labeled = df_labeled.tail(1).iloc[0].to_dict() if not df_labeled.empty else None
+    with span("ep.table"):
+        epa_last = epa_for_row(latest_labeled, league_mix_cfb=league_mix_cfb) if latest_labeled is not None else None
+        df_ep = df_live.copy()
+        df_ep["epa"] = df_ep.apply(lambda r: epa_for_row(r.to_dict(), league_mix_cfb=league_mix_cfb), axis=1)
+        show = df_ep[df_ep["epa"].notna()]
+        cols = [c for c in ["play_no","down","dist_bucket","field_zone","clock_bucket","call_type","first_down","td","turnover","yards_bucket","epa"] if c in show.columns]
+        epa_table = show[cols].sort_values("play_no").to_dict("records") if not show.empty else []
+    return {"epa_last": epa_last, "epa_table": epa_table}
+
+# -----------------------------
+# Dashboard
+# -----------------------------
+@traced("dashboard.compute")
+def compute_dashboard(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Everything the coaching dashboard shows, as plain Python values (JSON-ready).
+
+    state:
+      plays            this session/game's plays (DataFrame or list of row dicts)
+      league_mix_cfb   CFB weight, 0..1 (default 0.5)
+      prior_strength   pseudo-play multiplier (default 1.0)
+      summaries        include the coach summaries + tendency windows (default True)
+    """
+    league_mix_cfb = float(state.get("league_mix_cfb", 0.5))
+    prior_strength = float(state.get("prior_strength", 1.0))
+    with span("dashboard.prepare_live"):
+        df_live, df_labeled = prepare_live(state.get("plays"))
+    if df_live.empty:
+        raise ValueError("No plays for this session/game yet.")
+
+    latest = df_live.tail(1).iloc[0].to_dict()
+    situation = compute_situation(df_live, df_labeled)
+    cond, counts, after_first_down = situation["cond"], situation["counts"], situation["after_first_down"]
+
+    in_range_now = fg_in_range(cond["field_zone"], league_mix_cfb)
+
+    # Call-type posterior
+    with span("posterior.call"):
+        prior_alpha = call_prior_alpha(
+            down=cond["down"],
+            dist_bucket=cond["dist_bucket"],
+            field_zone=cond["field_zone"],
+            clock_bucket=cond["clock_bucket"],
+            hurry_up=cond["hurry_up"],
+            league_mix_cfb=league_mix_cfb,
+            prior_strength=prior_strength,
+            goal_to_go=cond["goal_to_go"],
+            after_first_down=after_first_down,
+            fg_in_range=in_range_now,
+        )
+        post_call = posterior_mean(prior_alpha, counts["call"])
+        deriv = derived_pass_conditionals(post_call)
+
+    # Pressure posterior
+    with span("posterior.pressure"):
+        prior_press = pressure_prior_alpha(cond["down"], cond["dist_bucket"], strength=prior_strength)
+        post_press = posterior_mean(prior_press, counts["pressure"])
+
+    # Timeout posterior
+    with span("posterior.timeout"):
+        prior_to = timeout_prior_alpha(cond["quarter"], cond["clock_bucket"], cond["hurry_up"], strength=prior_strength)
+        post_to = posterior_mean(prior_to, counts["timeout"])
+
+    with span("ep.current"):
+        ep_now = ep_pre(cond, league_mix_cfb=league_mix_cfb)
+
+    with span("dashboard.previews"):
+        previews = compute_previews(df_labeled, latest, league_mix_cfb, prior_strength)
+    fourth, two_pt = previews["fourth"], previews["two_pt"]
+
+    out = {
+        **situation,
+        "post_call": post_call,
+        "deriv": deriv,
+        "p_press_5p": post_press.get("5+", 0.0),
+        "p_timeout_yes": post_to.get("YES", 0.0),
+        "ep_now": ep_now,
+        "fourth": fourth,
+        "two_pt": two_pt,
+        **compute_epa(df_live, df_labeled, league_mix_cfb),
+    }
+    if state.get("summaries", True):
+        with span("dashboard.summaries"):
+            snap = TendencySnapshot.from_frame(df_labeled)
+            out["summary_offense"] = summarize_offense(snapshot=snap)
+            out["summary_defense"] = summarize_defense(snapshot=snap)
+            out["tendencies"] = snap.window_table()
+    return out
+
+# ============================
+# COACH SUMMARY (4 sentences each side)
+# ============================
+def _snapshot(df_labeled: Optional[pd.DataFrame], snapshot: Optional[TendencySnapshot]) -> TendencySnapshot:
+    return snapshot if snapshot is not None else TendencySnapshot.from_frame(df_labeled)
+
+def summarize_offense(df_labeled: Optional[pd.DataFrame] = None, snapshot: Optional[TendencySnapshot] = None,
+                      last_n: Optional[int] = None) -> str:
+    r = _snapshot(df_labeled, snapshot).rates("PV_OFF", last_n)
+    if r["n"] == 0:
+        return ("PV offense: no labeled offensive plays yet. Tag a few PV_OFF plays to unlock tendencies. "
+                "Once we have them, we’ll show run/pass mix, top call families, and situational breakers. "
+                "For now, the model relies on priors + early-game script assumptions.")
+
+    p_run, p_passfam, p_press5 = r["p_run"], r["p_pass_family"], r["p_press5"]
+
+    breaker = []
+    if p_run > 0.60:
+        breaker.append("break with early-down play-action/shot looks")
+    elif p_passfam > 0.65:
+        breaker.append("break with run/screen to punish light boxes")
+    if p_press5 is not None and p_press5 > 0.30:
+        breaker.append("lean quick game/screens vs pressure")
+    if not breaker:
+        breaker.append("mix in constraint plays to stay unpredictable")
+
+    s1 = f"PV offense is {_pct(p_run)} run / {_pct(p_passfam)} pass-family overall."
+    s2 = f"On 1st down, run is {_pct(r['d1_run'])} with PA {_pct(r['d1_pa'])} and shots {_pct(r['d1_shot'])}."
+    s3 = f"Pressure faced (5+) is {_pct(p_press5)}." if p_press5 is not None else "Pressure faced isn’t stable yet (need more pressure tags)."
+    s4 = f"Tendency-break idea: {', '.join(breaker)}."
+    return " ".join([s1, s2, s3, s4])
+
+def summarize_defense(df_labeled: Optional[pd.DataFrame] = None, snapshot: Optional[TendencySnapshot] = None,
+                      last_n: Optional[int] = None) -> str:
+    r = _snapshot(df_labeled, snapshot).rates("PV_DEF", last_n)
+    if r["n"] == 0:
+        return ("PV defense: no labeled defensive snaps yet. Tag PV_DEF plays to unlock opponent tendencies. "
+                "Once we have them, we’ll show their run/pass/shot rates by down and field zone. "
+                "For now, the model relies on priors + early-game scouting assumptions. "
+                "As tags accumulate, we’ll identify the cleanest breaker windows.")
+
+    opp_run, opp_shot, opp_screen = r["p_run"], r["p_shot"], r["p_screen"]
+    p_two_high, p_press5 = r["p_two_high"], r["p_press5"]
+
+    breaker = []
+    if opp_run > 0.60:
+        breaker.append("load box / force long-yardage")
+    if opp_shot > 0.12:
+        breaker.append("rotate late / protect posts on likely shot downs")
+    if opp_screen > 0.10 and (p_press5 is not None and p_press5 > 0.30):
+        breaker.append("screen-alert when blitzing (peel/replace)")
+    if not breaker:
+        breaker.append("vary shell + simulated pressure to break their read")
+
+    s1 = f"Opponent offense is {_pct(opp_run)} run / {_pct(r['p_pass_family'])} pass-family with shots {_pct(opp_shot)} and screens {_pct(opp_screen)}."
+    s2 = f"On 3rd down, dropback/shot tendency is {_pct(r['d3_dropback_shot'])}."
+    s3 = f"Your tags show two-high {_pct(p_two_high)} and 5+ pressure {_pct(p_press5)}." if (p_two_high is not None and p_press5 is not None) else "Shell/pressure tendencies need more tags to stabilize."
+    s4 = f"Tendency-break idea: {', '.join(breaker)}."
+    return " ".join([s1, s2, s3, s4])
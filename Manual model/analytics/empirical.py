@@ -1,187 +1,281 @@
-import pandas as pd
-from typing import Dict, Tuple, List, Optional
-from config import OUTCOMES, LIVE_BLEND_THRESHOLD, SMOOTH_ALPHA, MIN_MATCHES
-
-TARGET_OUTCOMES = [o for o in OUTCOMES if o != "unknown"]
-
-# -----------------------------
-# Helpers
-# -----------------------------
-def _ensure_cols(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
-    out = df.copy()
-    for c in cols:
-        if c not in out.columns:
-            out[c] = "UNK"
-        out[c] = out[c].fillna("UNK")
-    if "hurry_up" in cols:
-        out["hurry_up"] = out["hurry_up"].fillna(False).astype(bool)
-    return out
-
-def _laplace_probs(counts: Dict[str, int], alpha: float) -> Dict[str, float]:
-    total = 0.0
-    out = {}
-    for o in TARGET_OUTCOMES:
-        total += counts.get(o, 0) + alpha
-    for o in TARGET_OUTCOMES:
-        out[o] = (counts.get(o, 0) + alpha) / total if total > 0 else 1.0 / len(TARGET_OUTCOMES)
-    return out
-
-def _counts_in_slice(df: pd.DataFrame) -> Dict[str, int]:
-    if df is None or df.empty:
-        return {o: 0 for o in TARGET_OUTCOMES}
-    vc = df["outcome"].value_counts()
-    return {o: int(vc.get(o, 0)) for o in TARGET_OUTCOMES}
-
-def _blend_probs(hist_probs: Dict[str, float],
-                 live_probs: Dict[str, float],
-                 live_n: int,
-                 threshold: int) -> Dict[str, float]:
-    # weight increases as we see more live examples
-    w_live = min(1.0, float(live_n) / float(threshold)) if threshold > 0 else 1.0
-    w_hist = 1.0 - w_live
-    return {o: w_hist * hist_probs.get(o, 0.0) + w_live * live_probs.get(o, 0.0) for o in TARGET_OUTCOMES}
-
-def _filter(df: pd.DataFrame, cond: Dict[str, object]) -> pd.DataFrame:
-    out = df
-    for k, v in cond.items():
-        out = out[out[k] == v]
-    return out
-
-# -----------------------------
-# Core: one-condition blended probabilities
-# -----------------------------
-def blended_probs_for_condition(
-    cond: Dict[str, object],
-    df_hist: pd.DataFrame,
-    df_live: pd.DataFrame,
-) -> Tuple[Dict[str, float], Dict[str, object]]:
-    """
-    Compute blended empirical probabilities for a condition dict.
-    Uses backoff from strict->loose, and blends historical + live with threshold.
-    """
-
-    # Labeled only drive empirical outcomes
-    df_hist = df_hist[df_hist["outcome"].notna()].copy() if df_hist is not None and not df_hist.empty else pd.DataFrame()
-    df_live = df_live[df_live["outcome"].notna()].copy() if df_live is not None and not df_live.empty else pd.DataFrame()
-
-    # Backoff levels (strict -> loose)
-    levels = [
-        ["pv_possession", "quarter", "clock_bucket", "hurry_up", "down", "dist_bucket", "field_zone",
-         "opp_personnel", "opp_formation", "def_shell", "pressure"],
-        ["pv_possession", "quarter", "clock_bucket", "hurry_up", "down", "dist_bucket", "field_zone",
-         "opp_personnel", "def_shell", "pressure"],
-        ["pv_possession", "quarter", "clock_bucket", "hurry_up", "down", "dist_bucket", "field_zone",
-         "def_shell", "pressure"],
-        ["pv_possession", "down", "dist_bucket", "field_zone"],
-    ]
-
-    needed = sorted(set(sum(levels, [])) | {"outcome"})
-    df_hist = _ensure_cols(df_hist, needed)
-    df_live = _ensure_cols(df_live, needed)
-
-    # normalize condition values
-    norm = {}
-    for k in needed:
-        if k == "outcome":
-            continue
-        if k == "hurry_up":
-            norm[k] = bool(cond.get(k, False))
-        else:
-            v = cond.get(k, "UNK")
-            norm[k] = "UNK" if v is None else v
-
-    used_level = None
-    hist_n = live_n = 0
-    hist_probs = {o: 1.0 / len(TARGET_OUTCOMES) for o in TARGET_OUTCOMES}
-    live_probs = {o: 1.0 / len(TARGET_OUTCOMES) for o in TARGET_OUTCOMES}
-
-    for i, cols in enumerate(levels):
-        cond_i = {c: norm.get(c, "UNK") for c in cols}
-
-        hist_slice = _filter(df_hist, cond_i) if not df_hist.empty else pd.DataFrame()
-        live_slice = _filter(df_live, cond_i) if not df_live.empty else pd.DataFrame()
-
-        hist_n = len(hist_slice)
-        live_n = len(live_slice)
-
-        min_req = MIN_MATCHES[min(i, len(MIN_MATCHES) - 1)]
-        if (hist_n + live_n) >= min_req:
-            used_level = i
-            hist_probs = _laplace_probs(_counts_in_slice(hist_slice), SMOOTH_ALPHA)
-            live_probs = _laplace_probs(_counts_in_slice(live_slice), SMOOTH_ALPHA)
-            break
-
-    # if none hit, fall back to global priors
-    if used_level is None:
-        used_level = len(levels)
-        hist_n = len(df_hist)
-        live_n = len(df_live)
-        hist_probs = _laplace_probs(_counts_in_slice(df_hist), SMOOTH_ALPHA)
-        live_probs = _laplace_probs(_counts_in_slice(df_live), SMOOTH_ALPHA)
-
-    blended = _blend_probs(hist_probs, live_probs, live_n, LIVE_BLEND_THRESHOLD)
-
-    debug = {
-        "used_backoff_level": used_level,
-        "hist_matches": hist_n,
-        "live_matches": live_n,
-        "live_blend_threshold": LIVE_BLEND_THRESHOLD,
-    }
-    return blended, debug
-
-# -----------------------------
-# Convenience: current play (row -> condition)
-# -----------------------------
-def blended_probs_for_latest_row(
-    latest_row: pd.Series,
-    df_hist: pd.DataFrame,
-    df_live: pd.DataFrame
-) -> Tuple[Dict[str, float], Dict[str, object]]:
-    cond = latest_row.to_dict()
-    return blended_probs_for_condition(cond, df_hist, df_live)
-
-# -----------------------------
-# Build tables by bucket
-# -----------------------------
-def table_by_clock_bucket(
-    base_cond: Dict[str, object],
-    df_hist: pd.DataFrame,
-    df_live: pd.DataFrame,
-    clock_buckets: List[str]
-) -> pd.DataFrame:
-    """
-    Returns a dataframe with one row per clock_bucket, showing blended probs
-    that update as live labeled outcomes accumulate.
-    """
-    rows = []
-    for cb in clock_buckets:
-        cond = dict(base_cond)
-        cond["clock_bucket"] = cb
-        probs, dbg = blended_probs_for_condition(cond, df_hist, df_live)
-        row = {"clock_bucket": cb, **{f"p_{k}": probs[k] for k in probs},
-               "hist_n": dbg["hist_matches"], "live_n": dbg["live_matches"], "backoff": dbg["used_backoff_level"]}
-        rows.append(row)
-    return pd.DataFrame(rows)
-
-def table_for_current_situation_variants(
-    base_cond: Dict[str, object],
-    variants: List[Dict[str, object]],
-    df_hist: pd.DataFrame,
-    df_live: pd.DataFrame,
-    label_col: str = "label"
-) -> pd.DataFrame:
-    """
-    Build a table for multiple variant conditions (e.g. different zones, distances).
-    Each variant dict can include label_col for display.
-    """
-    rows = []
-    for v in variants:
-        cond = dict(base_cond)
-        cond.update({k: val for k, val in v.items() if k != label_col})
-        probs, dbg = blended_probs_for_condition(cond, df_hist, df_live)
-        label = v.get(label_col, "VAR")
-        row = {label_col: label, **{f"p_{k}": probs[k] for k in probs},
-               "hist_n": dbg["hist_matches"], "live_n": dbg["live_matches"], "backoff": dbg["used_backoff_level"]}
-        rows.append(row)
-    return pd.DataFrame(rows)
-
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple, List, Optional, Sequence, Union
+from config import OUTCOMES, LIVE_BLEND_THRESHOLD, SMOOTH_ALPHA, MIN_MATCHES, BACKOFF_LEVELS
+from historical import load_historical
+
+TARGET_OUTCOMES = [o for o in OUTCOMES if o != "unknown"]
+EMPIRICAL_COLS = sorted(set(sum(BACKOFF_LEVELS, [])) | {"outcome"})
+
+def _trie_layout(levels: List[List[str]]) -> List[List[str]]:
+    """
+    Columns each trie depth adds, loose -> strict (depth d holds BACKOFF_LEVELS[-1 - d]).
+    """
+    for i in range(1, len(levels)):
+        extra = set(levels[i]) - set(levels[i - 1])
+        if extra:
+            raise ValueError(f"BACKOFF_LEVELS[{i}] must be a subset of level {i - 1}; extra columns {sorted(extra)}")
+    seen: List[str] = []
+    groups = []
+    for cols in reversed(levels):
+        groups.append([c for c in cols if c not in seen])
+        seen += groups[-1]
+    return groups
+
+TRIE_GROUPS = _trie_layout(BACKOFF_LEVELS)
+
+def load_hist_for_empirical(
+    leagues: Optional[Sequence[str]] = None,
+    seasons: Optional[Sequence[int]] = None,
+) -> pd.DataFrame:
+    """
+    df_hist for the functions below: labeled plays, backoff columns only.
+    Wrap it in CountTrie.from_frame() once when doing many lookups.
+    """
+    return load_historical(EMPIRICAL_COLS, leagues=leagues, seasons=seasons, labeled_only=True)
+
+# -----------------------------
+# Count trie
+# -----------------------------
+def _factorize(col: Optional[pd.Series], n: int, is_bool: bool) -> Tuple[np.ndarray, Dict[object, int]]:
+    # int64 codes + {value: code}; a missing column or value reads as "UNK" (hurry_up: False)
+    if col is None:
+        return np.full(n, 0, dtype=np.int64), {False if is_bool else "UNK": 0}
+    if is_bool:
+        col = col.fillna(False).astype(bool)
+    cc, uniq = pd.factorize(col)
+    uniq = uniq.tolist()
+    if (cc < 0).any():
+        if "UNK" not in uniq:
+            uniq.append("UNK")
+        cc = np.where(cc < 0, uniq.index("UNK"), cc)
+    return cc.astype(np.int64, copy=False), {v: i for i, v in enumerate(uniq)}
+
+class CountTrie:
+    """
+    Outcome counts for every backoff prefix present in a frame of plays.
+
+    One node per distinct prefix at each backoff level, loose -> strict; a node's
+    key is its parent's index mixed with the codes of the columns its level adds,
+    kept as a sorted int64 array per depth. Building is one factorize per column
+    and one sort per level; a lookup is one searchsorted per level.
+    """
+
+    def __init__(self, n_rows: int, root: np.ndarray, codes: Dict[str, Dict[object, int]], depths: List[dict]):
+        self.n_rows = n_rows
+        self.root = root  # outcome counts over all rows (the global fallback)
+        self.codes = codes  # column -> {value: code}
+        self.depths = depths  # per trie depth: keys, n, counts
+
+    @classmethod
+    def from_frame(cls, df: Optional[pd.DataFrame]) -> "CountTrie":
+        """
+        Build from labeled plays (rows without an outcome are skipped). Missing
+        situation columns and values read as "UNK", hurry_up as False.
+        """
+        k = len(TARGET_OUTCOMES)
+        if df is None or df.empty:
+            empty = {"keys": np.zeros(0, dtype=np.int64), "n": np.zeros(0, dtype=np.int64),
+                     "counts": np.zeros((0, k), dtype=np.int64)}
+            return cls(0, np.zeros(k, dtype=np.int64), {}, [empty] * len(TRIE_GROUPS))
+
+        labeled = df["outcome"].notna()
+        if not labeled.all():
+            df = df[labeled]
+        n = len(df)
+        oc = pd.Index(TARGET_OUTCOMES).get_indexer(df["outcome"])
+        sel = oc >= 0
+
+        codes: Dict[str, Dict[object, int]] = {}
+        depths = []
+        pos = np.zeros(n, dtype=np.int64)
+        n_nodes = 1
+        for group in TRIE_GROUPS:
+            key = pos
+            span = n_nodes
+            for c in group:
+                # one column's codes alive at a time
+                cc, codes[c] = _factorize(df[c] if c in df.columns else None, n, c == "hurry_up")
+                card = max(len(codes[c]), 1)
+                span *= card
+                if span >= 2 ** 62:
+                    raise ValueError(f"Too many distinct backoff values to key trie level {group}")
+                key = key * card + cc
+            keys, pos = np.unique(key, return_inverse=True)
+            pos = pos.reshape(-1)
+            n_nodes = len(keys)
+            counts = np.bincount(pos[sel] * k + oc[sel], minlength=n_nodes * k).reshape(n_nodes, k)
+            depths.append({"keys": keys, "n": np.bincount(pos, minlength=n_nodes), "counts": counts})
+        return cls(n, np.bincount(oc[sel], minlength=k), codes, depths)
+
+    def path(self, cond: Dict[str, object]) -> List[Tuple[int, np.ndarray]]:
+        """
+        (matches, outcome counts) per backoff level, strict -> loose like BACKOFF_LEVELS.
+        Walks down from the loosest level and stops at the first prefix not present;
+        the levels below it have no matches.
+        """
+        zero = (0, np.zeros(len(TARGET_OUTCOMES), dtype=np.int64))
+        out = [zero] * len(TRIE_GROUPS)
+        node = 0
+        for d, group in enumerate(TRIE_GROUPS):
+            key = node
+            for c in group:
+                code = self.codes.get(c, {}).get(cond.get(c, "UNK"))
+                if code is None:
+                    return out
+                key = key * max(len(self.codes[c]), 1) + code
+            keys = self.depths[d]["keys"]
+            j = int(np.searchsorted(keys, key))
+            if j == len(keys) or keys[j] != key:
+                return out
+            out[len(TRIE_GROUPS) - 1 - d] = (int(self.depths[d]["n"][j]), self.depths[d]["counts"][j])
+            node = j
+        return out
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _laplace_probs(counts: Dict[str, int], alpha: float) -> Dict[str, float]:
+    total = 0.0
+    out = {}
+    for o in TARGET_OUTCOMES:
+        total += counts.get(o, 0) + alpha
+    for o in TARGET_OUTCOMES:
+        out[o] = (counts.get(o, 0) + alpha) / total if total > 0 else 1.0 / len(TARGET_OUTCOMES)
+    return out
+
+def _counts_dict(counts: np.ndarray) -> Dict[str, int]:
+    return dict(zip(TARGET_OUTCOMES, counts.tolist()))
+
+def _blend_probs(hist_probs: Dict[str, float],
+                 live_probs: Dict[str, float],
+                 live_n: int,
+                 threshold: int) -> Dict[str, float]:
+    # weight increases as we see more live examples
+    w_live = min(1.0, float(live_n) / float(threshold)) if threshold > 0 else 1.0
+    w_hist = 1.0 - w_live
+    return {o: w_hist * hist_probs.get(o, 0.0) + w_live * live_probs.get(o, 0.0) for o in TARGET_OUTCOMES}
+
+def _as_trie(df: Union[pd.DataFrame, CountTrie, None]) -> CountTrie:
+    return df if isinstance(df, CountTrie) else CountTrie.from_frame(df)
+
+# -----------------------------
+# Core: one-condition blended probabilities
+# -----------------------------
+def blended_probs_for_condition(
+    cond: Dict[str, object],
+    df_hist: Union[pd.DataFrame, CountTrie],
+    df_live: Union[pd.DataFrame, CountTrie],
+) -> Tuple[Dict[str, float], Dict[str, object]]:
+    """
+    Compute blended empirical probabilities for a condition dict.
+    Uses backoff from strict->loose, and blends historical + live with threshold.
+    Either frame may be passed as a prebuilt CountTrie to skip the build.
+    """
+    hist = _as_trie(df_hist)
+    live = _as_trie(df_live)
+
+    # normalize condition values
+    norm = {}
+    for k in EMPIRICAL_COLS:
+        if k == "outcome":
+            continue
+        if k == "hurry_up":
+            norm[k] = bool(cond.get(k, False))
+        else:
+            v = cond.get(k, "UNK")
+            norm[k] = "UNK" if v is None else v
+
+    hist_path = hist.path(norm)
+    live_path = live.path(norm)
+
+    used_level = None
+    hist_n = live_n = 0
+    hist_probs = {o: 1.0 / len(TARGET_OUTCOMES) for o in TARGET_OUTCOMES}
+    live_probs = {o: 1.0 / len(TARGET_OUTCOMES) for o in TARGET_OUTCOMES}
+
+    for i in range(len(BACKOFF_LEVELS)):
+        (hist_n, hist_c), (live_n, live_c) = hist_path[i], live_path[i]
+        min_req = MIN_MATCHES[min(i, len(MIN_MATCHES) - 1)]
+        if (hist_n + live_n) >= min_req:
+            used_level = i
+            hist_probs = _laplace_probs(_counts_dict(hist_c), SMOOTH_ALPHA)
+            live_probs = _laplace_probs(_counts_dict(live_c), SMOOTH_ALPHA)
+            break
+
+    # if none hit, fall back to global priors
+    if used_level is None:
+        used_level = len(BACKOFF_LEVELS)
+        hist_n = hist.n_rows
+        live_n = live.n_rows
+        hist_probs = _laplace_probs(_counts_dict(hist.root), SMOOTH_ALPHA)
+        live_probs = _laplace_probs(_counts_dict(live.root), SMOOTH_ALPHA)
+
+    blended = _blend_probs(hist_probs, live_probs, live_n, LIVE_BLEND_THRESHOLD)
+
+    debug = {
+        "used_backoff_level": used_level,
+        "hist_matches": hist_n,
+        "live_matches": live_n,
+        "live_blend_threshold": LIVE_BLEND_THRESHOLD,
+    }
+    return blended, debug
+
+# -----------------------------
+# Convenience: current play (row -> condition)
+# -----------------------------
+def blended_probs_for_latest_row(
+    latest_row: pd.Series,
+    df_hist: pd.DataFrame,
+    df_live: pd.DataFrame
+) -> Tuple[Dict[str, float], Dict[str, object]]:
+    cond = latest_row.to_dict()
+    return blended_probs_for_condition(cond, df_hist, df_live)
+
+# -----------------------------
+# Build tables by bucket
+# -----------------------------
+def table_by_clock_bucket(
+    base_cond: Dict[str, object],
+    df_hist: pd.DataFrame,
+    df_live: pd.DataFrame,
+    clock_buckets: List[str]
+) -> pd.DataFrame:
+    """
+    Returns a dataframe with one row per clock_bucket, showing blended probs
+    that update as live labeled outcomes accumulate.
+    """
+    hist, live = _as_trie(df_hist), _as_trie(df_live)  # built once for every bucket
+    rows = []
+    for cb in clock_buckets:
+        cond = dict(base_cond)
+        cond["clock_bucket"] = cb
+        probs, dbg = blended_probs_for_condition(cond, hist, live)
+        row = {"clock_bucket": cb, **{f"p_{k}": probs[k] for k in probs},
+               "hist_n": dbg["hist_matches"], "live_n": dbg["live_matches"], "backoff": dbg["used_backoff_level"]}
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def table_for_current_situation_variants(
+    base_cond: Dict[str, object],
+    variants: List[Dict[str, object]],
+    df_hist: pd.DataFrame,
+    df_live: pd.DataFrame,
+    label_col: str = "label"
+) -> pd.DataFrame:
+    """
+    Build a table for multiple variant conditions (e.g. different zones, distances).
+    Each variant dict can include label_col for display.
+    """
+    hist, live = _as_trie(df_hist), _as_trie(df_live)
+    rows = []
+    for v in variants:
+        cond = dict(base_cond)
+        cond.update({k: val for k, val in v.items() if k != label_col})
+        probs, dbg = blended_probs_for_condition(cond, hist, live)
+        label = v.get(label_col, "VAR")
+        row = {label_col: label, **{f"p_{k}": probs[k] for k in probs},
+               "hist_n": dbg["hist_matches"], "live_n": dbg["live_matches"], "backoff": dbg["used_backoff_level"]}
+        rows.append(row)
+    return pd.DataFrame(rows)
+
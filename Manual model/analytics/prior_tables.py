@@ -0,0 +1,230 @@
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import PRIORS_DIR, PRIORS_POLL_S, CLOCK_BUCKETS, DIST_BUCKETS, FIELD_ZONES
+
+# Prior tables live in versioned JSON files under PRIORS_DIR, one row per key, e.g.
+#   {"down": 3, "dist_bucket": "LONG", "RUN": 6, "PASS_QUICK": 12, ...}
+# and are compiled into dense arrays: one axis per key column plus a last axis over
+# the table's columns. reload() recompiles only the files that changed and swaps in
+# a new PriorSet in one assignment, so a reader that takes current() once sees a
+# single consistent version even while a reload runs.
+OFFENSE_KEYS = ["RUN", "PASS_QUICK", "PASS_DROPBACK", "PLAY_ACTION", "SCREEN", "SHOT", "SACK", "PENALTY"]
+PRESS_KEYS = ["4", "5+"]
+TIMEOUT_KEYS = ["NO", "YES"]
+FOURTH_KEYS = ["GO", "FIELD_GOAL", "PUNT"]
+
+# Labels of each key column, in array-axis order
+AXES = {
+    "down": [1, 2, 3, 4],
+    "quarter": [1, 2, 3, 4],
+    "dist_bucket": DIST_BUCKETS,
+    "field_zone": FIELD_ZONES,
+    "clock_bucket": CLOCK_BUCKETS,
+    "hurry_up": [False, True],
+}
+
+@dataclass(frozen=True)
+class TableSpec:
+    file: str
+    key: Tuple[str, ...]
+    columns: Tuple[str, ...]
+    fill: float  # value of a column a row leaves out (0 for counts, 1 for multipliers)
+
+SPECS = {
+    "CALL_CFB": TableSpec("call_cfb.json", ("down", "dist_bucket"), tuple(OFFENSE_KEYS), 0.0),
+    "CALL_NFL": TableSpec("call_nfl.json", ("down", "dist_bucket"), tuple(OFFENSE_KEYS), 0.0),
+    "ZONE_MULT": TableSpec("zone_mult.json", ("field_zone",), tuple(OFFENSE_KEYS), 1.0),
+    "CLOCK_MULT": TableSpec("clock_mult.json", ("clock_bucket",), tuple(OFFENSE_KEYS), 1.0),
+    "PRESSURE": TableSpec("pressure.json", ("down", "dist_bucket"), tuple(PRESS_KEYS), 0.0),
+    "TIMEOUT": TableSpec("timeout.json", ("quarter", "clock_bucket", "hurry_up"), tuple(TIMEOUT_KEYS), 0.0),
+    "FOURTH_CFB": TableSpec("fourth_cfb.json", ("dist_bucket", "field_zone"), tuple(FOURTH_KEYS), 0.0),
+    "FOURTH_NFL": TableSpec("fourth_nfl.json", ("dist_bucket", "field_zone"), tuple(FOURTH_KEYS), 0.0),
+}
+
+# -----------------------------
+# Compiled tables
+# -----------------------------
+class PriorTable:
+    """
+    values[i_key0, i_key1, ..., column] plus a mask of the keys the file defines.
+    """
+
+    def __init__(self, name: str, spec: TableSpec, version: int, digest: str,
+                 values: np.ndarray, present: np.ndarray):
+        self.name = name
+        self.spec = spec
+        self.version = version
+        self.digest = digest
+        self.values = values
+        self.present = present
+        self.columns = list(spec.columns)
+        self._pos = [{label: i for i, label in enumerate(AXES[a])} for a in spec.key]
+
+    def row(self, *key) -> Optional[np.ndarray]:
+        """
+        Column vector for one key (read-only), or None if the file has no such row.
+        """
+        try:
+            idx = tuple(pos[k] for pos, k in zip(self._pos, key))
+        except (KeyError, TypeError):
+            return None
+        if len(idx) != len(self._pos) or not self.present[idx]:
+            return None
+        return self.values[idx]
+
+    def get(self, key: tuple, default: Optional[Dict[str, float]] = None) -> Optional[Dict[str, float]]:
+        r = self.row(*key)
+        return default if r is None else dict(zip(self.columns, r.tolist()))
+
+def compile_table(name: str, spec: TableSpec, raw: bytes, digest: str) -> PriorTable:
+    """
+    Parse one table file into arrays. Raises ValueError naming the file on any
+    malformed row, unknown label or column.
+    """
+    pos = [{label: i for i, label in enumerate(AXES[a])} for a in spec.key]
+    col = {c: i for i, c in enumerate(spec.columns)}
+    shape = tuple(len(p) for p in pos)
+    values = np.full(shape + (len(col),), float(spec.fill))
+    present = np.zeros(shape, dtype=bool)
+    try:
+        doc = json.loads(raw)
+        if doc.get("table") != name:
+            raise ValueError(f"expected table {name!r}, found {doc.get('table')!r}")
+        version = int(doc.get("version", 0))
+        for n, row in enumerate(doc["rows"]):
+            idx = []
+            for a, p in zip(spec.key, pos):
+                if a not in row or row[a] not in p:
+                    raise ValueError(f"row {n}: {a}={row.get(a)!r} is not one of {AXES[a]}")
+                idx.append(p[row[a]])
+            idx = tuple(idx)
+            if present[idx]:
+                raise ValueError(f"row {n}: duplicate key {[row[a] for a in spec.key]}")
+            present[idx] = True
+            for c, v in row.items():
+                if c in spec.key:
+                    continue
+                if c not in col:
+                    raise ValueError(f"row {n}: unknown column {c!r} (expected {list(spec.columns)})")
+                values[idx + (col[c],)] = float(v)
+    except (KeyError, TypeError, AttributeError, ValueError) as e:
+        raise ValueError(f"{spec.file}: {e}") from e
+    values.setflags(write=False)
+    present.setflags(write=False)
+    return PriorTable(name, spec, version, digest, values, present)
+
+@dataclass(frozen=True)
+class PriorSet:
+    tables: Dict[str, PriorTable]
+    generation: int  # bumped on every swap in this process
+
+    def __getitem__(self, name: str) -> PriorTable:
+        return self.tables[name]
+
+    @property
+    def version(self) -> tuple:
+        """
+        ((table, file version, content digest), ...) -- cache key for anything built from priors.
+        """
+        return tuple((n, t.version, t.digest) for n, t in sorted(self.tables.items()))
+
+# -----------------------------
+# Live set
+# -----------------------------
+_lock = threading.Lock()
+_current: Optional[PriorSet] = None
+_stats: Dict[str, tuple] = {}  # table -> (mtime_ns, size) of the file last read
+_listeners: List[Callable[[List[str]], None]] = []
+
+def current() -> PriorSet:
+    s = _current
+    if s is None:
+        reload()
+        s = _current
+    return s
+
+def version() -> tuple:
+    return current().version
+
+def on_swap(fn: Callable[[List[str]], None]) -> Callable[[List[str]], None]:
+    """
+    Register fn(changed_table_names), called after a reload swaps in new tables.
+    For caches that can't key on version() (module-level singletons).
+    """
+    _listeners.append(fn)
+    return fn
+
+def reload(force: bool = False) -> List[str]:
+    """
+    Re-read tables whose file changed (mtime/size, then content digest), compile them
+    and swap in a new PriorSet; unchanged tables are carried over as-is. Returns the
+    changed table names. A bad file raises ValueError and leaves the live set alone.
+    """
+    global _current
+    with _lock:
+        old = _current
+        changed: Dict[str, PriorTable] = {}
+        stats = {}
+        for name, spec in SPECS.items():
+            path = PRIORS_DIR / spec.file
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                raise RuntimeError(f"Missing prior table {path}")
+            stats[name] = (st.st_mtime_ns, st.st_size)
+            prev = old.tables.get(name) if old is not None else None
+            if prev is not None and not force and _stats.get(name) == stats[name]:
+                continue
+            raw = path.read_bytes()
+            digest = hashlib.sha1(raw).hexdigest()[:12]
+            if prev is not None and prev.digest == digest:
+                continue
+            changed[name] = compile_table(name, spec, raw, digest)
+        _stats.update(stats)
+        if not changed:
+            return []
+        tables = dict(old.tables) if old is not None else {}
+        tables.update(changed)
+        _current = PriorSet(tables, old.generation + 1 if old is not None else 0)
+
+    if old is not None:
+        for fn in list(_listeners):
+            fn(sorted(changed))
+    return sorted(changed)
+
+class PriorWatcher:
+    """
+    Background thread that calls reload() every `interval` seconds. An invalid or
+    half-saved file is kept in last_error and the previous tables stay live until
+    the file is fixed.
+    """
+
+    def __init__(self, interval: float = PRIORS_POLL_S):
+        self.interval = float(interval)
+        self.reloads = 0
+        self.last_changed: List[str] = []
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="prior-watcher")
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                changed = reload()
+            except (OSError, RuntimeError, ValueError) as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                continue
+            self.last_error = None
+            if changed:
+                self.reloads += 1
+                self.last_changed = changed
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,163 @@
+import pandas as pd
+from typing import List, Optional, Sequence
+
+from config import ROLLUP_PATH, ensure_dir
+from storage import SEQ_COL, write_seqs
+from analytics.dashboard import map_4th_tri_from_call_type
+
+# One table row = plays in a game with these situation buckets whose `field` was `value`.
+# Tables from any set of games merge by concatenating and summing n.
+GAME_COLS = ["session_id", "game_id", "opponent", "season"]
+ROLLUP_DIMS = ["pv_possession", "down", "dist_bucket", "field_zone", "clock_bucket"]
+ROLLUP_FIELDS = ["call_type", "pressure", "def_shell", "fourth_decision"]
+# field="plays", value="ALL" counts every tagged play (the denominator for volume)
+PLAYS_FIELD = "plays"
+# fourth_decision values from the call-type taxonomy, folded into config.GO_NO_GO
+_NO_GO_CALLS = {"PUNT": "NO_GO", "FIELD_GOAL": "NO_GO"}
+# SEQ_COL holds the game's latest storage write; a refresh re-aggregates only the
+# games written after the newest one the table has seen
+ROLLUP_COLS = GAME_COLS + ROLLUP_DIMS + ["field", "value", "n", SEQ_COL]
+
+# -----------------------------
+# Build
+# -----------------------------
+def _game_frame(df_events: pd.DataFrame) -> pd.DataFrame:
+    for c in ["session_id", "game_id"]:
+        if c not in df_events.columns:
+            raise ValueError(f"Missing required column: {c}")
+    df = df_events.copy()
+    for c in GAME_COLS + ROLLUP_DIMS + ROLLUP_FIELDS:
+        if c not in df.columns:
+            df[c] = None
+    df["opponent"] = df["opponent"].fillna("UNK").astype(str)
+    df["season"] = pd.to_numeric(df["season"], errors="coerce").fillna(0).astype(int)  # 0 = not tagged
+    df["down"] = pd.to_numeric(df["down"], errors="coerce").fillna(1).astype(int)
+    for c in ["pv_possession", "dist_bucket", "field_zone", "clock_bucket"]:
+        df[c] = df[c].fillna("UNK").astype(str)
+
+    # 4th-down decisions: the tagged decision, else what the labeled call implies, in
+    # the tagged GO/NO_GO vocabulary either way (a punt or field goal is NO_GO)
+    is4 = (df["down"] == 4) & df["call_type"].notna()
+    implied = df.loc[is4, "call_type"].astype(str).map(map_4th_tri_from_call_type)
+    implied = implied.where(implied == "GO", "NO_GO")
+    df["fourth_decision"] = df["fourth_decision"].where(df["fourth_decision"].notna() | ~is4, implied)
+    df["fourth_decision"] = df["fourth_decision"].replace(_NO_GO_CALLS)
+    df[PLAYS_FIELD] = "ALL"
+    if "play_no" in df.columns:
+        df = df.drop_duplicates(subset=["session_id", "game_id", "play_no"], keep="last")
+    return df
+
+def build_rollups(df_events: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-game tendency tables for every game in df_events, in one melt + groupby.
+    """
+    if df_events is None or df_events.empty:
+        return pd.DataFrame(columns=ROLLUP_COLS)
+
+    df = _game_frame(df_events)
+    fields = ROLLUP_FIELDS + [PLAYS_FIELD]
+    long = df[GAME_COLS + ROLLUP_DIMS + fields].melt(
+        id_vars=GAME_COLS + ROLLUP_DIMS, value_vars=fields, var_name="field", value_name="value",
+    )
+    long = long[long["value"].notna()]
+    long["value"] = long["value"].astype(str)
+    out = long.groupby(GAME_COLS + ROLLUP_DIMS + ["field", "value"], sort=False).size().rename("n").reset_index()
+
+    seq = write_seqs(df).groupby([df["session_id"], df["game_id"]]).max().rename(SEQ_COL).reset_index()
+    return out.merge(seq, on=["session_id", "game_id"], how="left")[ROLLUP_COLS]
+
+def merge_rollups(tables: Sequence[pd.DataFrame], keys: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Sum tables over `keys` (default: everything but the game). Cheap: tables are small.
+    """
+    keys = ROLLUP_DIMS + ["field", "value"] if keys is None else keys
+    tables = [t for t in tables if t is not None and not t.empty]
+    if not tables:
+        return pd.DataFrame(columns=keys + ["n"])
+    return pd.concat(tables, ignore_index=True).groupby(keys, sort=False, as_index=False)["n"].sum()
+
+# -----------------------------
+# Maintain (on disk)
+# -----------------------------
+def load_rollups() -> pd.DataFrame:
+    if ROLLUP_PATH.exists():
+        return pd.read_parquet(ROLLUP_PATH)
+    return pd.DataFrame(columns=ROLLUP_COLS)
+
+def _plays_total(rollups: pd.DataFrame) -> int:
+    return int(rollups.loc[rollups["field"] == PLAYS_FIELD, "n"].sum())
+
+def refresh_rollups(df_events: pd.DataFrame) -> pd.DataFrame:
+    """
+    Bring ROLLUP_PATH up to date with the event store. Only games with plays written
+    after the table's newest write are re-aggregated; the store's write stamps say
+    which, so unchanged games are never regrouped or hashed.
+
+    Changes storage didn't stamp (a replaced or trimmed store) show up as a play count
+    that no longer matches, and rebuild the whole table.
+    """
+    old = load_rollups()
+    if df_events is None or df_events.empty:
+        if not old.empty:
+            ROLLUP_PATH.unlink(missing_ok=True)
+        return pd.DataFrame(columns=ROLLUP_COLS)
+
+    seq = write_seqs(df_events)
+    # tables from before fourth_decision was folded to GO/NO_GO are rebuilt once
+    old_vocab = not old.empty and ((old["field"] == "fourth_decision") & old["value"].isin(list(_NO_GO_CALLS))).any()
+    if old.empty or SEQ_COL not in old.columns or old_vocab or int(seq.max()) < int(old[SEQ_COL].max()):
+        out = build_rollups(df_events)
+    else:
+        changed = (seq > int(old[SEQ_COL].max())).to_numpy()
+        if not changed.any() and _plays_total(old) == len(df_events):
+            return old
+        stale = pd.MultiIndex.from_frame(df_events.loc[changed, ["session_id", "game_id"]].drop_duplicates())
+        # cheap single-column prefilter, then the exact (session, game) match on what's left
+        cand = df_events[df_events["game_id"].isin(stale.get_level_values("game_id"))]
+        rows = cand[cand.set_index(["session_id", "game_id"]).index.isin(stale)]
+        keep = ~old.set_index(["session_id", "game_id"]).index.isin(stale)
+        parts = [p for p in (old[keep], build_rollups(rows)) if not p.empty]
+        out = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=ROLLUP_COLS)
+        if _plays_total(out) != len(df_events):
+            out = build_rollups(df_events)
+    out.to_parquet(ensure_dir(ROLLUP_PATH), index=False)
+    return out
+
+# -----------------------------
+# Reports
+# -----------------------------
+def tendency_report(
+    rollups: pd.DataFrame,
+    pv_possession: str = "PV_DEF",
+    field: str = "call_type",
+    by: Sequence[str] = ("down",),
+    opponent: Optional[str] = None,
+    season: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Merged shares of `field` per `by` bucket across every matching game, e.g. an
+    opponent's call mix by down for a season (PV_DEF = their offense vs. us).
+    Columns: *by, value, n, share, games.
+    """
+    by = list(by)
+    unknown = sorted(set(by) - set(ROLLUP_DIMS))
+    if unknown:
+        raise ValueError(f"Unknown rollup dimension(s) {unknown}; expected any of {ROLLUP_DIMS}")
+
+    t = rollups[(rollups["pv_possession"] == pv_possession) & (rollups["field"] == field)]
+    if opponent is not None:
+        t = t[t["opponent"] == opponent]
+    if season is not None:
+        t = t[t["season"] == int(season)]
+    if t.empty:
+        return pd.DataFrame(columns=by + ["value", "n", "share", "games"])
+
+    # a constant key stands in for "no grouping" so both cases share one path
+    t = t.assign(_all=0)
+    keys = by or ["_all"]
+    out = merge_rollups([t], keys=keys + ["value"])
+    out["share"] = out["n"] / out.groupby(keys)["n"].transform("sum")
+    games = t.drop_duplicates(["session_id", "game_id"] + keys).groupby(keys).size().rename("games")
+    out = out.merge(games.reset_index(), on=keys, how="left")
+    out = out.sort_values(keys + ["n"], ascending=[True] * len(keys) + [False])
+    return out.drop(columns=["_all"], errors="ignore").reset_index(drop=True)
@@ -0,0 +1,219 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Sequence
+
+from config import CALL_TYPES, fg_in_range
+from analytics.priors_model import (
+    call_prior_alpha,
+    pressure_prior_alpha,
+    timeout_prior_alpha,
+    fourth_tri_prior,
+    derived_pass_conditionals,
+)
+from analytics.ep_model import ep_pre
+
+# Same ranges/steps as the dashboard sliders
+MIX_GRID = np.round(np.linspace(0.0, 1.0, 21), 2)
+STRENGTH_GRID = np.round(np.linspace(0.2, 4.0, 39), 1)
+
+# Below this many grid points the process pool costs more than it saves
+PARALLEL_MIN_POINTS = 1_000_000
+
+PASS_KEYS = ["PASS_QUICK", "PASS_DROPBACK", "PLAY_ACTION", "SCREEN", "SHOT"]
+PRESS_KEYS = ["4", "5+"]
+TIMEOUT_KEYS = ["NO", "YES"]
+FOURTH_KEYS = ["GO", "FIELD_GOAL", "PUNT"]
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _vec(d: Dict[str, float], keys: Sequence[str]) -> np.ndarray:
+    return np.array([float(d.get(k, 0.0)) for k in keys], dtype=float)
+
+def _posterior_grid(alpha: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Vectorized posterior_mean over the leading grid axes of alpha (..., K).
+    """
+    num = alpha + counts
+    denom = num.sum(axis=-1, keepdims=True)
+    uniform = np.full_like(num, 1.0 / num.shape[-1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denom > 0, num / np.where(denom > 0, denom, 1.0), uniform)
+
+def _situation_endpoints(
+    cond: Dict[str, Any],
+    cond4: Dict[str, Any],
+    after_first_down: bool,
+) -> Dict[str, np.ndarray]:
+    """
+    Every prior here is linear in prior_strength and in league_mix_cfb, so the
+    pure-CFB / pure-NFL tables at strength 1 are enough to rebuild any slider value.
+    FG range is the only non-linear piece and is masked per mix afterwards.
+    """
+    call_kw = dict(
+        down=int(cond["down"]),
+        dist_bucket=str(cond["dist_bucket"]),
+        field_zone=str(cond["field_zone"]),
+        clock_bucket=str(cond["clock_bucket"]),
+        hurry_up=bool(cond["hurry_up"]),
+        prior_strength=1.0,
+        goal_to_go=bool(cond.get("goal_to_go", False)),
+        after_first_down=bool(after_first_down),
+        fg_in_range=True,
+    )
+    four_kw = dict(
+        dist_bucket=str(cond4["dist_bucket"]),
+        field_zone=str(cond4["field_zone"]),
+        strength=1.0,
+        fg_in_range=True,
+    )
+    return {
+        "call_cfb": _vec(call_prior_alpha(league_mix_cfb=1.0, **call_kw), CALL_TYPES),
+        "call_nfl": _vec(call_prior_alpha(league_mix_cfb=0.0, **call_kw), CALL_TYPES),
+        "press": _vec(pressure_prior_alpha(cond["down"], cond["dist_bucket"], strength=1.0), PRESS_KEYS),
+        "timeout": _vec(timeout_prior_alpha(cond["quarter"], cond["clock_bucket"], cond["hurry_up"], strength=1.0), TIMEOUT_KEYS),
+        "four_cfb": _vec(fourth_tri_prior(league_mix_cfb=1.0, **four_kw), FOURTH_KEYS),
+        "four_nfl": _vec(fourth_tri_prior(league_mix_cfb=0.0, **four_kw), FOURTH_KEYS),
+    }
+
+def _sweep_kernel(
+    cond: Dict[str, Any],
+    cond4: Dict[str, Any],
+    ends: Dict[str, np.ndarray],
+    counts: Dict[str, np.ndarray],
+    mixes: np.ndarray,
+    strengths: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate every head on a (len(mixes), len(strengths)) grid in one broadcast.
+    """
+    m = mixes[:, None, None]
+    s = strengths[None, :, None]
+
+    fg_now = np.array([fg_in_range(cond["field_zone"], float(x)) for x in mixes])
+    fg_4 = np.array([fg_in_range(cond4["field_zone"], float(x)) for x in mixes])
+
+    call_alpha = (m * ends["call_cfb"] + (1.0 - m) * ends["call_nfl"]) * s
+    call_alpha[~fg_now, :, CALL_TYPES.index("FIELD_GOAL")] = 0.0
+    post_call = _posterior_grid(call_alpha, counts["call"])
+
+    press_alpha = np.broadcast_to(ends["press"] * s, (len(mixes), len(strengths), len(PRESS_KEYS)))
+    post_press = _posterior_grid(press_alpha, counts["pressure"])
+
+    to_alpha = np.broadcast_to(ends["timeout"] * s, (len(mixes), len(strengths), len(TIMEOUT_KEYS)))
+    post_to = _posterior_grid(to_alpha, counts["timeout"])
+
+    four_alpha = (m * ends["four_cfb"] + (1.0 - m) * ends["four_nfl"]) * s
+    four_alpha[~fg_4, :, FOURTH_KEYS.index("FIELD_GOAL")] = 0.0
+    post_four = _posterior_grid(four_alpha, counts["fourth"])
+
+    # EP only moves with the league mix
+    ep = np.array([ep_pre(cond, league_mix_cfb=float(x)) for x in mixes])
+
+    out = {f"p_{k}": post_call[..., i] for i, k in enumerate(CALL_TYPES)}
+    out["p_run"] = post_call[..., CALL_TYPES.index("RUN")]
+    out["p_pass"] = post_call[..., [CALL_TYPES.index(k) for k in PASS_KEYS]].sum(axis=-1)
+    out["p_press_5p"] = post_press[..., PRESS_KEYS.index("5+")]
+    out["p_timeout_yes"] = post_to[..., TIMEOUT_KEYS.index("YES")]
+    for i, k in enumerate(FOURTH_KEYS):
+        out[f"p_4th_{k}"] = post_four[..., i]
+    out["ep"] = np.broadcast_to(ep[:, None], (len(mixes), len(strengths)))
+    return out
+
+# -----------------------------
+# Sensitivity table
+# -----------------------------
+@dataclass
+class SensitivityTable:
+    mixes: np.ndarray
+    strengths: np.ndarray
+    values: Dict[str, np.ndarray]  # column -> (len(mixes), len(strengths))
+
+    def _index(self, league_mix_cfb: float, prior_strength: float):
+        i = int(np.abs(self.mixes - float(league_mix_cfb)).argmin())
+        j = int(np.abs(self.strengths - float(prior_strength)).argmin())
+        return i, j
+
+    def lookup(self, league_mix_cfb: float, prior_strength: float) -> Dict[str, float]:
+        """
+        Values at the nearest grid point, found by an argmin over each (small) grid
+        axis; no priors are recomputed, so it is cheap enough for every slider move.
+        """
+        i, j = self._index(league_mix_cfb, prior_strength)
+        return {k: float(v[i, j]) for k, v in self.values.items()}
+
+    def posteriors(self, league_mix_cfb: float, prior_strength: float) -> Dict[str, Any]:
+        """
+        The dashboard's slider-dependent metrics at the nearest grid point, keyed like
+        compute_dashboard (post_call, deriv, p_press_5p, p_timeout_yes, ep_now).
+        """
+        v = self.lookup(league_mix_cfb, prior_strength)
+        post_call = {k: v[f"p_{k}"] for k in CALL_TYPES}
+        return {
+            "post_call": post_call,
+            "deriv": derived_pass_conditionals(post_call),
+            "p_press_5p": v["p_press_5p"],
+            "p_timeout_yes": v["p_timeout_yes"],
+            "ep_now": v["ep"],
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        mm, ss = np.meshgrid(self.mixes, self.strengths, indexing="ij")
+        cols = {"league_mix_cfb": mm.ravel(), "prior_strength": ss.ravel()}
+        cols.update({k: np.asarray(v).ravel() for k, v in self.values.items()})
+        return pd.DataFrame(cols)
+
+    def pivot(self, column: str) -> pd.DataFrame:
+        return pd.DataFrame(self.values[column], index=self.mixes, columns=self.strengths)
+
+def sweep_sensitivity(
+    cond: Dict[str, Any],
+    counts: Optional[Dict[str, Dict[str, int]]] = None,
+    after_first_down: bool = False,
+    cond4: Optional[Dict[str, Any]] = None,
+    mixes: Optional[Sequence[float]] = None,
+    strengths: Optional[Sequence[float]] = None,
+    max_workers: Optional[int] = None,
+) -> SensitivityTable:
+    """
+    Evaluate call-type, pressure, timeout, 4th-down and EP outputs for one situation
+    across a grid of (league_mix_cfb, prior_strength).
+
+    counts holds the live counts per head: "call", "pressure", "timeout", "fourth"
+    (same dicts the dashboard feeds into posterior_mean). They don't depend on the
+    sliders, so they are computed once by the caller.
+    cond4 is the state used for the 4th-down head (defaults to cond).
+    Large grids are split by league mix across a process pool.
+    """
+    counts = counts or {}
+    cond4 = cond4 or cond
+    mixes = MIX_GRID if mixes is None else np.asarray(mixes, dtype=float)
+    strengths = STRENGTH_GRID if strengths is None else np.asarray(strengths, dtype=float)
+
+    ends = _situation_endpoints(cond, cond4, after_first_down)
+    cvec = {
+        "call": _vec(counts.get("call", {}), CALL_TYPES),
+        "pressure": _vec(counts.get("pressure", {}), PRESS_KEYS),
+        "timeout": _vec(counts.get("timeout", {}), TIMEOUT_KEYS),
+        "fourth": _vec(counts.get("fourth", {}), FOURTH_KEYS),
+    }
+
+    n_points = len(mixes) * len(strengths)
+    if n_points < PARALLEL_MIN_POINTS or max_workers == 1 or len(mixes) < 2:
+        values = _sweep_kernel(cond, cond4, ends, cvec, mixes, strengths)
+        return SensitivityTable(mixes=mixes, strengths=strengths, values=values)
+
+    n_chunks = min(len(mixes), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=n_chunks) as ex:
+        chunks = np.array_split(mixes, n_chunks)
+        parts = list(ex.map(
+            _sweep_kernel,
+            [cond] * n_chunks, [cond4] * n_chunks, [ends] * n_chunks, [cvec] * n_chunks,
+            chunks, [strengths] * n_chunks,
+        ))
+
+    values = {k: np.concatenate([np.asarray(p[k]) for p in parts], axis=0) for k in parts[0]}
+    return SensitivityTable(mixes=mixes, strengths=strengths, values=values)
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence
+
+from config import SIMILARITY_WEIGHTS, SIMILARITY_TOP_K
+from historical import load_historical
+from storage import outcome_labels
+from model.features import ENCODER, FEATURE_COLS, BOOL_COLS
+
+# What a comparable play shows besides its situation (whichever the source has)
+ID_COLS = ["league", "season", "session_id", "game_id", "play_no"]
+RESULT_COLS = ["outcome", "call_type", "yards_bucket", "first_down", "td", "turnover"]
+SIMILARITY_COLS = FEATURE_COLS + ID_COLS + RESULT_COLS
+
+def _weights() -> np.ndarray:
+    # per-column mismatch cost in ENCODER.columns order
+    bad = sorted(set(SIMILARITY_WEIGHTS) - set(FEATURE_COLS))
+    if bad:
+        raise ValueError(f"SIMILARITY_WEIGHTS has unknown columns {bad}; expected some of {FEATURE_COLS}")
+    w = np.array([int(SIMILARITY_WEIGHTS.get(c, 0)) for c in ENCODER.columns])
+    if (w < 0).any() or w.sum() >= 2 ** 16:
+        raise ValueError("SIMILARITY_WEIGHTS must be non-negative integers summing below 65536")
+    return w.astype(np.uint16)
+
+WEIGHTS = _weights()
+# Code of a missing value per column; a query column left unknown matches anything
+# (hurry_up is the exception: missing reads as False, a real value)
+_UNKNOWN = np.array(ENCODER.codes_row({}), dtype=np.int64)
+_WILDCARD_OK = np.array([c not in BOOL_COLS for c in ENCODER.columns])
+# code -> label for display; the out-of-vocabulary slot reads as "UNK"
+_LABELS = {c: np.array(list(ENCODER.vocab[c]) + ["UNK"], dtype=object) for c in ENCODER.columns}
+
+# -----------------------------
+# Index
+# -----------------------------
+class SimilarityIndex:
+    """
+    Situation codes of labeled past plays, for "comparable scenarios" lookups.
+
+    codes[j] holds column j's vocabulary code for every play as one contiguous uint8
+    array, so a query is one vectorized compare per weighted column (a weighted
+    Hamming distance) and a histogram cut over the small integer distances for the
+    top-k. Rows are oldest -> newest; ties go to the most recent play.
+    """
+
+    def __init__(self, codes: np.ndarray, plays: pd.DataFrame, source: str):
+        self.codes = codes  # (len(FEATURE_COLS), n_rows) uint8
+        self.plays = plays  # ID_COLS / RESULT_COLS present in the source, row-aligned
+        self.source = source
+
+    def __len__(self) -> int:
+        return self.codes.shape[1]
+
+    @classmethod
+    def from_frame(cls, df: Optional[pd.DataFrame], source: str) -> "SimilarityIndex":
+        """
+        Build from plays in the event-store layout; rows without an outcome label
+        (storage.outcome_labels) are skipped.
+        """
+        outcome = outcome_labels(df)
+        if outcome is None:
+            return cls(np.zeros((len(ENCODER.columns), 0), dtype=np.uint8), pd.DataFrame(), source)
+        labeled = outcome.notna()
+        if not labeled.all():
+            df, outcome = df[labeled], outcome[labeled]
+        if "ts" in df.columns:
+            order = df["ts"].reset_index(drop=True).sort_values(kind="stable").index
+            df, outcome = df.iloc[order], outcome.iloc[order]
+        if int(ENCODER.sizes.max()) > 256:
+            raise ValueError("Feature vocabularies must fit uint8 codes for the similarity index")
+        codes = np.ascontiguousarray(ENCODER.codes(df).T, dtype=np.uint8)
+
+        plays = df[[c for c in ID_COLS + RESULT_COLS if c in df.columns]].reset_index(drop=True)
+        plays["outcome"] = outcome.to_numpy()
+        for c in plays.columns:
+            # a few distinct labels per column: categories instead of one object per row
+            if plays[c].dtype == object or pd.api.types.is_string_dtype(plays[c].dtype):
+                plays[c] = plays[c].astype("category")
+        return cls(codes, plays, source)
+
+    def _query_codes(self, cond: Dict[str, object]):
+        q = np.array(ENCODER.codes_row(cond), dtype=np.int64)
+        active = np.flatnonzero((WEIGHTS > 0) & ((q != _UNKNOWN) | ~_WILDCARD_OK))
+        return q, active
+
+    def distances(self, cond: Dict[str, object]) -> np.ndarray:
+        """
+        Weighted mismatch count of every play against cond (uint16, 0 = same situation).
+        """
+        q, active = self._query_codes(cond)
+        dist = np.zeros(len(self), dtype=np.uint16)
+        for j in active:
+            dist += (self.codes[j] != q[j]).view(np.uint8) * WEIGHTS[j]
+        return dist
+
+    def top(self, cond: Dict[str, object], k: int = SIMILARITY_TOP_K) -> np.ndarray:
+        """
+        Row positions of the k nearest plays, nearest first (ties: newest first).
+        """
+        k = min(int(k), len(self))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        dist = self.distances(cond)
+        # smallest distance whose cumulative count reaches k; everything below it is in
+        cut = int(np.searchsorted(np.cumsum(np.bincount(dist)), k))
+        below = np.flatnonzero(dist < cut)
+        tied = np.flatnonzero(dist == cut)[len(below) - k:]
+        idx = np.concatenate([below, tied])
+        return idx[np.lexsort((-idx, dist[idx]))]
+
+    def query(self, cond: Dict[str, object], k: int = SIMILARITY_TOP_K) -> pd.DataFrame:
+        """
+        The k most similar past plays: distance, source, ids, situation, result, and
+        the situation columns each one differs on.
+        """
+        idx = self.top(cond, k)
+        q, active = self._query_codes(cond)
+        sub = self.codes[:, idx]
+        miss = sub[active] != q[active, None]  # (weighted column, result)
+
+        # columns gathered first, one frame built at the end (per-column inserts dominate at k rows)
+        out = {"distance": WEIGHTS[active].astype(np.int64) @ miss, "source": [self.source] * len(idx)}
+        rows = self.plays.iloc[idx]
+        out.update({c: rows[c].to_numpy() for c in ID_COLS if c in rows.columns})
+        out.update({c: _LABELS[c][sub[j]] for j, c in enumerate(ENCODER.columns)})
+        out.update({c: rows[c].to_numpy() for c in RESULT_COLS if c in rows.columns})
+        names = np.array(ENCODER.columns, dtype=object)[active]
+        out["differs_on"] = [", ".join(names[miss[:, i]]) for i in range(len(idx))]
+        return pd.DataFrame(out)
+
+def load_hist_index(
+    leagues: Optional[Sequence[str]] = None,
+    seasons: Optional[Sequence[int]] = None,
+) -> SimilarityIndex:
+    """
+    Index over labeled historical plays (only the columns it shows are read).
+    """
+    return SimilarityIndex.from_frame(
+        load_historical(SIMILARITY_COLS, leagues=leagues, seasons=seasons, labeled_only=True), "hist")
+
+# -----------------------------
+# Queries over several sources
+# -----------------------------
+def comparable_scenarios(
+    cond: Dict[str, object],
+    indexes: List[SimilarityIndex],
+    k: int = SIMILARITY_TOP_K,
+) -> pd.DataFrame:
+    """
+    Top-k comparable plays across indexes (e.g. [live, hist]); on equal distance the
+    earlier index in the list wins.
+    """
+    frames = [ix.query(cond, k) for ix in indexes if len(ix)]
+    if not frames:
+        return pd.DataFrame(columns=["distance", "source"] + FEATURE_COLS + ["outcome", "differs_on"])
+    out = pd.concat(frames, ignore_index=True).sort_values("distance", kind="stable")
+    return out.head(k).reset_index(drop=True)
+
+def outcome_mix(comparables: pd.DataFrame) -> Dict[str, float]:
+    """
+    Share of each outcome among the comparable plays, most common first.
+    """
+    if comparables.empty or "outcome" not in comparables.columns:
+        return {}
+    return {str(k): float(v) for k, v in comparables["outcome"].value_counts(normalize=True).items()}
@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from config import YARDS_BUCKETS, TURNOVER_RESULT, TWO_PT_CHOICE, SPECULATION_CACHE_SIZE
+from analytics.dashboard import build_result_dict, compute_previews, prepare_live
+from analytics.ep_model import epa_for_row, next_state_from_result
+from analytics.prior_tables import version as prior_version
+
+# -----------------------------
+# Result space
+# -----------------------------
+def result_space() -> List[Dict[str, Any]]:
+    """
+    Every result a live play can be labeled with, as far as the previews can tell:
+    yards bucket x first down x (TD | turnover | neither), plus the 2pt call after a TD.
+    """
+    out = []
+    for yb in YARDS_BUCKETS:
+        for fd in (False, True):
+            for to in TURNOVER_RESULT:
+                out.append({"yards_bucket": yb, "first_down": fd, "td": False, "turnover": to, "two_pt_decision": None})
+            for two in TWO_PT_CHOICE:
+                out.append({"yards_bucket": yb, "first_down": fd, "td": True, "turnover": "NONE", "two_pt_decision": two})
+    return out
+
+def result_key(row: Dict[str, Any]) -> Tuple:
+    # read the row the way compute_previews will, so a hit is exactly what it would compute
+    res = build_result_dict(row)
+    two = row.get("two_pt_decision")
+    two = None if two is None or (isinstance(two, float) and two != two) else str(two)
+    return (res["yards_bucket"], res["first_down"], res["td"], res["turnover"], two)
+
+def speculate_previews(plays, league_mix_cfb: float, prior_strength: float) -> Dict[Tuple, Dict[str, Any]]:
+    """
+    Previews for every result the latest (tagged, not yet labeled) play could get.
+    Keys are result_key(); values hold fourth/two_pt plus the play's EPA and next state.
+    """
+    df_live, df_labeled = prepare_live(plays)
+    if df_live.empty:
+        return {}
+    latest = df_live.tail(1).iloc[0].to_dict()
+    if latest.get("call_type") is not None and latest.get("call_type") == latest.get("call_type"):
+        return {}  # already labeled: nothing to speculate on
+
+    out = {}
+    for res in result_space():
+        row = {**latest, **res, "call_type": "UNK"}  # call type doesn't reach the previews
+        hyp = pd.concat([df_labeled, pd.DataFrame([row])], ignore_index=True) if not df_labeled.empty else pd.DataFrame([row])
+        previews = compute_previews(hyp, latest, league_mix_cfb, prior_strength)
+        previews["play_no"] = int(latest["play_no"])
+        previews["epa_last"] = epa_for_row(row, league_mix_cfb=league_mix_cfb)
+        previews["next_state"] = next_state_from_result(
+            {k: latest.get(k) for k in ("down", "dist_bucket", "field_zone", "clock_bucket", "goal_to_go")}, res,
+        )
+        out[result_key(row)] = previews
+    return out
+
+# -----------------------------
+# Background worker
+# -----------------------------
+class Speculator:
+    """
+    Runs speculate_previews() off the request path, one game at a time, as soon as
+    a pre-snap tag is saved. Entries are keyed by the store version they were built
+    from, so labeling the play (the next write) can look them up with the version it
+    saw just before writing; any other write (or a prior table reload) in between
+    makes them unreachable.
+    """
+
+    def __init__(self, size: int = SPECULATION_CACHE_SIZE):
+        self.size = int(size)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[Tuple, Future]" = OrderedDict()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculate")
+
+    def submit(self, version: tuple, session_id: str, game_id: str, plays,
+               league_mix_cfb: float, prior_strength: float) -> None:
+        key = (tuple(version), prior_version(), session_id, game_id, float(league_mix_cfb), float(prior_strength))
+        with self._lock:
+            if key in self._jobs:
+                return
+            self._jobs[key] = self._pool.submit(speculate_previews, plays, league_mix_cfb, prior_strength)
+            while len(self._jobs) > self.size:
+                self._jobs.popitem(last=False)[1].cancel()
+
+    def lookup(self, version: tuple, session_id: str, game_id: str, row: Dict[str, Any],
+               league_mix_cfb: float, prior_strength: float) -> Optional[Dict[str, Any]]:
+        """
+        Previews for `row` labeled on top of store `version`, or None if that wasn't
+        speculated (or the worker hasn't finished it yet).
+        """
+        key = (tuple(version), prior_version(), session_id, game_id, float(league_mix_cfb), float(prior_strength))
+        with self._lock:
+            job = self._jobs.get(key)
+        hit = None
+        if job is not None and job.done() and not job.cancelled() and job.exception() is None:
+            hit = job.result().get(result_key(row))
+            if hit is not None and hit["play_no"] != int(row.get("play_no", -1)):
+                hit = None  # labeled an older play; the speculation was for the latest one
+        with self._lock:
+            if hit is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return hit
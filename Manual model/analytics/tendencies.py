@@ -0,0 +1,147 @@
+import pandas as pd
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import PV_POSSESSION, TENDENCY_WINDOWS
+
+PASS_FAMILY = ["PASS_QUICK", "PASS_DROPBACK", "PLAY_ACTION", "SCREEN", "SHOT"]
+
+# One count cell per (side, down, call_type, pressure tag, shell tag); every
+# summary rate is a sum over cells, so a snapshot is just these counts.
+KEY_COLS = ["pv_possession", "down", "call_type", "pressure", "def_shell"]
+
+def _tag(v) -> Optional[str]:
+    return None if v is None or (isinstance(v, float) and v != v) or v is pd.NA else str(v)
+
+def _norm(k: Tuple) -> Tuple:
+    # pandas hands missing tags back as NaN; keys always carry None
+    return (str(k[0]), int(k[1]), str(k[2]), _tag(k[3]), _tag(k[4]))
+
+def _row_key(row: Dict[str, Any]) -> Tuple:
+    # same defaults as prepare_live, so update() and from_frame() agree
+    down = pd.to_numeric(row.get("down"), errors="coerce")
+    return (
+        _tag(row.get("pv_possession")) or "PV_DEF",
+        1 if pd.isna(down) else int(down),
+        str(row.get("call_type")),
+        _tag(row.get("pressure")),
+        _tag(row.get("def_shell")),
+    )
+
+# -----------------------------
+# Snapshot
+# -----------------------------
+class TendencySnapshot:
+    """
+    Labeled-play counts for one game, built with a single groupby and then kept
+    current with update()/remove() as plays are labeled or edited.
+
+    rates(side) gives every number the coach summaries use; rates(side, last_n)
+    does the same over that side's last N labeled plays without touching the frame.
+    """
+
+    def __init__(self):
+        self.version = None  # store version/token this snapshot reflects (set by owners)
+        self._counts: Counter = Counter()
+        self._plays: Dict[int, Tuple] = {}  # play_no -> key
+
+    @classmethod
+    def from_frame(cls, df_labeled: pd.DataFrame) -> "TendencySnapshot":
+        """
+        Build from a labeled frame (analytics.dashboard.prepare_live) in one groupby.
+        """
+        snap = cls()
+        if df_labeled is None or df_labeled.empty or "call_type" not in df_labeled.columns:
+            return snap
+
+        df = df_labeled[df_labeled["call_type"].notna()]
+        idx = df.index
+        keys = pd.DataFrame({
+            "pv_possession": df["pv_possession"].astype(str) if "pv_possession" in df.columns else pd.Series("PV_DEF", index=idx),
+            "down": pd.to_numeric(df["down"], errors="coerce").fillna(1).astype(int) if "down" in df.columns else pd.Series(1, index=idx),
+            "call_type": df["call_type"].astype(str),
+            "pressure": df["pressure"].map(_tag) if "pressure" in df.columns else pd.Series(None, index=idx, dtype=object),
+            "def_shell": df["def_shell"].map(_tag) if "def_shell" in df.columns else pd.Series(None, index=idx, dtype=object),
+        })
+        if keys.empty:
+            return snap
+
+        counts = keys.groupby(KEY_COLS, dropna=False, sort=False).size()
+        snap._counts = Counter({_norm(k): int(n) for k, n in counts.items()})
+
+        play_nos = df["play_no"].astype(int).tolist() if "play_no" in df.columns else list(range(1, len(df) + 1))
+        snap._plays = {p: _norm(k) for p, k in zip(play_nos, keys.itertuples(index=False, name=None))}
+        return snap
+
+    # --- incremental ---
+    def remove(self, play_no: int) -> None:
+        old = self._plays.pop(int(play_no), None)
+        if old is not None:
+            self._counts[old] -= 1
+            if self._counts[old] <= 0:
+                del self._counts[old]
+
+    def update(self, row: Dict[str, Any]) -> None:
+        """
+        Apply one tagged/labeled play (insert or edit). Unlabeled rows drop out.
+        """
+        play_no = int(row["play_no"])
+        self.remove(play_no)
+        if _tag(row.get("call_type")) is None:
+            return
+        key = _row_key(row)
+        self._plays[play_no] = key
+        self._counts[key] += 1
+
+    # --- reads ---
+    def n_labeled(self, side: Optional[str] = None) -> int:
+        return sum(n for k, n in self._counts.items() if side is None or k[0] == side)
+
+    def _cells(self, side: str, last_n: Optional[int]) -> Counter:
+        if last_n is None:
+            return Counter({k: n for k, n in self._counts.items() if k[0] == side})
+        mine = sorted(p for p, k in self._plays.items() if k[0] == side)[-int(last_n):]
+        return Counter(self._plays[p] for p in mine)
+
+    def rates(self, side: str, last_n: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Shares used by the summaries. None where a rate has no tagged plays behind it.
+        """
+        cells = self._cells(side, last_n)
+        n = sum(cells.values())
+
+        def share(pred_row, pred_total=lambda k: True):
+            tot = sum(c for k, c in cells.items() if pred_total(k))
+            if tot == 0:
+                return None
+            return sum(c for k, c in cells.items() if pred_total(k) and pred_row(k)) / tot
+
+        def call_share(calls, down=None):
+            out = share(lambda k: k[2] in calls, (lambda k: k[1] == down) if down is not None else (lambda k: True))
+            return 0.0 if out is None else out
+
+        return {
+            "n": n,
+            "p_run": call_share({"RUN"}),
+            "p_pass_family": call_share(set(PASS_FAMILY)),
+            "p_shot": call_share({"SHOT"}),
+            "p_screen": call_share({"SCREEN"}),
+            "d1_run": call_share({"RUN"}, down=1),
+            "d1_pa": call_share({"PLAY_ACTION"}, down=1),
+            "d1_shot": call_share({"SHOT"}, down=1),
+            "d3_dropback_shot": call_share({"PASS_DROPBACK", "SHOT"}, down=3),
+            "p_press5": share(lambda k: k[3] == "5+", lambda k: k[3] is not None),
+            "p_two_high": share(lambda k: k[4] == "2", lambda k: k[4] is not None),
+        }
+
+    def window_table(self, windows: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """
+        One row per side x (game, last N) for the README's "last N plays + game-level" view.
+        """
+        windows = TENDENCY_WINDOWS if windows is None else windows
+        rows = []
+        for side in PV_POSSESSION:
+            for w in [None] + list(windows):
+                r = self.rates(side, w)
+                rows.append({"side": side, "window": "game" if w is None else f"last {w}", **r})
+        return rows
@@ -1,629 +1,827 @@
-# =====================================================
-# PATH FIX
-# =====================================================
-import sys
-from pathlib import Path
-ROOT_DIR = Path(__file__).resolve().parent
-if str(ROOT_DIR) not in sys.path:
-    sys.path.insert(0, str(ROOT_DIR))
-
-# =====================================================
-# IMPORTS
-# =====================================================
-import streamlit as st
-import pandas as pd
-import uuid
-import time
-
-from config import (
-    CLOCK_BUCKETS, DIST_BUCKETS, FIELD_ZONES,
-    PERSONNEL, FORMATION, SHELL, PRESSURE,
-    CALL_TYPES, PASS_RESULT, TURNOVER_RESULT, YARDS_BUCKETS,
-    TWO_PT_CHOICE,
-    FG_RANGE_ZONES_CFB, FG_RANGE_ZONES_NFL
-)
-from schemas import TagEvent, now_ts
-from storage import upsert_event, upsert_many, load_events, list_session_game, get_play
-
-from analytics.priors_model import (
-    call_prior_alpha,
-    posterior_mean,
-    counts_from_live,
-    derived_pass_conditionals,
-    pressure_prior_alpha,
-    timeout_prior_alpha,
-    fourth_tri_prior,
-)
-from analytics.ep_model import ep_pre, epa_for_row, next_state_from_result
-
-# =====================================================
-# HELPERS
-# =====================================================
-def _pct(x):
-    try:
-        if x is None:
-            return "NA"
-        return f"{100*float(x):.0f}%"
-    except Exception:
-        return "NA"
-
-def fg_in_range(field_zone: str, league_mix_cfb: float) -> bool:
-    z = str(field_zone)
-    if league_mix_cfb >= 0.6:
-        return z in FG_RANGE_ZONES_CFB
-    if league_mix_cfb <= 0.4:
-        return z in FG_RANGE_ZONES_NFL
-    return z in FG_RANGE_ZONES_CFB  # conservative in the middle
-
-def make_export_df(df_sg: pd.DataFrame, session_id: str, game_id: str) -> pd.DataFrame:
-    if df_sg is None or df_sg.empty:
-        return pd.DataFrame()
-
-    out = df_sg.copy()
-    if "session_id" not in out.columns:
-        out["session_id"] = session_id
-    if "game_id" not in out.columns:
-        out["game_id"] = game_id
-
-    show_cols = [c for c in [
-        "session_id","game_id",
-        "play_no","quarter","clock_bucket","hurry_up","down","dist_bucket","field_zone","goal_to_go",
-        "pv_possession","def_shell","pressure",
-        "call_type","first_down","td","yards_bucket","pass_result","turnover","timeout_used",
-        "fourth_decision","two_pt_decision"
-    ] if c in out.columns]
-    return out[show_cols]
-
-def map_4th_tri_from_call_type(ct: str) -> str:
-    ct = str(ct)
-    if ct == "PUNT":
-        return "PUNT"
-    if ct == "FIELD_GOAL":
-        return "FIELD_GOAL"
-    return "GO"
-
-def build_result_dict(row: dict) -> dict:
-    return {
-        "first_down": bool(row.get("first_down", False)),
-        "td": bool(row.get("td", False)),
-        "yards_bucket": str(row.get("yards_bucket", "NA")),
-        "turnover": str(row.get("turnover", "NONE") if row.get("turnover") is not None else "NONE"),
-    }
-
-def build_state_pre_dict(row: dict) -> dict:
-    return {
-        "down": int(row.get("down", 1)),
-        "dist_bucket": str(row.get("dist_bucket", "UNK")),
-        "field_zone": str(row.get("field_zone", "UNK")),
-        "clock_bucket": str(row.get("clock_bucket", "OTHER")),
-        "goal_to_go": bool(row.get("goal_to_go", False)),
-    }
-
-# ============================
-# COACH SUMMARY (4 sentences each side)
-# ============================
-def summarize_offense(df_labeled: pd.DataFrame) -> str:
-    dfo = df_labeled[df_labeled.get("pv_possession") == "PV_OFF"].copy()
-    if dfo.empty:
-        return ("PV offense: no labeled offensive plays yet. Tag a few PV_OFF plays to unlock tendencies. "
-                "Once we have them, we’ll show run/pass mix, top call families, and situational breakers. "
-                "For now, the model relies on priors + early-game script assumptions.")
-
-    call = dfo["call_type"].astype(str).value_counts(normalize=True)
-    p_run = float(call.get("RUN", 0.0))
-    p_passfam = float(call.get("PASS_QUICK", 0.0) + call.get("PASS_DROPBACK", 0.0) +
-                      call.get("PLAY_ACTION", 0.0) + call.get("SCREEN", 0.0) + call.get("SHOT", 0.0))
-
-    d1 = dfo[dfo.get("down") == 1]
-    call1 = d1["call_type"].astype(str).value_counts(normalize=True) if not d1.empty else pd.Series(dtype=float)
-    p1_run = float(call1.get("RUN", 0.0))
-    p1_pa = float(call1.get("PLAY_ACTION", 0.0))
-    p1_shot = float(call1.get("SHOT", 0.0))
-
-    press = dfo[dfo.get("pressure").notna()]
-    p_press5 = float((press["pressure"].astype(str) == "5+").mean()) if not press.empty else None
-
-    breaker = []
-    if p_run > 0.60:
-        breaker.append("break with early-down play-action/shot looks")
-    elif p_passfam > 0.65:
-        breaker.append("break with run/screen to punish light boxes")
-    if p_press5 is not None and p_press5 > 0.30:
-        breaker.append("lean quick game/screens vs pressure")
-    if not breaker:
-        breaker.append("mix in constraint plays to stay unpredictable")
-
-    s1 = f"PV offense is {_pct(p_run)} run / {_pct(p_passfam)} pass-family overall."
-    s2 = f"On 1st down, run is {_pct(p1_run)} with PA {_pct(p1_pa)} and shots {_pct(p1_shot)}."
-    s3 = f"Pressure faced (5+) is {_pct(p_press5)}." if p_press5 is not None else "Pressure faced isn’t stable yet (need more pressure tags)."
-    s4 = f"Tendency-break idea: {', '.join(breaker)}."
-    return " ".join([s1, s2, s3, s4])
-
-def summarize_defense(df_labeled: pd.DataFrame) -> str:
-    dfd = df_labeled[df_labeled.get("pv_possession") == "PV_DEF"].copy()
-    if dfd.empty:
-        return ("PV defense: no labeled defensive snaps yet. Tag PV_DEF plays to unlock opponent tendencies. "
-                "Once we have them, we’ll show their run/pass/shot rates by down and field zone. "
-                "For now, the model relies on priors + early-game scouting assumptions. "
-                "As tags accumulate, we’ll identify the cleanest breaker windows.")
-
-    call = dfd["call_type"].astype(str).value_counts(normalize=True)
-    opp_run = float(call.get("RUN", 0.0))
-    opp_passfam = float(call.get("PASS_QUICK", 0.0) + call.get("PASS_DROPBACK", 0.0) +
-                        call.get("PLAY_ACTION", 0.0) + call.get("SCREEN", 0.0) + call.get("SHOT", 0.0))
-    opp_shot = float(call.get("SHOT", 0.0))
-    opp_screen = float(call.get("SCREEN", 0.0))
-
-    shell = dfd[dfd.get("def_shell").notna()]
-    p_two_high = float((shell["def_shell"].astype(str) == "2").mean()) if not shell.empty else None
-
-    press = dfd[dfd.get("pressure").notna()]
-    p_press5 = float((press["pressure"].astype(str) == "5+").mean()) if not press.empty else None
-
-    d3 = dfd[dfd.get("down") == 3]
-    call3 = d3["call_type"].astype(str).value_counts(normalize=True) if not d3.empty else pd.Series(dtype=float)
-    opp3_drop = float(call3.get("PASS_DROPBACK", 0.0) + call3.get("SHOT", 0.0))
-
-    breaker = []
-    if opp_run > 0.60:
-        breaker.append("load box / force long-yardage")
-    if opp_shot > 0.12:
-        breaker.append("rotate late / protect posts on likely shot downs")
-    if opp_screen > 0.10 and (p_press5 is not None and p_press5 > 0.30):
-        breaker.append("screen-alert when blitzing (peel/replace)")
-    if not breaker:
-        breaker.append("vary shell + simulated pressure to break their read")
-
-    s1 = f"Opponent offense is {_pct(opp_run)} run / {_pct(opp_passfam)} pass-family with shots {_pct(opp_shot)} and screens {_pct(opp_screen)}."
-    s2 = f"On 3rd down, dropback/shot tendency is {_pct(opp3_drop)}."
-    s3 = f"Your tags show two-high {_pct(p_two_high)} and 5+ pressure {_pct(p_press5)}." if (p_two_high is not None and p_press5 is not None) else "Shell/pressure tendencies need more tags to stabilize."
-    s4 = f"Tendency-break idea: {', '.join(breaker)}."
-    return " ".join([s1, s2, s3, s4])
-
-# =====================================================
-# STREAMLIT CONFIG
-# =====================================================
-st.set_page_config(page_title="PV Tagger + Coaching Dashboard", layout="wide")
-st.title("PV Tagger + Coaching Dashboard — Live Tagger + Coaching Probs + Coach Summary")
-
-# =====================================================
-# SESSION STATE
-# =====================================================
-if "session_id" not in st.session_state:
-    st.session_state.session_id = str(uuid.uuid4())[:8]
-if "game_id" not in st.session_state:
-    st.session_state.game_id = "practice_game"
-if "play_no" not in st.session_state:
-    st.session_state.play_no = 1
-if "pv_possession" not in st.session_state:
-    st.session_state.pv_possession = "PV_DEF"
-
-# =====================================================
-# TOP BAR
-# =====================================================
-top = st.columns([1.2, 1.6, 1, 1, 1.5])
-with top[0]:
-    st.text_input("Session", value=st.session_state.session_id, disabled=True)
-with top[1]:
-    st.session_state.game_id = st.text_input("Game ID", value=st.session_state.game_id)
-with top[2]:
-    st.session_state.play_no = st.number_input("Play #", min_value=1, value=int(st.session_state.play_no), step=1)
-with top[3]:
-    st.session_state.pv_possession = st.selectbox(
-        "PV Possession",
-        ["PV_OFF", "PV_DEF"],
-        index=0 if st.session_state.pv_possession == "PV_OFF" else 1
-    )
-with top[4]:
-    if st.button("➕ Next Play", use_container_width=True):
-        st.session_state.play_no += 1
-        st.rerun()
-
-st.divider()
-tab_tagger, tab_dash = st.tabs(["🏷️ Tagger + Import", "📊 Coaching Dashboard"])
-
-# =====================================================
-# TAGGER TAB
-# =====================================================
-with tab_tagger:
-    st.subheader("Fast Tagger (Buckets Only) + CSV Importer")
-
-    with st.expander("📥 Import CSV into database (upsert)", expanded=False):
-        uploaded = st.file_uploader("Upload CSV", type=["csv"], accept_multiple_files=False)
-        if uploaded is not None:
-            try:
-                df_imp = pd.read_csv(uploaded)
-
-                if "session_id" not in df_imp.columns:
-                    df_imp["session_id"] = st.session_state.session_id
-                    st.warning("CSV missing session_id — auto-filled with current session.")
-                if "game_id" not in df_imp.columns:
-                    df_imp["game_id"] = st.session_state.game_id
-                    st.warning("CSV missing game_id — auto-filled with current game_id.")
-
-                req = ["session_id", "game_id", "play_no"]
-                missing = [c for c in req if c not in df_imp.columns]
-                if missing:
-                    st.error(f"Missing required columns: {missing}")
-                else:
-                    df_imp["play_no"] = pd.to_numeric(df_imp["play_no"], errors="coerce").fillna(0).astype(int)
-                    if "ts" not in df_imp.columns:
-                        df_imp["ts"] = time.time()
-
-                    for bcol in ["hurry_up", "goal_to_go", "first_down", "td", "timeout_used"]:
-                        if bcol in df_imp.columns:
-                            df_imp[bcol] = df_imp[bcol].astype(str).str.lower().isin(["true", "1", "yes", "y"])
-
-                    st.dataframe(df_imp.head(25), use_container_width=True, height=280)
-                    if st.button("✅ Import / Upsert", use_container_width=True):
-                        upsert_many(df_imp)
-                        st.success(f"Imported {len(df_imp)} rows.")
-                        st.rerun()
-            except Exception as e:
-                st.error("Import failed.")
-                st.exception(e)
-
-    st.divider()
-
-    left, right = st.columns([1.25, 0.75])
-
-    with left:
-        st.markdown("### Situation")
-        r1 = st.columns([1, 1.6, 1, 1, 1.1])
-        with r1[0]:
-            quarter = st.selectbox("Q", [1, 2, 3, 4], key="tag_q")
-        with r1[1]:
-            clock_bucket = st.selectbox("Clock Bucket", CLOCK_BUCKETS, index=0, key="tag_clock_bucket")
-        with r1[2]:
-            hurry_up = st.toggle("HURRY UP", value=False, key="tag_hurry")
-        with r1[3]:
-            down = st.selectbox("Down", [1, 2, 3, 4], key="tag_down")
-        with r1[4]:
-            dist_bucket = st.selectbox("Dist Bucket", DIST_BUCKETS, index=0, key="tag_dist_bucket")
-
-        r2 = st.columns([1.2, 1])
-        with r2[0]:
-            field_zone = st.selectbox("Field Zone", FIELD_ZONES, index=FIELD_ZONES.index("MIDFIELD"), key="tag_field_zone")
-        with r2[1]:
-            goal_to_go = st.toggle("GOAL TO GO", value=False, key="tag_gtg")
-
-        st.markdown("### Opponent / Defensive Look (optional)")
-        p1, p2 = st.columns(2)
-        with p1:
-            opp_personnel = st.selectbox("Opp Personnel", PERSONNEL, index=PERSONNEL.index("11"), key="tag_pers")
-            opp_formation = st.selectbox("Opp Formation", FORMATION, index=FORMATION.index("2x2"), key="tag_form")
-        with p2:
-            def_shell = st.selectbox("Def Shell (0/1/2-high)", SHELL, key="tag_shell")
-            pressure = st.selectbox("Pressure (4 vs 5+)", PRESSURE, key="tag_press")
-
-        st.caption("Tag fast. Label results after the play (or during stoppages).")
-
-    with right:
-        st.markdown("### Submit")
-        if st.button("✅ SUBMIT TAG (FAST)", use_container_width=True, key="btn_submit"):
-            ev = TagEvent(
-                ts=now_ts(),
-                session_id=st.session_state.session_id,
-                game_id=st.session_state.game_id,
-                play_no=int(st.session_state.play_no),
-                quarter=int(quarter),
-                clock_bucket=str(clock_bucket),
-                hurry_up=bool(hurry_up),
-                down=int(down),
-                dist_bucket=str(dist_bucket),
-                field_zone=str(field_zone),
-                goal_to_go=bool(goal_to_go),
-                pv_possession=st.session_state.pv_possession,
-                opp_personnel=None if opp_personnel == "UNK" else opp_personnel,
-                opp_formation=None if opp_formation == "UNK" else opp_formation,
-                def_shell=None if def_shell == "UNK" else def_shell,
-                pressure=None if pressure == "UNK" else pressure,
-                call_type=None,
-                first_down=None,
-                td=None,
-                yards_bucket=None,
-                pass_result=None,
-                turnover=None,
-                fourth_decision=None,
-                two_pt_decision=None,
-                timeout_used=None,
-                meta={"source": "manual_fast_priors_fullfile"},
-            )
-            upsert_event(ev.to_dict())
-            st.session_state.play_no += 1
-            st.success("Saved tag + advanced play #.")
-            st.rerun()
-
-        st.divider()
-        st.markdown("### Label / Edit (apply to ANY play)")
-
-        df_all = load_events()
-        df_sg = list_session_game(df_all, st.session_state.session_id, st.session_state.game_id)
-        play_options = df_sg["play_no"].astype(int).tolist() if not df_sg.empty else []
-        selected_play = st.selectbox(
-            "Select Play #",
-            options=play_options if play_options else [max(1, int(st.session_state.play_no) - 1)],
-            index=len(play_options) - 1 if play_options else 0,
-            key="sel_play"
-        )
-
-        call_type = st.selectbox("Call Type", CALL_TYPES, index=0, key="lab_call")
-
-        cA, cB = st.columns(2)
-        with cA:
-            first_down = st.toggle("First Down", value=False, key="lab_fd")
-            td = st.toggle("TD", value=False, key="lab_td")
-            yards_bucket = st.selectbox("Yards Bucket", YARDS_BUCKETS, index=0, key="lab_yards")
-            timeout_used = st.toggle("Timeout used (between plays)", value=False, key="lab_to_used")
-        with cB:
-            pass_result = st.selectbox("Pass Result", PASS_RESULT, index=0, key="lab_pass_res")
-            turnover = st.selectbox("Turnover", TURNOVER_RESULT, index=0, key="lab_to")
-
-        row_for_play = get_play(df_all, st.session_state.session_id, st.session_state.game_id, int(selected_play))
-
-        two_pt_decision = None
-        if td:
-            two_pt_decision = st.radio("After TD: 2pt or Kick?", TWO_PT_CHOICE, horizontal=True, key="lab_2pt")
-
-        if st.button("💾 APPLY LABELS", use_container_width=True, key="btn_apply_labels"):
-            if row_for_play.empty:
-                st.error("Could not find that play.")
-            else:
-                d = row_for_play.iloc[-1].to_dict()
-                d["call_type"] = str(call_type)
-                d["first_down"] = bool(first_down)
-                d["td"] = bool(td)
-                d["yards_bucket"] = str(yards_bucket)
-                d["pass_result"] = str(pass_result)
-                d["turnover"] = str(turnover)
-                d["timeout_used"] = bool(timeout_used)
-                if td:
-                    d["two_pt_decision"] = str(two_pt_decision)
-                d["ts"] = now_ts()
-                upsert_event(d)
-                st.success(f"Saved labels for play #{selected_play}.")
-                st.rerun()
-
-    st.divider()
-    st.markdown("### Latest Plays (this session/game)")
-    df_all2 = load_events()
-    df_sg2 = list_session_game(df_all2, st.session_state.session_id, st.session_state.game_id)
-    if df_sg2.empty:
-        st.info("No plays yet.")
-    else:
-        exp_df = make_export_df(df_sg2, st.session_state.session_id, st.session_state.game_id)
-        st.dataframe(exp_df.tail(40), use_container_width=True, height=360)
-        st.download_button(
-            "⬇️ Download this game CSV (re-importable)",
-            data=exp_df.to_csv(index=False).encode("utf-8"),
-            file_name=f"{st.session_state.game_id}_{st.session_state.session_id}.csv",
-            mime="text/csv",
-            use_container_width=True
-        )
-
-# =====================================================
-# DASHBOARD TAB
-# =====================================================
-with tab_dash:
-    st.subheader("Coaching Dashboard (Full probs + 3rd→4th Preview + TD→2pt Preview + Coach Summary)")
-
-    df_all = load_events()
-    df_live = list_session_game(df_all, st.session_state.session_id, st.session_state.game_id)
-    if df_live.empty:
-        st.warning("No plays yet. Tag a few plays first.")
-        st.stop()
-
-    # normalize
-    df_live["clock_bucket"] = df_live.get("clock_bucket", "OTHER").fillna("OTHER").astype(str)
-    df_live["dist_bucket"] = df_live.get("dist_bucket", "UNK").fillna("UNK").astype(str)
-    df_live["field_zone"] = df_live.get("field_zone", "UNK").fillna("UNK").astype(str)
-    df_live["goal_to_go"] = df_live.get("goal_to_go", False).fillna(False).astype(bool)
-    df_live["hurry_up"] = df_live.get("hurry_up", False).fillna(False).astype(bool)
-    df_live["pv_possession"] = df_live.get("pv_possession", "PV_DEF").fillna("PV_DEF").astype(str)
-    df_live["down"] = pd.to_numeric(df_live.get("down", 1), errors="coerce").fillna(1).astype(int)
-    df_live["quarter"] = pd.to_numeric(df_live.get("quarter", 1), errors="coerce").fillna(1).astype(int)
-
-    latest = df_live.tail(1).iloc[0].to_dict()
-    df_labeled = df_live[df_live.get("call_type").notna()].copy() if "call_type" in df_live.columns else pd.DataFrame()
-    latest_labeled = df_labeled.tail(1).iloc[0].to_dict() if not df_labeled.empty else None
-
-    st.markdown("### Current Situation (latest tagged)")
-    st.dataframe(pd.DataFrame([{
-        "play_no": latest.get("play_no"),
-        "Q": latest.get("quarter"),
-        "clock_bucket": latest.get("clock_bucket"),
-        "hurry_up": latest.get("hurry_up"),
-        "down": latest.get("down"),
-        "dist_bucket": latest.get("dist_bucket"),
-        "field_zone": latest.get("field_zone"),
-        "goal_to_go": latest.get("goal_to_go"),
-        "shell": latest.get("def_shell"),
-        "pressure_tag": latest.get("pressure"),
-    }]), use_container_width=True)
-
-    st.divider()
-    st.markdown("### Prior Controls (CFB + NFL)")
-    c1, c2, c3 = st.columns([1.1, 1.1, 1.1])
-    with c1:
-        league_mix_cfb = st.slider("CFB weight (NFL=0, CFB=1)", 0.0, 1.0, 0.5, 0.05)
-    with c2:
-        prior_strength = st.slider("Prior strength (pseudo-plays)", 0.2, 4.0, 1.0, 0.1)
-    with c3:
-        st.caption("4th-down preview triggers after 3rd-down NO first down; 2pt preview after TD.")
-
-    after_first_down = bool(latest_labeled.get("first_down", False)) if latest_labeled is not None else False
-
-    cond = {
-        "pv_possession": latest.get("pv_possession", "PV_DEF"),
-        "quarter": int(latest.get("quarter", 1)),
-        "down": int(latest.get("down", 1)),
-        "dist_bucket": latest.get("dist_bucket", "UNK"),
-        "field_zone": latest.get("field_zone", "UNK"),
-        "clock_bucket": latest.get("clock_bucket", "OTHER"),
-        "hurry_up": bool(latest.get("hurry_up", False)),
-        "goal_to_go": bool(latest.get("goal_to_go", False)),
-    }
-
-    in_range_now = fg_in_range(cond["field_zone"], float(league_mix_cfb))
-
-    # Call-type posterior
-    live_counts_call = counts_from_live(df_labeled, cond, label_col="call_type") if not df_labeled.empty else {}
-    prior_alpha = call_prior_alpha(
-        down=cond["down"],
-        dist_bucket=cond["dist_bucket"],
-        field_zone=cond["field_zone"],
-        clock_bucket=cond["clock_bucket"],
-        hurry_up=cond["hurry_up"],
-        league_mix_cfb=float(league_mix_cfb),
-        prior_strength=float(prior_strength),
-        goal_to_go=cond["goal_to_go"],
-        after_first_down=after_first_down,
-        fg_in_range=in_range_now,
-    )
-    post_call = posterior_mean(prior_alpha, live_counts_call)
-    deriv = derived_pass_conditionals(post_call)
-
-    # Pressure posterior
-    df_press = df_live[df_live.get("pressure").notna()].copy() if "pressure" in df_live.columns else pd.DataFrame()
-    live_counts_press = counts_from_live(df_press, cond, label_col="pressure") if not df_press.empty else {}
-    prior_press = pressure_prior_alpha(cond["down"], cond["dist_bucket"], strength=float(prior_strength))
-    post_press = posterior_mean(prior_press, live_counts_press)
-    p_press_5p = post_press.get("5+", 0.0)
-
-    # Timeout posterior
-    df_to = df_live[df_live.get("timeout_used").notna()].copy() if "timeout_used" in df_live.columns else pd.DataFrame()
-    if not df_to.empty:
-        df_to = df_to.copy()
-        df_to["timeout_used_label"] = df_to["timeout_used"].map(lambda x: "YES" if bool(x) else "NO")
-        live_counts_to = counts_from_live(df_to, cond, label_col="timeout_used_label")
-    else:
-        live_counts_to = {}
-    prior_to = timeout_prior_alpha(cond["quarter"], cond["clock_bucket"], cond["hurry_up"], strength=float(prior_strength))
-    post_to = posterior_mean(prior_to, live_counts_to)
-    p_timeout_yes = post_to.get("YES", 0.0)
-
-    # EP + EPA
-    ep_now = ep_pre(cond, league_mix_cfb=float(league_mix_cfb))
-    epa_last = epa_for_row(latest_labeled, league_mix_cfb=float(league_mix_cfb)) if latest_labeled is not None else None
-
-    st.divider()
-    st.markdown("### Summary Metrics")
-    m1, m2, m3, m4, m5 = st.columns(5)
-    m1.metric("P(RUN)", f"{deriv['p_run']:.2%}")
-    m2.metric("P(PASS)", f"{deriv['p_pass']:.2%}")
-    m3.metric("P(Pressure 5+)", f"{p_press_5p:.2%}")
-    m4.metric("P(Timeout used)", f"{p_timeout_yes:.2%}")
-    m5.metric("EP (pre-snap)", f"{ep_now:+.2f}")
-
-    # 3rd->4th preview
-    st.divider()
-    st.markdown("### 4th-Down Decision Preview (right after 3rd-down FAIL)")
-    show_preview = False
-    preview_state4 = None
-
-    if latest_labeled is not None:
-        res = build_result_dict(latest_labeled)
-        st_pre = build_state_pre_dict(latest_labeled)
-
-        if int(st_pre["down"]) == 3 and (not res["first_down"]) and (not res["td"]) and res["turnover"] == "NONE":
-            show_preview = True
-            try:
-                preview_state4 = next_state_from_result(st_pre, res)
-            except Exception:
-                preview_state4 = {"down": 4, "dist_bucket": st_pre["dist_bucket"], "field_zone": st_pre["field_zone"], "clock_bucket": st_pre["clock_bucket"], "goal_to_go": st_pre["goal_to_go"]}
-
-    if show_preview and preview_state4 is not None and int(preview_state4.get("down", 0)) == 4:
-        cond4 = {
-            "pv_possession": latest.get("pv_possession", "PV_DEF"),
-            "quarter": int(latest.get("quarter", 1)),
-            "down": 4,
-            "dist_bucket": str(preview_state4.get("dist_bucket", "UNK")),
-            "field_zone": str(preview_state4.get("field_zone", "UNK")),
-            "clock_bucket": str(preview_state4.get("clock_bucket", "OTHER")),
-            "hurry_up": bool(latest.get("hurry_up", False)),
-            "goal_to_go": bool(preview_state4.get("goal_to_go", False)),
-        }
-        in_range4 = fg_in_range(cond4["field_zone"], float(league_mix_cfb))
-
-        df_4 = df_labeled[df_labeled["down"] == 4].copy() if (not df_labeled.empty and "down" in df_labeled.columns) else pd.DataFrame()
-        if not df_4.empty:
-            df_4["fourth_tri"] = df_4["call_type"].astype(str).map(map_4th_tri_from_call_type)
-            live_counts_4tri = counts_from_live(df_4, cond4, label_col="fourth_tri")
-        else:
-            live_counts_4tri = {}
-
-        prior_4tri = fourth_tri_prior(
-            dist_bucket=cond4["dist_bucket"],
-            field_zone=cond4["field_zone"],
-            league_mix_cfb=float(league_mix_cfb),
-            strength=float(prior_strength),
-            fg_in_range=in_range4
-        )
-        post_4tri = posterior_mean(prior_4tri, live_counts_4tri)
-
-        st.dataframe(pd.DataFrame([{
-            "4th_dist_bucket": cond4["dist_bucket"],
-            "4th_field_zone": cond4["field_zone"],
-            "fg_in_range": in_range4,
-            "p_GO": post_4tri.get("GO", 0.0),
-            "p_PUNT": post_4tri.get("PUNT", 0.0),
-            "p_FIELD_GOAL": post_4tri.get("FIELD_GOAL", 0.0),
-            "p_NO_GO (derived)": 1.0 - post_4tri.get("GO", 0.0),
-        }]), use_container_width=True)
-    else:
-        st.caption("Preview appears after you label a 3rd-down with first_down = False (and no TD/turnover).")
-
-    # TD -> 2pt preview (ONLY after TD)
-    st.divider()
-    st.markdown("### 2pt vs Kick Preview (ONLY after a TD is labeled)")
-    if latest_labeled is not None and bool(latest_labeled.get("td", False)):
-        vc = df_labeled[df_labeled.get("two_pt_decision").notna()]["two_pt_decision"].value_counts().to_dict() if ("two_pt_decision" in df_labeled.columns) else {}
-        prior_2 = {"KICK": 36 * float(prior_strength), "TWO": 4 * float(prior_strength)}
-        post_2 = posterior_mean(prior_2, vc)
-        st.dataframe(pd.DataFrame([{"p_KICK": post_2.get("KICK", 0.0), "p_TWO": post_2.get("TWO", 0.0)}]), use_container_width=True)
-    else:
-        st.caption("This section only shows after the most recent labeled play is marked TD = True.")
-
-    # Full call-type posterior table
-    st.divider()
-    st.markdown("### Full Call-Type Posterior (all probabilities)")
-    post_tbl = pd.DataFrame([{"call_type": k, "prob": float(v)} for k, v in post_call.items()]).sort_values("prob", ascending=False)
-    st.dataframe(post_tbl, use_container_width=True, height=320)
-
-    st.markdown("### Pass conditional")
-    st.dataframe(pd.DataFrame([{
-        "P(shot | pass)": deriv["p_shot_given_pass"],
-        "P(screen | pass)": deriv["p_screen_given_pass"],
-        "P(PA | pass)": deriv["p_pa_given_pass"],
-        "P(quick | pass)": deriv["p_quick_given_pass"],
-        "P(dropback | pass)": deriv["p_dropback_given_pass"],
-    }]), use_container_width=True)
-
-    # EPA table
-    st.divider()
-    st.markdown("### EPA (bucket-based but consistent)")
-    if epa_last is not None:
-        st.write(f"EPA(last labeled play): **{epa_last:+.3f}**")
-    else:
-        st.caption("Label first_down/td/turnover/yards_bucket on a play to compute EPA.")
-
-    df_ep = df_live.copy()
-    df_ep["epa"] = df_ep.apply(lambda r: epa_for_row(r.to_dict(), league_mix_cfb=float(league_mix_cfb)), axis=1)
-    show = df_ep[df_ep["epa"].notna()].copy()
-    if show.empty:
-        st.info("No plays with enough result labels for EPA yet.")
-    else:
-        cols = [c for c in ["play_no","down","dist_bucket","field_zone","clock_bucket","call_type","first_down","td","turnover","yards_bucket","epa"] if c in show.columns]
-        st.dataframe(show[cols].sort_values("play_no"), use_container_width=True, height=320)
-
-    # ============================
-    # NEW: COACH SUMMARY (4 sentences each side)
-    # ============================
-    st.divider()
-    st.markdown("## Snap Summary (Coach-ready)")
-
-    st.markdown("### PV Offense (4 sentences)")
-    st.write(summarize_offense(df_labeled))
-
-    st.markdown("### PV Defense (4 sentences)")
-    st.write(summarize_defense(df_labeled))
+# =====================================================
+# PATH FIX
+# =====================================================
+import sys
+from pathlib import Path
+ROOT_DIR = Path(__file__).resolve().parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+# =====================================================
+# IMPORTS
+# =====================================================
+import streamlit as st
+import pandas as pd
+import uuid
+import time
+import threading
+
+from config import (
+    CLOCK_BUCKETS, DIST_BUCKETS, FIELD_ZONES,
+    PERSONNEL, FORMATION, SHELL, PRESSURE,
+    CALL_TYPES, PASS_RESULT, TURNOVER_RESULT, YARDS_BUCKETS,
+    TWO_PT_CHOICE,
+    VIEWER_POLL_S, TENDENCY_WINDOWS, EXPORT_DIR, SIMILARITY_TOP_K,
+)
+from schemas import TagEvent, LABEL_COLS, now_ts
+from storage import upsert_event, upsert_many, load_events, list_session_game, get_play, store_version
+from historical import historical_version
+from notify import ChangeListener
+from tracing import span, traced, record, enabled as tracing_enabled
+from analytics.prior_tables import PriorWatcher, version as prior_version
+
+from analytics.dashboard import (
+    compute_situation, compute_previews, compute_epa, prepare_live, summarize_offense, summarize_defense,
+)
+from analytics.tendencies import TendencySnapshot
+from analytics.speculate import Speculator
+from analytics.similarity import SimilarityIndex, load_hist_index, comparable_scenarios, outcome_mix
+from model.features import FEATURE_COLS
+# export, analytics.sensitivity and analytics.rollups are imported where used, so
+# viewer mode (?mode=viewer) starts without the tagger/scouting-only modules
+
+# =====================================================
+# HELPERS
+# =====================================================
+def make_export_df(df_sg: pd.DataFrame, session_id: str, game_id: str) -> pd.DataFrame:
+    if df_sg is None or df_sg.empty:
+        return pd.DataFrame()
+
+    out = df_sg.copy()
+    if "session_id" not in out.columns:
+        out["session_id"] = session_id
+    if "game_id" not in out.columns:
+        out["game_id"] = game_id
+
+    # same projection as the bulk export (export.py), so either re-imports
+    from export import EXPORT_COLS
+    show_cols = [c for c in EXPORT_COLS if c in out.columns]
+    return out[show_cols]
+
+# =====================================================
+# CACHED COMPUTATIONS
+# Keyed by store_version() (changes on every write), session/game and slider
+# values, so reruns from unrelated widgets (expanders, tabs) are cache hits.
+# Anything built from the priors also takes prior_version(), so a reloaded
+# prior table never serves results computed from the old one.
+# =====================================================
+@st.cache_resource(max_entries=2, show_spinner=False)
+def events_at(version: tuple) -> pd.DataFrame:
+    # shared, read-only: callers filter/copy before changing anything
+    return load_events()
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def game_frames(version: tuple, session_id: str, game_id: str):
+    with span("app.game_frames"):
+        return prepare_live(list_session_game(events_at(version), session_id, game_id))
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def game_export(version: tuple, session_id: str, game_id: str) -> pd.DataFrame:
+    return make_export_df(list_session_game(events_at(version), session_id, game_id), session_id, game_id)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def situation_state(version: tuple, session_id: str, game_id: str) -> dict:
+    # latest play's condition + live counts: everything the sliders don't touch
+    df_live, df_labeled = game_frames(version, session_id, game_id)
+    return compute_situation(df_live, df_labeled)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def sensitivity_for(cond: dict, counts: dict, after_first_down: bool, priors: tuple):
+    # One sweep per situation/counts; slider moves only do a lookup
+    from analytics.sensitivity import sweep_sensitivity
+    return sweep_sensitivity(cond, counts, after_first_down=after_first_down)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def previews_state(version: tuple, session_id: str, game_id: str, league_mix_cfb: float, prior_strength: float,
+                   priors: tuple) -> dict:
+    df_live, df_labeled = game_frames(version, session_id, game_id)
+    return compute_previews(df_labeled, df_live.tail(1).iloc[0].to_dict(), league_mix_cfb, prior_strength)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def epa_state(version: tuple, session_id: str, game_id: str, league_mix_cfb: float) -> dict:
+    df_live, df_labeled = game_frames(version, session_id, game_id)
+    return compute_epa(df_live, df_labeled, league_mix_cfb)
+
+def dashboard_state(version: tuple, session_id: str, game_id: str, league_mix_cfb: float, prior_strength: float,
+                    priors: tuple) -> dict:
+    """
+    compute_dashboard's output for one slider position, from cached parts. The
+    situation and its sensitivity sweep are computed once per write; a slider move
+    is a grid lookup plus the small preview/EPA entries for that position.
+    """
+    sit = situation_state(version, session_id, game_id)
+    sens = sensitivity_for(sit["cond"], sit["counts"], sit["after_first_down"], priors)
+    return {
+        **sit,
+        **sens.posteriors(league_mix_cfb, prior_strength),
+        **previews_state(version, session_id, game_id, league_mix_cfb, prior_strength, priors),
+        **epa_state(version, session_id, game_id, league_mix_cfb),
+    }
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def season_rollups(version: tuple) -> pd.DataFrame:
+    # re-aggregates only games whose plays changed since the last refresh
+    from analytics.rollups import refresh_rollups
+    return refresh_rollups(events_at(version))
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def hist_similarity(hist_version: tuple) -> SimilarityIndex:
+    # built once per historical dataset (historical_version() changes with its files)
+    return load_hist_index()
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def live_similarity(version: tuple) -> SimilarityIndex:
+    return SimilarityIndex.from_frame(events_at(version), "live")
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def comparables_for(version: tuple, hist_version: tuple, cond: dict, exclude: tuple, k: int = SIMILARITY_TOP_K) -> pd.DataFrame:
+    # one spare result in case the current play (exclude = session, game, play_no) is labeled
+    comps = comparable_scenarios(cond, [live_similarity(version), hist_similarity(hist_version)], k + 1)
+    if not comps.empty and {"session_id", "game_id", "play_no"} <= set(comps.columns):
+        same = ((comps["source"] == "live") & (comps["session_id"] == exclude[0])
+                & (comps["game_id"] == exclude[1]) & (comps["play_no"] == exclude[2]))
+        comps = comps[~same]
+    return comps.head(k).reset_index(drop=True)
+
+@st.cache_resource(show_spinner=False)
+def tendency_snapshots() -> dict:
+    # (session_id, game_id) -> TendencySnapshot, kept current by the tag/label callbacks
+    return {}
+
+@st.cache_resource(show_spinner=False)
+def snapshot_lock() -> threading.Lock:
+    # snapshots are shared by every session (and station) on this server
+    return threading.Lock()
+
+def game_snapshot(version: tuple, session_id: str, game_id: str) -> TendencySnapshot:
+    """
+    Tendency counts for one game. Rebuilt from the frame only when the store moved
+    without going through apply_to_snapshot() (imports, other tabs, a restart).
+    Callers hold snapshot_lock() while they read it.
+    """
+    snaps = tendency_snapshots()
+    snap = snaps.get((session_id, game_id))
+    if snap is None or snap.version != version:
+        _, df_labeled = game_frames(version, session_id, game_id)
+        snap = TendencySnapshot.from_frame(df_labeled)
+        snap.version = version
+        snaps[(session_id, game_id)] = snap
+    return snap
+
+def apply_to_snapshot(row: dict, version_before: tuple, version_after: tuple) -> None:
+    """
+    Fold one written play into its game's snapshot instead of regrouping the game.
+    Only a snapshot at exactly the version this write started from can take it;
+    otherwise another write landed in between and the snapshot is dropped, so the
+    next render rebuilds it from the store.
+    """
+    key = (row["session_id"], row["game_id"])
+    with snapshot_lock():
+        snaps = tendency_snapshots()
+        snap = snaps.get(key)
+        if snap is None:
+            return
+        if snap.version == version_before:
+            snap.update(row)
+            snap.version = version_after
+        else:
+            del snaps[key]
+
+def coach_summaries(version: tuple, session_id: str, game_id: str, last_n: int = None):
+    with span("app.coach_summaries"), snapshot_lock():
+        snap = game_snapshot(version, session_id, game_id)
+        return (
+            summarize_offense(snapshot=snap, last_n=last_n),
+            summarize_defense(snapshot=snap, last_n=last_n),
+            snap.window_table(),
+        )
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def game_list(version: tuple):
+    df = events_at(version)
+    if df.empty:
+        return []
+    return list(df[["session_id", "game_id"]].drop_duplicates().itertuples(index=False, name=None))
+
+@st.cache_resource(show_spinner=False)
+def speculator() -> Speculator:
+    # background worker shared by all sessions; see analytics/speculate.py
+    return Speculator()
+
+def speculated_previews(version: tuple, session_id: str, game_id: str, league_mix_cfb: float, prior_strength: float):
+    """
+    Previews found by on_apply_labels() for the write that produced `version`, if the
+    label matched a speculated result under the same sliders.
+    """
+    spec = st.session_state.get("spec_previews")
+    if spec is None or spec[0] != (version, session_id, game_id, float(league_mix_cfb), float(prior_strength)):
+        return None
+    return spec[1]
+
+@st.cache_resource(show_spinner=False)
+def prior_watcher() -> PriorWatcher:
+    # one thread per Streamlit server: edited prior files go live on the next rerun
+    return PriorWatcher()
+
+@st.cache_resource(show_spinner=False)
+def change_listener() -> ChangeListener:
+    # one subscription to the service's /events per Streamlit server, shared by all viewers
+    return ChangeListener()
+
+def game_token(session_id: str, game_id: str, panel: str = None):
+    """
+    Cache key for one game's (or one panel's) data. With the service running it only
+    moves when a play in this game changes in a way that affects the panel; without
+    it, it falls back to the global store version.
+    """
+    tok = change_listener().token(session_id, game_id, panel)
+    return store_version() if tok is None else tok
+
+# =====================================================
+# ACTIONS
+# Button callbacks run before the rerun the click already triggers, so the page
+# redraws once with the new data instead of drawing twice via st.rerun().
+# =====================================================
+def _flash(msg: str, kind: str = "success") -> None:
+    st.session_state["flash"] = (kind, msg)
+
+def show_flash() -> None:
+    f = st.session_state.pop("flash", None)
+    if f is not None:
+        getattr(st, f[0])(f[1])
+
+def on_next_play() -> None:
+    st.session_state.play_no += 1
+
+def on_import(df_imp: pd.DataFrame) -> None:
+    upsert_many(df_imp)
+    _flash(f"Imported {len(df_imp)} rows.")
+
+@traced("app.submit_tag")
+def on_submit_tag() -> None:
+    ss = st.session_state
+    ev = TagEvent(
+        ts=now_ts(),
+        session_id=ss.session_id,
+        game_id=ss.game_id,
+        play_no=int(ss.play_no),
+        quarter=int(ss["tag_q"]),
+        clock_bucket=str(ss["tag_clock_bucket"]),
+        hurry_up=bool(ss["tag_hurry"]),
+        down=int(ss["tag_down"]),
+        dist_bucket=str(ss["tag_dist_bucket"]),
+        field_zone=str(ss["tag_field_zone"]),
+        goal_to_go=bool(ss["tag_gtg"]),
+        pv_possession=ss.pv_possession,
+        opponent=ss.opponent.strip() or None,
+        season=int(ss.season) or None,
+        opp_personnel=None if ss["tag_pers"] == "UNK" else ss["tag_pers"],
+        opp_formation=None if ss["tag_form"] == "UNK" else ss["tag_form"],
+        def_shell=None if ss["tag_shell"] == "UNK" else ss["tag_shell"],
+        pressure=None if ss["tag_press"] == "UNK" else ss["tag_press"],
+        call_type=None,
+        first_down=None,
+        td=None,
+        yards_bucket=None,
+        pass_result=None,
+        turnover=None,
+        fourth_decision=None,
+        two_pt_decision=None,
+        timeout_used=None,
+        meta={"source": "manual_fast_priors_fullfile"},
+    )
+    before = store_version()
+    after = upsert_event(ev.to_dict())
+    apply_to_snapshot(ev.to_dict(), before, after)
+    ss.play_no += 1
+    _flash("Saved tag + advanced play #.")
+
+@traced("app.apply_labels")
+def on_apply_labels() -> None:
+    ss = st.session_state
+    selected_play = int(ss["sel_play"])
+    row_for_play = get_play(events_at(store_version()), ss.session_id, ss.game_id, selected_play)
+    if row_for_play.empty:
+        _flash("Could not find that play.", "error")
+        return
+    d = row_for_play.iloc[-1].to_dict()
+    d["call_type"] = str(ss["lab_call"])
+    d["first_down"] = bool(ss["lab_fd"])
+    d["td"] = bool(ss["lab_td"])
+    d["yards_bucket"] = str(ss["lab_yards"])
+    d["pass_result"] = str(ss["lab_pass_res"])
+    d["turnover"] = str(ss["lab_to"])
+    d["timeout_used"] = bool(ss["lab_to_used"])
+    if d["td"]:
+        d["two_pt_decision"] = str(ss.get("lab_2pt", TWO_PT_CHOICE[0]))
+    d["ts"] = now_ts()
+    before = store_version()
+    after = upsert_event(d)
+    apply_to_snapshot(d, before, after)
+
+    mix, strength = float(ss.get("league_mix_cfb", 0.5)), float(ss.get("prior_strength", 1.0))
+    hit = speculator().lookup(before, ss.session_id, ss.game_id, d, mix, strength)
+    if hit is not None:
+        ss["spec_previews"] = ((after, ss.session_id, ss.game_id, mix, strength), hit)
+    _flash(f"Saved labels for play #{selected_play}.")
+
+# =====================================================
+# DASHBOARD PANELS (shared by the dashboard tab and viewer mode)
+# =====================================================
+@traced("render.situation")
+def render_situation(latest: dict) -> None:
+    st.markdown("### Current Situation (latest tagged)")
+    st.dataframe(pd.DataFrame([{
+        "play_no": latest.get("play_no"),
+        "Q": latest.get("quarter"),
+        "clock_bucket": latest.get("clock_bucket"),
+        "hurry_up": latest.get("hurry_up"),
+        "down": latest.get("down"),
+        "dist_bucket": latest.get("dist_bucket"),
+        "field_zone": latest.get("field_zone"),
+        "goal_to_go": latest.get("goal_to_go"),
+        "shell": latest.get("def_shell"),
+        "pressure_tag": latest.get("pressure"),
+    }]), use_container_width=True)
+
+@traced("render.metrics")
+def render_metrics(dash: dict, league_mix_cfb: float, prior_strength: float) -> None:
+    deriv = dash["deriv"]
+    st.markdown("### Summary Metrics")
+    m1, m2, m3, m4, m5 = st.columns(5)
+    m1.metric("P(RUN)", f"{deriv['p_run']:.2%}")
+    m2.metric("P(PASS)", f"{deriv['p_pass']:.2%}")
+    m3.metric("P(Pressure 5+)", f"{dash['p_press_5p']:.2%}")
+    m4.metric("P(Timeout used)", f"{dash['p_timeout_yes']:.2%}")
+    m5.metric("EP (pre-snap)", f"{dash['ep_now']:+.2f}")
+
+    with st.expander("🎚️ Slider sensitivity (precomputed CFB weight × prior strength grid)", expanded=False):
+        sens = sensitivity_for(dash["cond"], dash["counts"], dash["after_first_down"], prior_version())
+        sens_col = st.selectbox(
+            "Output",
+            ["p_run", "p_pass", "p_press_5p", "p_timeout_yes", "p_4th_GO", "p_4th_PUNT", "p_4th_FIELD_GOAL", "ep"],
+            key="sens_col",
+        )
+        st.dataframe(pd.DataFrame([sens.lookup(league_mix_cfb, prior_strength)]), use_container_width=True)
+        st.caption("Rows = CFB weight, columns = prior strength. 4th-down columns treat the current situation as 4th down.")
+        st.dataframe(sens.pivot(sens_col), use_container_width=True, height=320)
+
+@traced("render.previews")
+def render_previews(dash: dict) -> None:
+    # 3rd->4th preview
+    st.markdown("### 4th-Down Decision Preview (right after 3rd-down FAIL)")
+    if dash["fourth"] is not None:
+        st.dataframe(pd.DataFrame([dash["fourth"]]), use_container_width=True)
+    else:
+        st.caption("Preview appears after you label a 3rd-down with first_down = False (and no TD/turnover).")
+
+    # TD -> 2pt preview (ONLY after TD)
+    st.divider()
+    st.markdown("### 2pt vs Kick Preview (ONLY after a TD is labeled)")
+    if dash["two_pt"] is not None:
+        st.dataframe(pd.DataFrame([dash["two_pt"]]), use_container_width=True)
+    else:
+        st.caption("This section only shows after the most recent labeled play is marked TD = True.")
+
+@traced("render.posteriors")
+def render_posteriors(dash: dict) -> None:
+    deriv = dash["deriv"]
+    st.markdown("### Full Call-Type Posterior (all probabilities)")
+    post_tbl = pd.DataFrame([{"call_type": k, "prob": float(v)} for k, v in dash["post_call"].items()]).sort_values("prob", ascending=False)
+    st.dataframe(post_tbl, use_container_width=True, height=320)
+
+    st.markdown("### Pass conditional")
+    st.dataframe(pd.DataFrame([{
+        "P(shot | pass)": deriv["p_shot_given_pass"],
+        "P(screen | pass)": deriv["p_screen_given_pass"],
+        "P(PA | pass)": deriv["p_pa_given_pass"],
+        "P(quick | pass)": deriv["p_quick_given_pass"],
+        "P(dropback | pass)": deriv["p_dropback_given_pass"],
+    }]), use_container_width=True)
+
+@traced("render.comparables")
+def render_comparables(comps: pd.DataFrame) -> None:
+    st.markdown("### Comparable scenarios (most similar past situations)")
+    if comps.empty:
+        st.info("No labeled plays (historical or tagged) to compare against yet.")
+        return
+    mix = outcome_mix(comps)
+    st.caption(f"{len(comps)} closest labeled plays; distance = weighted count of differing situation columns "
+               f"(0 = same situation). Outcomes: " + ", ".join(f"{o} {p:.0%}" for o, p in mix.items()))
+    st.dataframe(comps, use_container_width=True, hide_index=True, height=320)
+
+@traced("render.epa")
+def render_epa(dash: dict) -> None:
+    st.markdown("### EPA (bucket-based but consistent)")
+    if dash["epa_last"] is not None:
+        st.write(f"EPA(last labeled play): **{dash['epa_last']:+.3f}**")
+    else:
+        st.caption("Label first_down/td/turnover/yards_bucket on a play to compute EPA.")
+
+    show = pd.DataFrame(dash["epa_table"])
+    if show.empty:
+        st.info("No plays with enough result labels for EPA yet.")
+    else:
+        st.dataframe(show, use_container_width=True, height=320)
+
+def summary_window(key: str):
+    opts = ["Game"] + [f"Last {n}" for n in TENDENCY_WINDOWS]
+    pick = st.radio("Summary window", opts, horizontal=True, key=key)
+    return None if pick == "Game" else int(pick.split()[1])
+
+@traced("render.summary")
+def render_summary(off_summary: str, def_summary: str, windows: list) -> None:
+    st.markdown("## Snap Summary (Coach-ready)")
+
+    st.markdown("### PV Offense (4 sentences)")
+    st.write(off_summary)
+
+    st.markdown("### PV Defense (4 sentences)")
+    st.write(def_summary)
+
+    st.markdown("### Tendencies (game vs last N plays)")
+    tbl = pd.DataFrame(windows)
+    if tbl.empty or tbl["n"].sum() == 0:
+        st.info("No labeled plays yet.")
+    else:
+        rate_cols = [c for c in tbl.columns if c not in ("side", "window", "n")]
+        tbl[rate_cols] = tbl[rate_cols].apply(lambda col: col.map(lambda v: "—" if v is None or v != v else f"{v:.0%}"))
+        st.dataframe(tbl, use_container_width=True, hide_index=True)
+
+# =====================================================
+# VIEWER MODE (?mode=viewer): read-only booth displays
+# Each panel is a fragment that re-runs on its own; its data is keyed on the
+# game/panel change token, so only panels touched by a changed play recompute.
+# =====================================================
+@st.fragment(run_every=VIEWER_POLL_S)
+def viewer_situation(sid: str, gid: str) -> None:
+    df_live, _ = game_frames(game_token(sid, gid, "situation"), sid, gid)
+    if df_live.empty:
+        st.warning("No plays yet for this game.")
+        return
+    render_situation(df_live.tail(1).iloc[0].to_dict())
+
+def _viewer_dash(sid: str, gid: str, panel: str, league_mix_cfb: float, prior_strength: float):
+    tok = game_token(sid, gid, panel)
+    df_live, _ = game_frames(tok, sid, gid)
+    if df_live.empty:
+        return None
+    return dashboard_state(tok, sid, gid, league_mix_cfb, prior_strength, prior_version())
+
+@st.fragment(run_every=VIEWER_POLL_S)
+def viewer_metrics(sid: str, gid: str, league_mix_cfb: float, prior_strength: float) -> None:
+    dash = _viewer_dash(sid, gid, "posteriors", league_mix_cfb, prior_strength)
+    if dash is not None:
+        render_metrics(dash, league_mix_cfb, prior_strength)
+        st.divider()
+        render_posteriors(dash)
+
+@st.fragment(run_every=VIEWER_POLL_S)
+def viewer_previews(sid: str, gid: str, league_mix_cfb: float, prior_strength: float) -> None:
+    dash = _viewer_dash(sid, gid, "previews", league_mix_cfb, prior_strength)
+    if dash is not None:
+        render_previews(dash)
+
+@st.fragment(run_every=VIEWER_POLL_S)
+def viewer_epa(sid: str, gid: str, league_mix_cfb: float, prior_strength: float) -> None:
+    dash = _viewer_dash(sid, gid, "epa", league_mix_cfb, prior_strength)
+    if dash is not None:
+        render_epa(dash)
+
+@st.fragment(run_every=VIEWER_POLL_S)
+def viewer_summary(sid: str, gid: str) -> None:
+    last_n = summary_window("viewer_summary_window")
+    render_summary(*coach_summaries(game_token(sid, gid, "summary"), sid, gid, last_n))
+
+def render_viewer() -> None:
+    st.title("PV Coaching Dashboard — Viewer")
+    games = game_list(store_version())
+    if not games:
+        st.warning("No plays yet.")
+        st.stop()
+
+    with st.sidebar:
+        sid, gid = st.selectbox("Game", games, index=len(games) - 1, format_func=lambda g: f"{g[1]} ({g[0]})")
+        league_mix_cfb = st.slider("CFB weight (NFL=0, CFB=1)", 0.0, 1.0, 0.5, 0.05)
+        prior_strength = st.slider("Prior strength (pseudo-plays)", 0.2, 4.0, 1.0, 0.1)
+        lst = change_listener()
+        st.caption("Live: push updates from service.py" if lst.connected
+                   else f"Live: polling the store every {VIEWER_POLL_S:g}s (start service.py for push updates)")
+
+    viewer_situation(sid, gid)
+    st.divider()
+    viewer_metrics(sid, gid, float(league_mix_cfb), float(prior_strength))
+    st.divider()
+    viewer_previews(sid, gid, float(league_mix_cfb), float(prior_strength))
+    st.divider()
+    viewer_epa(sid, gid, float(league_mix_cfb), float(prior_strength))
+    st.divider()
+    viewer_summary(sid, gid)
+
+# =====================================================
+# STREAMLIT CONFIG
+# =====================================================
+st.set_page_config(page_title="PV Tagger + Coaching Dashboard", layout="wide")
+prior_watcher()
+
+if st.query_params.get("mode") == "viewer":
+    render_viewer()
+    st.stop()
+
+st.title("PV Tagger + Coaching Dashboard — Live Tagger + Coaching Probs + Coach Summary")
+
+# =====================================================
+# SESSION STATE
+# =====================================================
+if "session_id" not in st.session_state:
+    st.session_state.session_id = str(uuid.uuid4())[:8]
+if "game_id" not in st.session_state:
+    st.session_state.game_id = "practice_game"
+if "play_no" not in st.session_state:
+    st.session_state.play_no = 1
+if "pv_possession" not in st.session_state:
+    st.session_state.pv_possession = "PV_DEF"
+if "opponent" not in st.session_state:
+    st.session_state.opponent = ""
+if "season" not in st.session_state:
+    st.session_state.season = time.localtime().tm_year
+
+# =====================================================
+# TOP BAR
+# =====================================================
+top = st.columns([1.2, 1.6, 1.2, 0.8, 1, 1, 1.5])
+with top[0]:
+    st.text_input("Session", value=st.session_state.session_id, disabled=True)
+with top[1]:
+    st.session_state.game_id = st.text_input("Game ID", value=st.session_state.game_id)
+with top[2]:
+    st.session_state.opponent = st.text_input("Opponent", value=st.session_state.opponent)
+with top[3]:
+    st.session_state.season = st.number_input("Season", min_value=0, value=int(st.session_state.season), step=1)
+with top[4]:
+    st.session_state.play_no = st.number_input("Play #", min_value=1, value=int(st.session_state.play_no), step=1)
+with top[5]:
+    st.session_state.pv_possession = st.selectbox(
+        "PV Possession",
+        ["PV_OFF", "PV_DEF"],
+        index=0 if st.session_state.pv_possession == "PV_OFF" else 1
+    )
+with top[6]:
+    st.button("➕ Next Play", use_container_width=True, on_click=on_next_play)
+
+st.divider()
+tab_tagger, tab_dash, tab_scout = st.tabs(["🏷️ Tagger + Import", "📊 Coaching Dashboard", "📈 Season Scouting"])
+
+# =====================================================
+# TAGGER TAB
+# =====================================================
+with tab_tagger:
+    st.subheader("Fast Tagger (Buckets Only) + CSV Importer")
+    show_flash()
+
+    with st.expander("📥 Import CSV into database (upsert)", expanded=False):
+        uploaded = st.file_uploader("Upload CSV", type=["csv"], accept_multiple_files=False)
+        if uploaded is not None:
+            try:
+                df_imp = pd.read_csv(uploaded, dtype={c: str for c in LABEL_COLS})
+
+                if "session_id" not in df_imp.columns:
+                    df_imp["session_id"] = st.session_state.session_id
+                    st.warning("CSV missing session_id — auto-filled with current session.")
+                if "game_id" not in df_imp.columns:
+                    df_imp["game_id"] = st.session_state.game_id
+                    st.warning("CSV missing game_id — auto-filled with current game_id.")
+                if "opponent" not in df_imp.columns and st.session_state.opponent.strip():
+                    df_imp["opponent"] = st.session_state.opponent.strip()
+                if "season" not in df_imp.columns and int(st.session_state.season):
+                    df_imp["season"] = int(st.session_state.season)
+
+                req = ["session_id", "game_id", "play_no"]
+                missing = [c for c in req if c not in df_imp.columns]
+                if missing:
+                    st.error(f"Missing required columns: {missing}")
+                else:
+                    df_imp["play_no"] = pd.to_numeric(df_imp["play_no"], errors="coerce").fillna(0).astype(int)
+                    if "ts" not in df_imp.columns:
+                        df_imp["ts"] = time.time()
+
+                    for bcol in ["hurry_up", "goal_to_go", "first_down", "td", "timeout_used"]:
+                        if bcol in df_imp.columns:
+                            df_imp[bcol] = df_imp[bcol].astype(str).str.lower().isin(["true", "1", "yes", "y"])
+
+                    st.dataframe(df_imp.head(25), use_container_width=True, height=280)
+                    st.button("✅ Import / Upsert", use_container_width=True, on_click=on_import, args=(df_imp,))
+            except Exception as e:
+                st.error("Import failed.")
+                st.exception(e)
+
+    st.divider()
+
+    left, right = st.columns([1.25, 0.75])
+
+    with left:
+        st.markdown("### Situation")
+        r1 = st.columns([1, 1.6, 1, 1, 1.1])
+        with r1[0]:
+            quarter = st.selectbox("Q", [1, 2, 3, 4], key="tag_q")
+        with r1[1]:
+            clock_bucket = st.selectbox("Clock Bucket", CLOCK_BUCKETS, index=0, key="tag_clock_bucket")
+        with r1[2]:
+            hurry_up = st.toggle("HURRY UP", value=False, key="tag_hurry")
+        with r1[3]:
+            down = st.selectbox("Down", [1, 2, 3, 4], key="tag_down")
+        with r1[4]:
+            dist_bucket = st.selectbox("Dist Bucket", DIST_BUCKETS, index=0, key="tag_dist_bucket")
+
+        r2 = st.columns([1.2, 1])
+        with r2[0]:
+            field_zone = st.selectbox("Field Zone", FIELD_ZONES, index=FIELD_ZONES.index("MIDFIELD"), key="tag_field_zone")
+        with r2[1]:
+            goal_to_go = st.toggle("GOAL TO GO", value=False, key="tag_gtg")
+
+        st.markdown("### Opponent / Defensive Look (optional)")
+        p1, p2 = st.columns(2)
+        with p1:
+            opp_personnel = st.selectbox("Opp Personnel", PERSONNEL, index=PERSONNEL.index("11"), key="tag_pers")
+            opp_formation = st.selectbox("Opp Formation", FORMATION, index=FORMATION.index("2x2"), key="tag_form")
+        with p2:
+            def_shell = st.selectbox("Def Shell (0/1/2-high)", SHELL, key="tag_shell")
+            pressure = st.selectbox("Pressure (4 vs 5+)", PRESSURE, key="tag_press")
+
+        st.caption("Tag fast. Label results after the play (or during stoppages).")
+
+    with right:
+        st.markdown("### Submit")
+        st.button("✅ SUBMIT TAG (FAST)", use_container_width=True, key="btn_submit", on_click=on_submit_tag)
+
+        st.divider()
+        st.markdown("### Label / Edit (apply to ANY play)")
+
+        df_all = events_at(store_version())
+        df_sg = list_session_game(df_all, st.session_state.session_id, st.session_state.game_id)
+        play_options = df_sg["play_no"].astype(int).tolist() if not df_sg.empty else []
+        selected_play = st.selectbox(
+            "Select Play #",
+            options=play_options if play_options else [max(1, int(st.session_state.play_no) - 1)],
+            index=len(play_options) - 1 if play_options else 0,
+            key="sel_play"
+        )
+
+        call_type = st.selectbox("Call Type", CALL_TYPES, index=0, key="lab_call")
+
+        cA, cB = st.columns(2)
+        with cA:
+            first_down = st.toggle("First Down", value=False, key="lab_fd")
+            td = st.toggle("TD", value=False, key="lab_td")
+            yards_bucket = st.selectbox("Yards Bucket", YARDS_BUCKETS, index=0, key="lab_yards")
+            timeout_used = st.toggle("Timeout used (between plays)", value=False, key="lab_to_used")
+        with cB:
+            pass_result = st.selectbox("Pass Result", PASS_RESULT, index=0, key="lab_pass_res")
+            turnover = st.selectbox("Turnover", TURNOVER_RESULT, index=0, key="lab_to")
+
+        if td:
+            st.radio("After TD: 2pt or Kick?", TWO_PT_CHOICE, horizontal=True, key="lab_2pt")
+
+        st.button("💾 APPLY LABELS", use_container_width=True, key="btn_apply_labels", on_click=on_apply_labels)
+
+    st.divider()
+    st.markdown("### Latest Plays (this session/game)")
+    exp_df = game_export(store_version(), st.session_state.session_id, st.session_state.game_id)
+    if exp_df.empty:
+        st.info("No plays yet.")
+    else:
+        st.dataframe(exp_df.tail(40), use_container_width=True, height=360)
+        st.download_button(
+            "⬇️ Download this game CSV (re-importable)",
+            data=exp_df.to_csv(index=False).encode("utf-8"),
+            file_name=f"{st.session_state.game_id}_{st.session_state.session_id}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+
+    with st.expander("📤 Bulk export (sessions / games / dates → Parquet, Arrow, CSV)", expanded=False):
+        st.caption(f"Streams to a file under {EXPORT_DIR} in batches; re-import with tools/export_events.py --import.")
+        all_games = game_list(store_version())
+        e1, e2, e3 = st.columns([1.4, 1.4, 1])
+        with e1:
+            exp_sessions = st.multiselect("Sessions (blank = all)", sorted({g[0] for g in all_games}), key="exp_sessions")
+        with e2:
+            exp_games = st.multiselect("Games (blank = all)", sorted({g[1] for g in all_games}), key="exp_games")
+        with e3:
+            exp_fmt = st.selectbox("Format", ["parquet", "arrow", "csv"], key="exp_fmt")
+        exp_dates = st.date_input("Tagged between (optional)", value=(), key="exp_dates")
+        if st.button("Export", key="btn_bulk_export"):
+            start, end = (exp_dates[0], exp_dates[1] + pd.Timedelta(days=1)) if len(exp_dates) == 2 else (None, None)
+            from export import export_events
+            out = EXPORT_DIR / time.strftime(f"events-%Y%m%d-%H%M%S.{exp_fmt}")
+            n = export_events(out, sessions=exp_sessions or None, games=exp_games or None, start=start, end=end)
+            st.success(f"Wrote {n} plays -> {out}")
+
+# =====================================================
+# DASHBOARD TAB
+# =====================================================
+with tab_dash:
+    st.subheader("Coaching Dashboard (Full probs + 3rd→4th Preview + TD→2pt Preview + Coach Summary)")
+    t_dash = time.perf_counter()
+
+    version = store_version()
+    sid, gid = st.session_state.session_id, st.session_state.game_id
+    df_live, df_labeled = game_frames(version, sid, gid)
+    if df_live.empty:
+        # no st.stop() here: it would also skip the scouting tab, which has its own data
+        st.warning("No plays yet. Tag a few plays first.")
+    else:
+        render_situation(df_live.tail(1).iloc[0].to_dict())
+
+        st.divider()
+        st.markdown("### Prior Controls (CFB + NFL)")
+        c1, c2, c3 = st.columns([1.1, 1.1, 1.1])
+        with c1:
+            league_mix_cfb = st.slider("CFB weight (NFL=0, CFB=1)", 0.0, 1.0, 0.5, 0.05, key="league_mix_cfb")
+        with c2:
+            prior_strength = st.slider("Prior strength (pseudo-plays)", 0.2, 4.0, 1.0, 0.1, key="prior_strength")
+        with c3:
+            st.caption("4th-down preview triggers after 3rd-down NO first down; 2pt preview after TD.")
+
+        if pd.isna(df_live.tail(1).iloc[0].get("call_type")):
+            # latest play is live: work out its previews for every possible result now
+            speculator().submit(version, sid, gid, df_live, float(league_mix_cfb), float(prior_strength))
+
+        # Previews speculated for this label render before the full recompute below
+        st.divider()
+        metrics_slot = st.container()
+        st.divider()
+        previews_slot = st.container()
+        spec = speculated_previews(version, sid, gid, league_mix_cfb, prior_strength)
+        if spec is not None:
+            with previews_slot:
+                render_previews(spec)
+
+        dash = dashboard_state(version, sid, gid, float(league_mix_cfb), float(prior_strength), prior_version())
+
+        with metrics_slot:
+            render_metrics(dash, league_mix_cfb, prior_strength)
+        if spec is None:
+            with previews_slot:
+                render_previews(dash)
+        st.divider()
+        render_posteriors(dash)
+        st.divider()
+        latest = df_live.tail(1).iloc[0]
+        render_comparables(comparables_for(version, historical_version(), {c: latest.get(c) for c in FEATURE_COLS},
+                                           (sid, gid, latest.get("play_no"))))
+        st.divider()
+        render_epa(dash)
+
+        # ============================
+        # NEW: COACH SUMMARY (4 sentences each side)
+        # ============================
+        st.divider()
+        last_n = summary_window("summary_window")
+        render_summary(*coach_summaries(version, sid, gid, last_n))
+        if tracing_enabled():
+            record("app.dashboard_tab", time.perf_counter() - t_dash)
+
+# =====================================================
+# SEASON SCOUTING TAB
+# Reports merge per-game rollup tables (analytics/rollups.py) instead of
+# regrouping every event, so a season of games stays interactive.
+# =====================================================
+with tab_scout:
+    st.subheader("Season Scouting — cross-game tendencies")
+    from analytics.rollups import tendency_report, ROLLUP_DIMS, ROLLUP_FIELDS
+    rollups = season_rollups(store_version())
+    if rollups.empty:
+        st.info("No tagged plays yet.")
+    else:
+        f1, f2, f3, f4, f5 = st.columns([1.2, 1, 1, 1.2, 1.6])
+        with f1:
+            opps = sorted(rollups["opponent"].unique())
+            scout_opp = st.selectbox("Opponent", ["All"] + opps, key="scout_opp")
+        with f2:
+            seasons = sorted(int(x) for x in rollups["season"].unique())
+            scout_season = st.selectbox("Season", ["All"] + seasons, key="scout_season")
+        with f3:
+            scout_side = st.selectbox("Side", ["PV_DEF", "PV_OFF"], key="scout_side",
+                                      help="PV_DEF = opponent offense vs. us; PV_OFF = our offense vs. them")
+        with f4:
+            scout_field = st.selectbox("Tendency", ROLLUP_FIELDS, key="scout_field")
+        with f5:
+            scout_by = st.multiselect("Split by", ROLLUP_DIMS[1:], default=["down"], key="scout_by")
+
+        rep = tendency_report(
+            rollups, pv_possession=scout_side, field=scout_field, by=scout_by,
+            opponent=None if scout_opp == "All" else scout_opp,
+            season=None if scout_season == "All" else int(scout_season),
+        )
+        if rep.empty:
+            st.info("No matching tagged plays.")
+        else:
+            st.caption(f"{int(rep['games'].max())} game(s), {int(rep['n'].sum())} tagged plays")
+            if scout_by:
+                wide = rep.pivot_table(index=scout_by, columns="value", values="share", fill_value=0.0)
+                wide.insert(0, "n", rep.groupby(scout_by)["n"].sum())
+                st.dataframe(wide.style.format("{:.0%}", subset=[c for c in wide.columns if c != "n"]),
+                             use_container_width=True)
+            else:
+                st.dataframe(rep.style.format({"share": "{:.0%}"}), use_container_width=True, hide_index=True)
@@ -1,259 +1,206 @@
-from pathlib import Path
-
-# =====================================================
-# Paths
-# =====================================================
-BASE_DIR = Path(__file__).resolve().parent
-DATA_DIR = BASE_DIR / "data"
-ARTIFACTS_DIR = BASE_DIR / "artifacts"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
-ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
-
-DB_PATH = DATA_DIR / "events.parquet"
-
-# =====================================================
-# Buckets
-# =====================================================
-CLOCK_BUCKETS = [
-    "15-10",
-    "10-7",
-    "7-6",
-    "5-3",
-    "3-2",
-    "2-0",
-    "SCRIPT_START",
-    "OTHER",
-]
-DIST_BUCKETS = ["SHORT", "MEDIUM", "LONG", "X_LONG", "UNK"]
-FIELD_ZONES = ["LOW_RED", "HIGH_RED", "MIDFIELD", "OWN_SIDE", "BACKED_UP", "UNK"]
-
-# Simple “in-range” defs (bucket-world)
-# CFB: mostly red zone range
-FG_RANGE_ZONES_CFB = {"LOW_RED", "HIGH_RED"}
-# NFL: red zone + fringe (midfield sometimes)
-FG_RANGE_ZONES_NFL = {"LOW_RED", "HIGH_RED", "MIDFIELD"}
-
-# =====================================================
-# Taxonomy
-# =====================================================
-PERSONNEL = ["UNK", "10", "11", "12", "13", "20", "21", "22"]
-FORMATION = ["UNK", "2x2", "3x1", "trips", "bunch", "empty", "compressed"]
-SHELL = ["UNK", "0", "1", "2"]
-PRESSURE = ["UNK", "4", "5+"]
-
-# =====================================================
-# Call types (what the play IS)
-# =====================================================
-CALL_TYPES = [
-    "RUN",
-    "PASS_QUICK",
-    "PASS_DROPBACK",
-    "PLAY_ACTION",
-    "SCREEN",
-    "SHOT",
-    "PUNT",
-    "FIELD_GOAL",
-    "KICKOFF",
-    "PAT_KICK",
-    "TWO_POINT",
-    "SACK",
-    "PENALTY",
-]
-
-# =====================================================
-# Results / outcomes
-# =====================================================
-PASS_RESULT = ["NA", "COMPLETE", "INCOMPLETE"]
-TURNOVER_RESULT = ["NONE", "INT", "FUMBLE", "PICK6", "SCOOP6"]
-YARDS_BUCKETS = ["NA", "NEG", "0-2", "3-6", "7-10", "11-20", "21+"]
-
-# 4th down decision + 2pt decision
-GO_NO_GO = ["GO", "NO_GO"]
-TWO_PT_CHOICE = ["KICK", "TWO"]
-
-# =====================================================
-# Priors for offensive call family (CFB + NFL)
-# =====================================================
-_PRIOR_CFB = {
-    (1, "SHORT"):   {"RUN": 40, "PASS_QUICK": 16, "PASS_DROPBACK": 12, "PLAY_ACTION": 10, "SCREEN": 6, "SHOT": 6, "SACK": 1, "PENALTY": 1},
-    (1, "MEDIUM"):  {"RUN": 28, "PASS_QUICK": 18, "PASS_DROPBACK": 18, "PLAY_ACTION": 12, "SCREEN": 8, "SHOT": 8, "SACK": 1, "PENALTY": 1},
-    (1, "LONG"):    {"RUN": 16, "PASS_QUICK": 14, "PASS_DROPBACK": 28, "PLAY_ACTION": 10, "SCREEN": 10, "SHOT": 10, "SACK": 1, "PENALTY": 1},
-    (1, "X_LONG"):  {"RUN": 10, "PASS_QUICK": 12, "PASS_DROPBACK": 34, "PLAY_ACTION": 8,  "SCREEN": 12, "SHOT": 12, "SACK": 1, "PENALTY": 1},
-
-    (2, "SHORT"):   {"RUN": 36, "PASS_QUICK": 18, "PASS_DROPBACK": 12, "PLAY_ACTION": 10, "SCREEN": 6, "SHOT": 6, "SACK": 1, "PENALTY": 1},
-    (2, "MEDIUM"):  {"RUN": 24, "PASS_QUICK": 18, "PASS_DROPBACK": 22, "PLAY_ACTION": 12, "SCREEN": 8, "SHOT": 8, "SACK": 1, "PENALTY": 1},
-    (2, "LONG"):    {"RUN": 12, "PASS_QUICK": 14, "PASS_DROPBACK": 32, "PLAY_ACTION": 10, "SCREEN": 12, "SHOT": 10, "SACK": 1, "PENALTY": 1},
-    (2, "X_LONG"):  {"RUN": 8,  "PASS_QUICK": 12, "PASS_DROPBACK": 36, "PLAY_ACTION": 8,  "SCREEN": 14, "SHOT": 12, "SACK": 1, "PENALTY": 1},
-
-    (3, "SHORT"):   {"RUN": 24, "PASS_QUICK": 20, "PASS_DROPBACK": 18, "PLAY_ACTION": 8,  "SCREEN": 6, "SHOT": 6, "SACK": 1, "PENALTY": 1},
-    (3, "MEDIUM"):  {"RUN": 10, "PASS_QUICK": 16, "PASS_DROPBACK": 38, "PLAY_ACTION": 8,  "SCREEN": 12, "SHOT": 12, "SACK": 2, "PENALTY": 2},
-    (3, "LONG"):    {"RUN": 6,  "PASS_QUICK": 12, "PASS_DROPBACK": 44, "PLAY_ACTION": 6,  "SCREEN": 14, "SHOT": 14, "SACK": 3, "PENALTY": 2},
-    (3, "X_LONG"):  {"RUN": 4,  "PASS_QUICK": 10, "PASS_DROPBACK": 46, "PLAY_ACTION": 4,  "SCREEN": 16, "SHOT": 16, "SACK": 3, "PENALTY": 1},
-
-    (4, "SHORT"):   {"RUN": 18, "PASS_QUICK": 12, "PASS_DROPBACK": 16, "PLAY_ACTION": 4,  "SCREEN": 8, "SHOT": 6, "SACK": 2, "PENALTY": 2},
-    (4, "MEDIUM"):  {"RUN": 8,  "PASS_QUICK": 12, "PASS_DROPBACK": 34, "PLAY_ACTION": 3,  "SCREEN": 16, "SHOT": 14, "SACK": 2, "PENALTY": 1},
-    (4, "LONG"):    {"RUN": 5,  "PASS_QUICK": 10, "PASS_DROPBACK": 40, "PLAY_ACTION": 2,  "SCREEN": 18, "SHOT": 18, "SACK": 2, "PENALTY": 1},
-    (4, "X_LONG"):  {"RUN": 4,  "PASS_QUICK": 8,  "PASS_DROPBACK": 44, "PLAY_ACTION": 2,  "SCREEN": 20, "SHOT": 18, "SACK": 2, "PENALTY": 0},
-}
-
-_PRIOR_NFL = {
-    (1, "SHORT"):   {"RUN": 34, "PASS_QUICK": 20, "PASS_DROPBACK": 12, "PLAY_ACTION": 10, "SCREEN": 6, "SHOT": 6, "SACK": 1, "PENALTY": 1},
-    (1, "MEDIUM"):  {"RUN": 22, "PASS_QUICK": 20, "PASS_DROPBACK": 22, "PLAY_ACTION": 12, "SCREEN": 8, "SHOT": 8, "SACK": 1, "PENALTY": 1},
-    (1, "LONG"):    {"RUN": 10, "PASS_QUICK": 14, "PASS_DROPBACK": 36, "PLAY_ACTION": 8,  "SCREEN": 14, "SHOT": 14, "SACK": 2, "PENALTY": 2},
-    (1, "X_LONG"):  {"RUN": 6,  "PASS_QUICK": 12, "PASS_DROPBACK": 40, "PLAY_ACTION": 6,  "SCREEN": 16, "SHOT": 16, "SACK": 2, "PENALTY": 2},
-
-    (2, "SHORT"):   {"RUN": 28, "PASS_QUICK": 22, "PASS_DROPBACK": 14, "PLAY_ACTION": 10, "SCREEN": 6, "SHOT": 6, "SACK": 2, "PENALTY": 2},
-    (2, "MEDIUM"):  {"RUN": 16, "PASS_QUICK": 18, "PASS_DROPBACK": 30, "PLAY_ACTION": 10, "SCREEN": 12, "SHOT": 10, "SACK": 2, "PENALTY": 2},
-    (2, "LONG"):    {"RUN": 8,  "PASS_QUICK": 12, "PASS_DROPBACK": 44, "PLAY_ACTION": 6,  "SCREEN": 16, "SHOT": 12, "SACK": 2, "PENALTY": 2},
-    (2, "X_LONG"):  {"RUN": 6,  "PASS_QUICK": 10, "PASS_DROPBACK": 46, "PLAY_ACTION": 5,  "SCREEN": 16, "SHOT": 13, "SACK": 2, "PENALTY": 2},
-
-    (3, "SHORT"):   {"RUN": 14, "PASS_QUICK": 22, "PASS_DROPBACK": 30, "PLAY_ACTION": 6,  "SCREEN": 12, "SHOT": 10, "SACK": 3, "PENALTY": 3},
-    (3, "MEDIUM"):  {"RUN": 6,  "PASS_QUICK": 16, "PASS_DROPBACK": 52, "PLAY_ACTION": 4,  "SCREEN": 12, "SHOT": 8,  "SACK": 2, "PENALTY": 2},
-    (3, "LONG"):    {"RUN": 4,  "PASS_QUICK": 12, "PASS_DROPBACK": 56, "PLAY_ACTION": 3,  "SCREEN": 12, "SHOT": 8,  "SACK": 3, "PENALTY": 2},
-    (3, "X_LONG"):  {"RUN": 3,  "PASS_QUICK": 10, "PASS_DROPBACK": 58, "PLAY_ACTION": 2,  "SCREEN": 13, "SHOT": 8,  "SACK": 4, "PENALTY": 2},
-
-    (4, "SHORT"):   {"RUN": 14, "PASS_QUICK": 14, "PASS_DROPBACK": 40, "PLAY_ACTION": 2,  "SCREEN": 14, "SHOT": 10, "SACK": 3, "PENALTY": 3},
-    (4, "MEDIUM"):  {"RUN": 5,  "PASS_QUICK": 12, "PASS_DROPBACK": 58, "PLAY_ACTION": 2,  "SCREEN": 14, "SHOT": 7,  "SACK": 1, "PENALTY": 1},
-    (4, "LONG"):    {"RUN": 3,  "PASS_QUICK": 10, "PASS_DROPBACK": 60, "PLAY_ACTION": 2,  "SCREEN": 13, "SHOT": 8,  "SACK": 2, "PENALTY": 2},
-    (4, "X_LONG"):  {"RUN": 2,  "PASS_QUICK": 8,  "PASS_DROPBACK": 62, "PLAY_ACTION": 2,  "SCREEN": 14, "SHOT": 8,  "SACK": 2, "PENALTY": 2},
-}
-
-# =====================================================
-# Context multipliers
-# =====================================================
-ZONE_MULT = {
-    "LOW_RED":   {"RUN": 1.25, "SHOT": 0.70, "SCREEN": 0.90},
-    "HIGH_RED":  {"RUN": 1.10, "SHOT": 0.85},
-    "MIDFIELD":  {},
-    "OWN_SIDE":  {"SHOT": 0.95},
-    "BACKED_UP": {"RUN": 0.85, "PASS_QUICK": 1.10, "SCREEN": 1.10},
-    "UNK":       {},
-}
-CLOCK_MULT = {
-    "SCRIPT_START": {"PLAY_ACTION": 1.10, "SHOT": 1.05},
-    "15-10":        {"PLAY_ACTION": 1.05},
-    "2-0":          {"PASS_QUICK": 1.10, "SHOT": 0.90, "RUN": 0.90},
-    "OTHER":        {},
-}
-HURRY_MULT = {"PASS_QUICK": 1.15, "SCREEN": 1.05, "PLAY_ACTION": 0.85}
-GOAL_TO_GO_MULT = {"RUN": 1.20, "SHOT": 0.80, "PLAY_ACTION": 1.05}
-AFTER_FIRST_DOWN_MULT = {"RUN": 1.05, "PLAY_ACTION": 1.05}
-
-# =====================================================
-# Pressure priors (P(5+) vs P(4)), keyed by (down, dist_bucket)
-# =====================================================
-PRESSURE_PRIOR = {
-    (1, "SHORT"):  {"4": 34, "5+": 6},
-    (1, "MEDIUM"): {"4": 32, "5+": 8},
-    (1, "LONG"):   {"4": 30, "5+": 10},
-    (1, "X_LONG"): {"4": 28, "5+": 12},
-
-    (2, "SHORT"):  {"4": 32, "5+": 8},
-    (2, "MEDIUM"): {"4": 30, "5+": 10},
-    (2, "LONG"):   {"4": 28, "5+": 12},
-    (2, "X_LONG"): {"4": 26, "5+": 14},
-
-    (3, "SHORT"):  {"4": 30, "5+": 10},
-    (3, "MEDIUM"): {"4": 26, "5+": 14},
-    (3, "LONG"):   {"4": 24, "5+": 16},
-    (3, "X_LONG"): {"4": 22, "5+": 18},
-
-    (4, "SHORT"):  {"4": 26, "5+": 14},
-    (4, "MEDIUM"): {"4": 22, "5+": 18},
-    (4, "LONG"):   {"4": 20, "5+": 20},
-    (4, "X_LONG"): {"4": 18, "5+": 22},
-}
-
-# =====================================================
-# Timeout usage priors: P(timeout_used=True)
-# keyed by (quarter, clock_bucket, hurry_up)
-# =====================================================
-TIMEOUT_PRIOR = {
-    (2, "3-2", False): {"NO": 34, "YES": 6},
-    (2, "2-0", False): {"NO": 28, "YES": 12},
-    (2, "3-2", True):  {"NO": 26, "YES": 14},
-    (2, "2-0", True):  {"NO": 18, "YES": 22},
-
-    (4, "3-2", False): {"NO": 32, "YES": 8},
-    (4, "2-0", False): {"NO": 24, "YES": 16},
-    (4, "3-2", True):  {"NO": 24, "YES": 16},
-    (4, "2-0", True):  {"NO": 16, "YES": 24},
-}
-
-# =====================================================
-# NEW: 4th-down decision priors (GO vs PUNT vs FIELD_GOAL)
-# keyed by (dist_bucket, field_zone)
-# These reflect typical CFB vs NFL tendencies in a bucketed way.
-# =====================================================
-FOURTH_TRI_CFB = {
-    ("SHORT", "LOW_RED"):   {"GO": 26, "FIELD_GOAL": 10, "PUNT": 4},
-    ("SHORT", "HIGH_RED"):  {"GO": 18, "FIELD_GOAL": 16, "PUNT": 6},
-    ("SHORT", "MIDFIELD"):  {"GO": 10, "FIELD_GOAL": 2,  "PUNT": 28},
-    ("SHORT", "OWN_SIDE"):  {"GO": 4,  "FIELD_GOAL": 0.5,"PUNT": 35},
-    ("SHORT", "BACKED_UP"): {"GO": 2,  "FIELD_GOAL": 0.2,"PUNT": 38},
-
-    ("MEDIUM", "LOW_RED"):   {"GO": 16, "FIELD_GOAL": 16, "PUNT": 8},
-    ("MEDIUM", "HIGH_RED"):  {"GO": 10, "FIELD_GOAL": 22, "PUNT": 8},
-    ("MEDIUM", "MIDFIELD"):  {"GO": 6,  "FIELD_GOAL": 1,  "PUNT": 33},
-    ("MEDIUM", "OWN_SIDE"):  {"GO": 2,  "FIELD_GOAL": 0.2,"PUNT": 38},
-    ("MEDIUM", "BACKED_UP"): {"GO": 1,  "FIELD_GOAL": 0.1,"PUNT": 39},
-
-    ("LONG", "LOW_RED"):   {"GO": 8,  "FIELD_GOAL": 26, "PUNT": 6},
-    ("LONG", "HIGH_RED"):  {"GO": 4,  "FIELD_GOAL": 30, "PUNT": 6},
-    ("LONG", "MIDFIELD"):  {"GO": 3,  "FIELD_GOAL": 0.5,"PUNT": 36},
-    ("LONG", "OWN_SIDE"):  {"GO": 1,  "FIELD_GOAL": 0.1,"PUNT": 39},
-    ("LONG", "BACKED_UP"): {"GO": 0.5,"FIELD_GOAL": 0.1,"PUNT": 39.4},
-
-    ("X_LONG", "LOW_RED"):   {"GO": 5,  "FIELD_GOAL": 30, "PUNT": 5},
-    ("X_LONG", "HIGH_RED"):  {"GO": 3,  "FIELD_GOAL": 32, "PUNT": 5},
-    ("X_LONG", "MIDFIELD"):  {"GO": 2,  "FIELD_GOAL": 0.2,"PUNT": 37.8},
-    ("X_LONG", "OWN_SIDE"):  {"GO": 0.5,"FIELD_GOAL": 0.1,"PUNT": 39.4},
-    ("X_LONG", "BACKED_UP"): {"GO": 0.2,"FIELD_GOAL": 0.1,"PUNT": 39.7},
-}
-
-FOURTH_TRI_NFL = {
-    ("SHORT", "LOW_RED"):   {"GO": 22, "FIELD_GOAL": 14, "PUNT": 4},
-    ("SHORT", "HIGH_RED"):  {"GO": 14, "FIELD_GOAL": 22, "PUNT": 4},
-    ("SHORT", "MIDFIELD"):  {"GO": 8,  "FIELD_GOAL": 8,  "PUNT": 24},
-    ("SHORT", "OWN_SIDE"):  {"GO": 3,  "FIELD_GOAL": 1,  "PUNT": 36},
-    ("SHORT", "BACKED_UP"): {"GO": 1.5,"FIELD_GOAL": 0.2,"PUNT": 38.3},
-
-    ("MEDIUM", "LOW_RED"):   {"GO": 14, "FIELD_GOAL": 20, "PUNT": 6},
-    ("MEDIUM", "HIGH_RED"):  {"GO": 8,  "FIELD_GOAL": 26, "PUNT": 6},
-    ("MEDIUM", "MIDFIELD"):  {"GO": 5,  "FIELD_GOAL": 10, "PUNT": 25},
-    ("MEDIUM", "OWN_SIDE"):  {"GO": 2,  "FIELD_GOAL": 1,  "PUNT": 37},
-    ("MEDIUM", "BACKED_UP"): {"GO": 1,  "FIELD_GOAL": 0.2,"PUNT": 38.8},
-
-    ("LONG", "LOW_RED"):   {"GO": 8,  "FIELD_GOAL": 30, "PUNT": 2},
-    ("LONG", "HIGH_RED"):  {"GO": 4,  "FIELD_GOAL": 34, "PUNT": 2},
-    ("LONG", "MIDFIELD"):  {"GO": 3,  "FIELD_GOAL": 12, "PUNT": 25},
-    ("LONG", "OWN_SIDE"):  {"GO": 1,  "FIELD_GOAL": 1,  "PUNT": 38},
-    ("LONG", "BACKED_UP"): {"GO": 0.5,"FIELD_GOAL": 0.2,"PUNT": 39.3},
-
-    ("X_LONG", "LOW_RED"):   {"GO": 5,  "FIELD_GOAL": 34, "PUNT": 1},
-    ("X_LONG", "HIGH_RED"):  {"GO": 3,  "FIELD_GOAL": 36, "PUNT": 1},
-    ("X_LONG", "MIDFIELD"):  {"GO": 2,  "FIELD_GOAL": 10, "PUNT": 28},
-    ("X_LONG", "OWN_SIDE"):  {"GO": 0.5,"FIELD_GOAL": 0.5,"PUNT": 39},
-    ("X_LONG", "BACKED_UP"): {"GO": 0.2,"FIELD_GOAL": 0.2,"PUNT": 39.6},
-}
-
-# Keep your older GO/NO_GO and TWO_PT priors (used elsewhere)
-FOURTH_PRIOR = {}
-TWO_PT_PRIOR = {"TWO": 4, "KICK": 36}
-
-# =====================================================
-# Helper for blending CFB/NFL priors
-# =====================================================
-def get_base_alpha(down: int, dist_bucket: str, league_mix_cfb: float) -> dict:
-    key = (int(down), str(dist_bucket))
-    cfb = _PRIOR_CFB.get(key)
-    nfl = _PRIOR_NFL.get(key)
-    if cfb is None and nfl is None:
-        cfb = {"RUN": 20, "PASS_QUICK": 15, "PASS_DROPBACK": 25, "PLAY_ACTION": 10, "SCREEN": 10, "SHOT": 10, "SACK": 5, "PENALTY": 5}
-        nfl = cfb
-
-    offense_keys = ["RUN", "PASS_QUICK", "PASS_DROPBACK", "PLAY_ACTION", "SCREEN", "SHOT", "SACK", "PENALTY"]
-    out = {}
-    for k in offense_keys:
-        out[k] = league_mix_cfb * float(cfb.get(k, 0)) + (1.0 - league_mix_cfb) * float(nfl.get(k, 0))
-    return out
+from pathlib import Path
+
+# =====================================================
+# Paths
+# =====================================================
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "data"
+ARTIFACTS_DIR = BASE_DIR / "artifacts"
+
+def ensure_dir(path: Path) -> Path:
+    """
+    Create the directory a file path lives in, on first write. Importing config
+    never touches the disk, so read-only tools and workers start clean.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+DB_PATH = DATA_DIR / "events.parquet"
+# Multi-season history: HIST_DIR/league=<CFB|NFL>/season=<yyyy>/ (see historical.py)
+HIST_DIR = DATA_DIR / "historical"
+# Legacy single-file history, read only when HIST_DIR is empty
+HIST_PATH = DATA_DIR / "historical_events.parquet"
+SCORED_DIR = DATA_DIR / "scored"
+# Per-game tendency tables for season/opponent reports (analytics/rollups.py)
+ROLLUP_PATH = DATA_DIR / "rollups.parquet"
+# Bulk exports (export.py): default output folder and rows per streamed batch
+EXPORT_DIR = DATA_DIR / "exports"
+EXPORT_BATCH_ROWS = 50_000
+# Memory guardrails (tools/mem_profile.py): allowed peak RSS growth per operation,
+# as a multiple of its input frame's in-memory size (a deep copy of the numeric
+# columns plus any string columns materialized as objects is ~ +1.0). Set ~0.5 over
+# what each path measured at 300k-1M synthetic plays.
+# Each budget also gets MEM_BUDGET_BASE_MB on top for fixed costs (imports, allocator
+# arenas), which dominate on small inputs.
+MEM_BUDGETS = {
+    "load_events": 2.3,
+    "upsert_many": 3.0,
+    "CountTrie.from_frame": 1.3,
+    "SimilarityIndex.from_frame": 0.8,
+    "blended_probs_for_condition": 1.4,
+    "featurize": 0.8,
+    "build_rollups": 7.8,
+    "prepare_live": 2.5,
+    "compute_dashboard": 10.3,
+}
+MEM_BUDGET_BASE_MB = 16
+# Versioned .npy model artifacts (see model/artifact.py)
+MODEL_PATH = ARTIFACTS_DIR / "playtype_model"
+# Training-only learner checkpoint for --warm-start; never loaded by prediction
+MODEL_STATE_PATH = ARTIFACTS_DIR / "playtype_model.state.joblib"
+
+# Prior tables: one versioned JSON file per table (analytics/prior_tables.py);
+# the app and service re-read changed files every PRIORS_POLL_S seconds
+PRIORS_DIR = BASE_DIR / "priors"
+PRIORS_POLL_S = 2.0
+
+# Headless dashboard service (service.py)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+# UDP port the service listens on for "play changed" events from storage writes
+NOTIFY_PORT = 8766
+# How often read-only viewer panels check for changes (seconds)
+VIEWER_POLL_S = 1.0
+
+# Stage latency tracing (tracing.py): set PV_TRACE=1 to record; histograms are
+# flushed to TRACE_DIR/<process>.json + .prom every TRACE_FLUSH_S seconds and at exit
+TRACE_ENV = "PV_TRACE"
+TRACE_DIR = ARTIFACTS_DIR / "trace"
+TRACE_FLUSH_S = 5.0
+
+# =====================================================
+# Buckets
+# =====================================================
+CLOCK_BUCKETS = [
+    "15-10",
+    "10-7",
+    "7-6",
+    "5-3",
+    "3-2",
+    "2-0",
+    "SCRIPT_START",
+    "OTHER",
+]
+DIST_BUCKETS = ["SHORT", "MEDIUM", "LONG", "X_LONG", "UNK"]
+FIELD_ZONES = ["LOW_RED", "HIGH_RED", "MIDFIELD", "OWN_SIDE", "BACKED_UP", "UNK"]
+
+# Simple “in-range” defs (bucket-world)
+# CFB: mostly red zone range
+FG_RANGE_ZONES_CFB = {"LOW_RED", "HIGH_RED"}
+# NFL: red zone + fringe (midfield sometimes)
+FG_RANGE_ZONES_NFL = {"LOW_RED", "HIGH_RED", "MIDFIELD"}
+
+def fg_in_range(field_zone: str, league_mix_cfb: float) -> bool:
+    z = str(field_zone)
+    if league_mix_cfb >= 0.6:
+        return z in FG_RANGE_ZONES_CFB
+    if league_mix_cfb <= 0.4:
+        return z in FG_RANGE_ZONES_NFL
+    return z in FG_RANGE_ZONES_CFB  # conservative in the middle
+
+# =====================================================
+# Taxonomy
+# =====================================================
+LEAGUES = ["CFB", "NFL"]
+PV_POSSESSION = ["PV_OFF", "PV_DEF"]
+PERSONNEL = ["UNK", "10", "11", "12", "13", "20", "21", "22"]
+FORMATION = ["UNK", "2x2", "3x1", "trips", "bunch", "empty", "compressed"]
+SHELL = ["UNK", "0", "1", "2"]
+PRESSURE = ["UNK", "4", "5+"]
+
+# =====================================================
+# Call types (what the play IS)
+# =====================================================
+CALL_TYPES = [
+    "RUN",
+    "PASS_QUICK",
+    "PASS_DROPBACK",
+    "PLAY_ACTION",
+    "SCREEN",
+    "SHOT",
+    "PUNT",
+    "FIELD_GOAL",
+    "KICKOFF",
+    "PAT_KICK",
+    "TWO_POINT",
+    "SACK",
+    "PENALTY",
+]
+
+# =====================================================
+# Results / outcomes
+# =====================================================
+# What the play-type model predicts ("unknown" = not labeled yet)
+OUTCOMES = CALL_TYPES + ["unknown"]
+
+# Out-of-core training: rows per Parquet batch fed to partial_fit
+TRAIN_BATCH_ROWS = 50_000
+
+# Empirical backoff (analytics/empirical.py)
+# live plays needed before live counts fully replace historical ones
+LIVE_BLEND_THRESHOLD = 30
+SMOOTH_ALPHA = 1.0
+# Situation columns matched at each backoff level (strict -> loose). Each level must
+# be a subset of the one before: the count trie puts the loosest level's columns at
+# the top and each stricter level's extra columns one node further down, so adding a
+# level or a column here costs one more sort when the trie is built, not another scan
+# per lookup.
+BACKOFF_LEVELS = [
+    ["pv_possession", "quarter", "clock_bucket", "hurry_up", "down", "dist_bucket", "field_zone",
+     "opp_personnel", "opp_formation", "def_shell", "pressure"],
+    ["pv_possession", "quarter", "clock_bucket", "hurry_up", "down", "dist_bucket", "field_zone",
+     "opp_personnel", "def_shell", "pressure"],
+    ["pv_possession", "quarter", "clock_bucket", "hurry_up", "down", "dist_bucket", "field_zone",
+     "def_shell", "pressure"],
+    ["pv_possession", "down", "dist_bucket", "field_zone"],
+]
+# hist + live matches needed to accept each backoff level (strict -> loose)
+MIN_MATCHES = [25, 25, 20, 10]
+
+# Coach summaries (analytics/tendencies.py): "last N plays" windows per side
+TENDENCY_WINDOWS = [10, 20]
+
+# Speculative previews (analytics/speculate.py): tagged-play speculations kept
+SPECULATION_CACHE_SIZE = 32
+
+# Comparable scenarios (analytics/similarity.py): cost of a mismatch per situation
+# column; a past play's distance is the sum over the columns it differs on (0 = same
+# situation). Integers, so distances stay small and top-k is a histogram cut, not a sort.
+# A column left out (or 0) is ignored.
+SIMILARITY_WEIGHTS = {
+    "pv_possession": 8,
+    "down": 6,
+    "dist_bucket": 5,
+    "field_zone": 4,
+    "clock_bucket": 3,
+    "quarter": 2,
+    "hurry_up": 2,
+    "opp_personnel": 2,
+    "opp_formation": 1,
+    "def_shell": 1,
+    "pressure": 1,
+}
+SIMILARITY_TOP_K = 10
+
+PASS_RESULT = ["NA", "COMPLETE", "INCOMPLETE"]
+TURNOVER_RESULT = ["NONE", "INT", "FUMBLE", "PICK6", "SCOOP6"]
+YARDS_BUCKETS = ["NA", "NEG", "0-2", "3-6", "7-10", "11-20", "21+"]
+
+# 4th down decision + 2pt decision
+GO_NO_GO = ["GO", "NO_GO"]
+TWO_PT_CHOICE = ["KICK", "TWO"]
+
+# =====================================================
+# Priors
+# Call-family, zone/clock multiplier, pressure, timeout and 4th-down tables are
+# data files under PRIORS_DIR (see analytics/prior_tables.py); edit them there and
+# a running app or service picks the change up without a restart.
+# =====================================================
+# Flat call multipliers (not per-situation tables)
+HURRY_MULT = {"PASS_QUICK": 1.15, "SCREEN": 1.05, "PLAY_ACTION": 0.85}
+GOAL_TO_GO_MULT = {"RUN": 1.20, "SHOT": 0.80, "PLAY_ACTION": 1.05}
+AFTER_FIRST_DOWN_MULT = {"RUN": 1.05, "PLAY_ACTION": 1.05}
+
+# Keep your older GO/NO_GO and TWO_PT priors (used elsewhere)
+FOURTH_PRIOR = {}
+TWO_PT_PRIOR = {"TWO": 4, "KICK": 36}
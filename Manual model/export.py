@@ -0,0 +1,160 @@
+from pathlib import Path
+from typing import Iterator, Optional, Sequence, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from config import DB_PATH, EXPORT_BATCH_ROWS
+
+# Column projection shared with the tagger's per-game export (app.make_export_df).
+# Everything a play needs to round-trip through an import; only `meta` is left out.
+EXPORT_SCHEMA = pa.schema([
+    ("session_id", pa.string()),
+    ("game_id", pa.string()),
+    ("opponent", pa.string()),
+    ("season", pa.int32()),
+    ("play_no", pa.int64()),
+    ("quarter", pa.int64()),
+    ("clock_bucket", pa.string()),
+    ("hurry_up", pa.bool_()),
+    ("down", pa.int64()),
+    ("dist_bucket", pa.string()),
+    ("field_zone", pa.string()),
+    ("goal_to_go", pa.bool_()),
+    ("pv_possession", pa.string()),
+    ("opp_personnel", pa.string()),
+    ("opp_formation", pa.string()),
+    ("def_shell", pa.string()),
+    ("pressure", pa.string()),
+    ("call_type", pa.string()),
+    ("first_down", pa.bool_()),
+    ("td", pa.bool_()),
+    ("yards_bucket", pa.string()),
+    ("pass_result", pa.string()),
+    ("turnover", pa.string()),
+    ("timeout_used", pa.bool_()),
+    ("fourth_decision", pa.string()),
+    ("two_pt_decision", pa.string()),
+    ("ts", pa.float64()),
+])
+EXPORT_COLS = EXPORT_SCHEMA.names
+FORMATS = {".parquet": "parquet", ".arrow": "ipc", ".feather": "ipc", ".ipc": "ipc", ".csv": "csv"}
+
+# -----------------------------
+# Select
+# -----------------------------
+def _epoch(t) -> float:
+    # ts in the store is time.time(); accept dates/strings for ranges
+    return float(t) if isinstance(t, (int, float)) else pd.Timestamp(t).timestamp()
+
+def _filter(
+    sessions: Optional[Sequence[str]],
+    games: Optional[Sequence[str]],
+    start,
+    end,
+):
+    expr = None
+    def add(e):
+        nonlocal expr
+        expr = e if expr is None else expr & e
+    if sessions:
+        add(ds.field("session_id").isin([str(s) for s in sessions]))
+    if games:
+        add(ds.field("game_id").isin([str(g) for g in games]))
+    if start is not None:
+        add(ds.field("ts") >= _epoch(start))
+    if end is not None:
+        add(ds.field("ts") < _epoch(end))
+    return expr
+
+def _conform(batch: pa.RecordBatch) -> pa.RecordBatch:
+    # store columns are whatever pandas inferred (all-None columns come back as null);
+    # cast each to the export type and fill columns the store never had
+    cols = []
+    for f in EXPORT_SCHEMA:
+        i = batch.schema.get_field_index(f.name)
+        cols.append(pa.nulls(batch.num_rows, f.type) if i < 0 else batch.column(i).cast(f.type))
+    return pa.RecordBatch.from_arrays(cols, schema=EXPORT_SCHEMA)
+
+def iter_export_batches(
+    sessions: Optional[Sequence[str]] = None,
+    games: Optional[Sequence[str]] = None,
+    start=None,
+    end=None,
+    batch_rows: int = EXPORT_BATCH_ROWS,
+    source: Union[str, Path] = DB_PATH,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Selected plays as EXPORT_SCHEMA batches of at most batch_rows, in store order.
+    Filters are pushed into the scan, so unselected rows are never materialized.
+    """
+    source = Path(source)
+    if not source.exists():
+        return
+    dataset = ds.dataset(str(source), format="parquet")
+    present = [c for c in EXPORT_COLS if c in dataset.schema.names]
+    if (start is not None or end is not None) and "ts" not in present:
+        raise ValueError("Date range given but the store has no 'ts' column")
+
+    for batch in dataset.to_batches(columns=present, filter=_filter(sessions, games, start, end),
+                                    batch_size=int(batch_rows)):
+        if batch.num_rows:
+            yield _conform(batch)
+
+# -----------------------------
+# Write / read
+# -----------------------------
+def _format(path: Path, fmt: Optional[str]) -> str:
+    fmt = fmt or FORMATS.get(path.suffix.lower())
+    if fmt not in ("parquet", "ipc", "csv"):
+        raise ValueError(f"Unknown export format for {path.name}; use one of {sorted(set(FORMATS))} or fmt=")
+    return fmt
+
+def export_events(path: Union[str, Path], fmt: Optional[str] = None, **select) -> int:
+    """
+    Stream a selection of the event store to Parquet, Arrow IPC or CSV. Holds one
+    batch at a time; select takes iter_export_batches() arguments. Returns rows written.
+    """
+    path = Path(path)
+    fmt = _format(path, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(str(path), EXPORT_SCHEMA)
+    elif fmt == "ipc":
+        writer = pa.ipc.new_file(str(path), EXPORT_SCHEMA)
+    else:
+        writer = pacsv.CSVWriter(str(path), EXPORT_SCHEMA)
+
+    n = 0
+    try:
+        for batch in iter_export_batches(**select):
+            writer.write_batch(batch)
+            n += batch.num_rows
+    finally:
+        writer.close()
+    return n
+
+def read_export(path: Union[str, Path], fmt: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load an export back with its original types (CSV is parsed against EXPORT_SCHEMA),
+    ready for storage.upsert_many().
+    """
+    path = Path(path)
+    fmt = _format(path, fmt)
+    if fmt == "parquet":
+        table = pq.read_table(str(path))
+    elif fmt == "ipc":
+        with pa.memory_map(str(path)) as src:
+            table = pa.ipc.open_file(src).read_all()
+    else:
+        opts = pacsv.ConvertOptions(
+            column_types=EXPORT_SCHEMA,
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,  # the writer quotes real strings, so only bare empties are null
+        )
+        table = pacsv.read_csv(str(path), convert_options=opts)
+    return table.to_pandas()
@@ -0,0 +1,179 @@
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from config import HIST_DIR, HIST_PATH, LEAGUES
+
+# Layout (hive partitions, one directory per league and season):
+#   HIST_DIR/league=NFL/season=2023/part-0.parquet   (or .arrow / .feather)
+# A single legacy HIST_PATH file is still read when HIST_DIR is empty.
+PARTITIONING = ds.partitioning(
+    pa.schema([("league", pa.string()), ("season", pa.int32())]),
+    flavor="hive",
+)
+IPC_SUFFIXES = {".arrow", ".feather", ".ipc"}
+
+# Local files are memory-mapped: column chunks are paged in by the OS on read
+_FS = pafs.LocalFileSystem(use_mmap=True)
+
+# -----------------------------
+# Dataset
+# -----------------------------
+def _data_files(root: Path) -> List[Path]:
+    if not root.exists():
+        return []
+    return sorted(p for p in root.rglob("*") if p.is_file() and (p.suffix == ".parquet" or p.suffix in IPC_SUFFIXES))
+
+def historical_files() -> List[Path]:
+    """
+    Files that make up the historical dataset (for data fingerprints).
+    """
+    files = _data_files(HIST_DIR)
+    if files:
+        return files
+    return [HIST_PATH] if HIST_PATH.exists() else []
+
+def historical_version() -> tuple:
+    """
+    Cheap change token for the historical dataset ((file, mtime, size) per file).
+    Cache key for anything built from history.
+    """
+    out = []
+    for p in historical_files():
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        out.append((str(p), st.st_mtime_ns, st.st_size))
+    return tuple(out)
+
+def historical_source() -> Optional[Path]:
+    """
+    Path to hand to pyarrow.dataset / batch tools, or None when there is no history.
+    """
+    if _data_files(HIST_DIR):
+        return HIST_DIR
+    return HIST_PATH if HIST_PATH.exists() else None
+
+def historical_dataset() -> Optional[ds.Dataset]:
+    """
+    Lazy, memory-mapped view of every historical file. Nothing is read until scanned.
+    """
+    files = _data_files(HIST_DIR)
+    if files:
+        parts = []
+        for fmt, group in (("parquet", [f for f in files if f.suffix == ".parquet"]),
+                           ("ipc", [f for f in files if f.suffix in IPC_SUFFIXES])):
+            if group:
+                parts.append(ds.dataset([str(f) for f in group], format=fmt, filesystem=_FS,
+                                        partitioning=PARTITIONING, partition_base_dir=str(HIST_DIR)))
+        return parts[0] if len(parts) == 1 else ds.dataset(parts)
+    if HIST_PATH.exists():
+        fmt = "ipc" if HIST_PATH.suffix in IPC_SUFFIXES else "parquet"
+        return ds.dataset(str(HIST_PATH), format=fmt, filesystem=_FS)
+    return None
+
+def _filter(
+    dset: ds.Dataset,
+    leagues: Optional[Sequence[str]],
+    seasons: Optional[Sequence[int]],
+    labeled_only: bool,
+):
+    names = set(dset.schema.names)
+    expr = None
+
+    def _and(e):
+        return e if expr is None else expr & e
+
+    if leagues is not None:
+        bad = [lg for lg in leagues if lg not in LEAGUES]
+        if bad:
+            raise ValueError(f"Unknown league(s) {bad}; expected one of {LEAGUES}")
+        if "league" not in names:
+            raise ValueError("Historical data has no 'league' column/partition; can't filter by league.")
+        expr = _and(ds.field("league").isin(list(leagues)))
+    if seasons is not None:
+        if "season" not in names:
+            raise ValueError("Historical data has no 'season' column/partition; can't filter by season.")
+        expr = _and(ds.field("season").isin([int(s) for s in seasons]))
+    if labeled_only and "outcome" in names:
+        expr = _and(ds.field("outcome").is_valid())
+    return expr
+
+def _project(dset: ds.Dataset, columns: Optional[Sequence[str]]) -> Optional[List[str]]:
+    # callers ask for the columns they use; ones this dataset lacks are skipped
+    if columns is None:
+        return None
+    names = set(dset.schema.names)
+    return [c for c in dict.fromkeys(columns) if c in names]
+
+# -----------------------------
+# Readers
+# -----------------------------
+def load_historical(
+    columns: Optional[Sequence[str]] = None,
+    leagues: Optional[Sequence[str]] = None,
+    seasons: Optional[Sequence[int]] = None,
+    labeled_only: bool = False,
+) -> pd.DataFrame:
+    """
+    Read historical plays. Only `columns` are decoded, and league/season filters
+    prune whole partitions before any file is opened.
+    """
+    dset = historical_dataset()
+    if dset is None:
+        return pd.DataFrame()
+    tbl = dset.to_table(columns=_project(dset, columns), filter=_filter(dset, leagues, seasons, labeled_only))
+    return tbl.to_pandas()
+
+def iter_historical_batches(
+    columns: Optional[Sequence[str]] = None,
+    leagues: Optional[Sequence[str]] = None,
+    seasons: Optional[Sequence[int]] = None,
+    labeled_only: bool = False,
+    batch_rows: int = 50_000,
+) -> Iterator[pd.DataFrame]:
+    """
+    Same selection as load_historical, one row batch at a time (bounded memory).
+    """
+    dset = historical_dataset()
+    if dset is None:
+        return
+    for rb in dset.to_batches(columns=_project(dset, columns),
+                              filter=_filter(dset, leagues, seasons, labeled_only),
+                              batch_size=batch_rows):
+        if rb.num_rows:
+            yield rb.to_pandas()
+
+# -----------------------------
+# Writer
+# -----------------------------
+def write_historical(df: pd.DataFrame, league: str, season: int, fmt: str = "parquet") -> Path:
+    """
+    Replace one league/season partition with df. Returns the partition directory.
+    """
+    if league not in LEAGUES:
+        raise ValueError(f"Unknown league {league!r}; expected one of {LEAGUES}")
+    if fmt not in ("parquet", "ipc"):
+        raise ValueError("fmt must be 'parquet' or 'ipc'")
+
+    part = HIST_DIR / f"league={league}" / f"season={int(season)}"
+    part.mkdir(parents=True, exist_ok=True)
+    for old in _data_files(part):
+        old.unlink()
+
+    # partition values live in the path, not in the file
+    tbl = pa.Table.from_pandas(df.drop(columns=["league", "season"], errors="ignore"), preserve_index=False)
+    if fmt == "parquet":
+        out = part / "part-0.parquet"
+        pq.write_table(tbl, out)
+    else:
+        out = part / "part-0.arrow"
+        with pa.OSFile(str(out), "wb") as sink, pa.ipc.new_file(sink, tbl.schema) as w:
+            w.write_table(tbl)
+    return part
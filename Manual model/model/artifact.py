@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from config import MODEL_PATH
+from model.features import ENCODER
+from model.linear import LinearModel
+
+# Bump when the on-disk layout changes; older artifacts are rejected, not guessed at.
+ARTIFACT_FORMAT_VERSION = 1
+
+# Layout:
+#   MODEL_PATH/CURRENT                  name of the live version (swapped atomically)
+#   MODEL_PATH/<version>/manifest.json
+#   MODEL_PATH/<version>/coef_t.npy     (n_features, n_score_rows) float64
+#   MODEL_PATH/<version>/intercept.npy
+#   MODEL_PATH/<version>/classes.npy
+#   MODEL_PATH/<version>/vocab_<col>.npy
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+KEEP_VERSIONS = 3
+
+class ArtifactError(RuntimeError):
+    pass
+
+# -----------------------------
+# Fingerprints
+# -----------------------------
+def data_fingerprint(paths: Sequence[Path], extra: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Identity of the training data that doesn't move on its own: the historical files
+    (name/size/mtime) plus the selection (e.g. leagues/seasons). The event store is
+    left out; it changes on every tag and is tracked by write sequence (store_seq) instead.
+    """
+    parts = []
+    for p in paths:
+        p = Path(p)
+        if p.exists():
+            st = p.stat()
+            parts.append([p.name, st.st_size, st.st_mtime_ns])
+    spec = {"sources": parts, "extra": extra or {}}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def staleness(manifest: Dict[str, Any], expected_fingerprint: str, store_seq: Optional[int] = None) -> Optional[str]:
+    """
+    Why an artifact no longer matches the data it was trained on, or None. New tags
+    since training don't count (the store only moved forward); replaced history or a
+    store that went back past the training watermark does.
+    """
+    if manifest.get("data_fingerprint") != expected_fingerprint:
+        return "historical data changed since training"
+    trained = int(manifest.get("training", {}).get("store_seq") or 0)
+    if store_seq is not None and store_seq < trained:
+        return f"event store is at write {store_seq}, before the write {trained} it was trained through"
+    return None
+
+# -----------------------------
+# Write
+# -----------------------------
+def _atomic_write_text(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+def _prune(root: Path, keep: int) -> None:
+    versions = sorted(p for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for p in versions[:-keep]:
+        shutil.rmtree(p, ignore_errors=True)
+
+def save_artifact(
+    model: LinearModel,
+    training: Dict[str, Any],
+    fingerprint: str,
+    root: Path = MODEL_PATH,
+) -> str:
+    """
+    Write a new version next to the live one, then flip CURRENT to it.
+    Readers never see a half-written version. Returns the version name.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    version = time.strftime("%Y%m%dT%H%M%S") + "-" + fingerprint[:8]
+    while (root / version).exists():
+        version += "x"
+
+    tmp = root / f".tmp-{version}"
+    tmp.mkdir()
+
+    arrays = {
+        "coef_t": np.ascontiguousarray(model.coef_t, dtype=np.float64),
+        "intercept": np.asarray(model.intercept, dtype=np.float64),
+        "classes": np.array(model.classes, dtype=str),
+    }
+    for c in ENCODER.columns:
+        arrays[f"vocab_{c}"] = np.array([str(v) for v in ENCODER.vocab[c]], dtype=str)
+
+    for name, arr in arrays.items():
+        np.save(tmp / f"{name}.npy", arr, allow_pickle=False)
+
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "model_version": version,
+        "created_ts": time.time(),
+        "link": model.link,
+        "classes": model.classes,
+        "n_features": int(ENCODER.n_features),
+        "schema_hash": ENCODER.schema_hash(),
+        "data_fingerprint": fingerprint,
+        "training": training,
+        "arrays": {k: {"file": f"{k}.npy", "shape": list(v.shape), "dtype": str(v.dtype)} for k, v in arrays.items()},
+    }
+    (tmp / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2, default=str))
+
+    os.replace(tmp, root / version)
+    _atomic_write_text(root / CURRENT_FILE, version)
+    _prune(root, KEEP_VERSIONS)
+    return version
+
+# -----------------------------
+# Read
+# -----------------------------
+def current_version(root: Path = MODEL_PATH) -> Optional[str]:
+    cur = root / CURRENT_FILE
+    if not cur.exists():
+        return None
+    return cur.read_text().strip() or None
+
+def read_manifest(version: Optional[str] = None, root: Path = MODEL_PATH) -> Dict[str, Any]:
+    version = version or current_version(root)
+    if version is None:
+        raise ArtifactError(f"No model artifact at {root}. Train one with: python -m model.train")
+    path = root / version / MANIFEST_FILE
+    if not path.exists():
+        raise ArtifactError(f"Artifact {version} has no manifest (incomplete or deleted).")
+    return json.loads(path.read_text())
+
+def validate_manifest(
+    manifest: Dict[str, Any],
+    expected_fingerprint: Optional[str] = None,
+    store_seq: Optional[int] = None,
+) -> None:
+    """
+    Reject artifacts this code can't score correctly, before any array is touched.
+    With expected_fingerprint (and store_seq), stale artifacts are rejected too.
+    """
+    v = manifest.get("model_version")
+    if manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ArtifactError(
+            f"Artifact {v} has format {manifest.get('format_version')}, expected {ARTIFACT_FORMAT_VERSION}. Retrain."
+        )
+    if manifest.get("schema_hash") != ENCODER.schema_hash():
+        raise ArtifactError(f"Artifact {v} was trained on a different feature schema/vocabulary. Retrain.")
+    if expected_fingerprint is not None:
+        reason = staleness(manifest, expected_fingerprint, store_seq)
+        if reason is not None:
+            raise ArtifactError(f"Artifact {v} is stale: {reason}. Retrain.")
+
+def load_artifact(
+    version: Optional[str] = None,
+    root: Path = MODEL_PATH,
+    expected_fingerprint: Optional[str] = None,
+    store_seq: Optional[int] = None,
+    mmap: bool = True,
+) -> LinearModel:
+    """
+    Load a version (default: CURRENT) with memory-mapped arrays, so worker
+    processes share the same pages and start without sklearn/joblib.
+    """
+    manifest = read_manifest(version, root)
+    validate_manifest(manifest, expected_fingerprint, store_seq)
+
+    vdir = root / manifest["model_version"]
+    mode = "r" if mmap else None
+    arrs = {}
+    for name, spec in manifest["arrays"].items():
+        a = np.load(vdir / spec["file"], mmap_mode=mode, allow_pickle=False)
+        if list(a.shape) != list(spec["shape"]):
+            raise ArtifactError(f"Artifact {manifest['model_version']}: {name} has shape {a.shape}, manifest says {spec['shape']}.")
+        arrs[name] = a
+
+    if arrs["coef_t"].shape[0] != ENCODER.n_features or len(arrs["intercept"]) != arrs["coef_t"].shape[1]:
+        raise ArtifactError(f"Artifact {manifest['model_version']}: coefficient shapes don't match the encoder.")
+
+    model = LinearModel(arrs["coef_t"], arrs["intercept"], [str(c) for c in arrs["classes"]], manifest["link"])
+    model.manifest = manifest
+    return model
@@ -0,0 +1,129 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from model.features import ENCODER, FEATURE_COLS
+
+# Regularization strengths (LogisticRegression C) tried by default
+C_GRID = [0.01, 0.1, 1.0, 10.0]
+
+# Named feature subsets; each is a list of FEATURE_COLS
+FEATURE_SUBSETS = {
+    "all": FEATURE_COLS,
+    "no_opp_look": [c for c in FEATURE_COLS if c not in ("opp_personnel", "opp_formation", "def_shell", "pressure")],
+    "situation_only": ["pv_possession", "quarter", "clock_bucket", "hurry_up", "down", "dist_bucket", "field_zone"],
+}
+
+# -----------------------------
+# Worker state: set once per process by the pool initializer, never re-sent per task
+# -----------------------------
+_W: Dict[str, object] = {}
+
+def _init_worker(codes: np.ndarray, y: np.ndarray, folds: List[tuple]) -> None:
+    _W["codes"] = codes
+    _W["y"] = y
+    _W["folds"] = folds
+    _W["labels"] = np.unique(y)
+
+def _subset_matrix(codes: np.ndarray, cols: Sequence[str]) -> sparse.csr_matrix:
+    # one-hot for a column subset straight from the shared codes (no re-featurizing)
+    js = [FEATURE_COLS.index(c) for c in cols]
+    idx = codes[:, js] + ENCODER.offsets[js]
+    n, k = idx.shape
+    data = np.ones(n * k, dtype=np.float64)
+    indptr = np.arange(0, n * k + 1, k, dtype=np.int64)
+    return sparse.csr_matrix((data, idx.ravel(), indptr), shape=(n, ENCODER.n_features))
+
+def _full_proba(clf, proba: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    # a fold can miss a rare class; pad so every fold scores against the same labels
+    out = np.zeros((proba.shape[0], len(labels)))
+    out[:, np.searchsorted(labels, clf.classes_)] = proba
+    return out
+
+def _run_fold(C: float, subset: str, cols: Sequence[str], fold: int) -> Dict[str, object]:
+    codes, y, labels = _W["codes"], _W["y"], _W["labels"]
+    train_idx, test_idx = _W["folds"][fold]
+
+    from sklearn.linear_model import LogisticRegression
+
+    t0 = time.perf_counter()
+    X = _subset_matrix(codes, cols)
+    clf = LogisticRegression(C=C, max_iter=400)
+    clf.fit(X[train_idx], y[train_idx])
+    proba = _full_proba(clf, clf.predict_proba(X[test_idx]), labels)
+    wall = time.perf_counter() - t0
+
+    y_test = y[test_idx]
+    onehot = (y_test[:, None] == labels[None, :]).astype(float)
+    p_true = np.clip((proba * onehot).sum(axis=1), 1e-15, 1.0)
+    return {
+        "C": C,
+        "subset": subset,
+        "fold": fold,
+        "log_loss": float(-np.log(p_true).mean()),
+        "brier": float(((proba - onehot) ** 2).sum(axis=1).mean()),
+        "accuracy": float((labels[proba.argmax(axis=1)] == y_test).mean()),
+        "wall_s": wall,
+    }
+
+# -----------------------------
+# Grid search
+# -----------------------------
+def cross_validate_grid(
+    df: pd.DataFrame,
+    folds: int = 5,
+    c_grid: Optional[Sequence[float]] = None,
+    subsets: Optional[Sequence[str]] = None,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Stratified k-fold CV over (C, feature subset), one (config, fold) per pool task.
+    The frame is encoded once to int codes; workers receive them once at startup.
+    Returns one row per configuration: mean log-loss / Brier / accuracy and fit wall time.
+    """
+    c_grid = list(c_grid or C_GRID)
+    subsets = list(subsets or FEATURE_SUBSETS)
+    unknown = [s for s in subsets if s not in FEATURE_SUBSETS]
+    if unknown:
+        raise ValueError(f"Unknown feature subset(s): {unknown}. Choose from {list(FEATURE_SUBSETS)}")
+
+    codes = ENCODER.codes(df)
+    y = df["outcome"].astype(str).to_numpy()
+    from sklearn.model_selection import StratifiedKFold
+
+    skf = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    fold_idx = list(skf.split(codes, y))
+
+    tasks = [(C, s, FEATURE_SUBSETS[s], f) for C in c_grid for s in subsets for f in range(folds)]
+    workers = max(1, min(len(tasks), max_workers or os.cpu_count() or 1))
+
+    t0 = time.perf_counter()
+    if workers == 1:
+        _init_worker(codes, y, fold_idx)
+        rows = [_run_fold(*t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(codes, y, fold_idx)) as ex:
+            rows = list(ex.map(_run_fold, *zip(*tasks)))
+    total = time.perf_counter() - t0
+
+    per_fold = pd.DataFrame(rows)
+    report = (
+        per_fold.groupby(["C", "subset"], as_index=False)
+        .agg(
+            log_loss=("log_loss", "mean"),
+            log_loss_std=("log_loss", "std"),
+            brier=("brier", "mean"),
+            accuracy=("accuracy", "mean"),
+            wall_s=("wall_s", "sum"),
+        )
+        .sort_values("log_loss")
+        .reset_index(drop=True)
+    )
+    report.attrs["total_wall_s"] = total
+    report.attrs["workers"] = workers
+    return report
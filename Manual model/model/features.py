@@ -1,38 +1,162 @@
-import pandas as pd
-
-FEATURE_COLS = [
-    "pv_possession",
-    "quarter",
-    "clock_bucket",
-    "hurry_up",
-    "down",
-    "dist_bucket",
-    "field_zone",
-    "opp_personnel",
-    "opp_formation",
-    "def_shell",
-    "pressure",
-]
-
-def featurize(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-
-    cat_cols = ["pv_possession", "clock_bucket", "dist_bucket", "field_zone",
-                "opp_personnel", "opp_formation", "def_shell", "pressure"]
-    for c in cat_cols:
-        if c not in out.columns:
-            out[c] = "UNK"
-        out[c] = out[c].fillna("UNK").astype(str)
-
-    if "hurry_up" not in out.columns:
-        out["hurry_up"] = False
-    out["hurry_up"] = out["hurry_up"].fillna(False).astype(bool)
-
-    for c in ["quarter", "down"]:
-        if c not in out.columns:
-            out[c] = 0
-        out[c] = pd.to_numeric(out[c], errors="coerce").fillna(0).astype(int)
-
-    return out[FEATURE_COLS]
-
-
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+from config import (
+    PV_POSSESSION, CLOCK_BUCKETS, DIST_BUCKETS, FIELD_ZONES,
+    PERSONNEL, FORMATION, SHELL, PRESSURE,
+)
+
+FEATURE_COLS = [
+    "pv_possession",
+    "quarter",
+    "clock_bucket",
+    "hurry_up",
+    "down",
+    "dist_bucket",
+    "field_zone",
+    "opp_personnel",
+    "opp_formation",
+    "def_shell",
+    "pressure",
+]
+
+def featurize(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+
+    cat_cols = ["pv_possession", "clock_bucket", "dist_bucket", "field_zone",
+                "opp_personnel", "opp_formation", "def_shell", "pressure"]
+    for c in cat_cols:
+        if c not in out.columns:
+            out[c] = "UNK"
+        out[c] = out[c].fillna("UNK").astype(str)
+
+    if "hurry_up" not in out.columns:
+        out["hurry_up"] = False
+    out["hurry_up"] = out["hurry_up"].fillna(False).astype(bool)
+
+    for c in ["quarter", "down"]:
+        if c not in out.columns:
+            out[c] = 0
+        out[c] = pd.to_numeric(out[c], errors="coerce").fillna(0).astype(int)
+
+    return out[FEATURE_COLS]
+
+# -----------------------------
+# Compiled fixed-vocabulary encoder (shared by training + prediction)
+# -----------------------------
+FEATURE_VOCAB = {
+    "pv_possession": PV_POSSESSION,
+    "quarter": [1, 2, 3, 4, 5],
+    "clock_bucket": CLOCK_BUCKETS,
+    "hurry_up": [False, True],
+    "down": [1, 2, 3, 4],
+    "dist_bucket": DIST_BUCKETS,
+    "field_zone": FIELD_ZONES,
+    "opp_personnel": PERSONNEL,
+    "opp_formation": FORMATION,
+    "def_shell": SHELL,
+    "pressure": PRESSURE,
+}
+BOOL_COLS = ["hurry_up"]
+NUM_COLS = ["quarter", "down"]
+
+# what featurize() fills in for a missing value
+_MISSING = {c: "UNK" for c in FEATURE_COLS}
+_MISSING.update({c: False for c in BOOL_COLS})
+_MISSING.update({c: 0 for c in NUM_COLS})
+
+class FeatureEncoder:
+    """
+    Maps FEATURE_COLS straight to vocabulary codes / one-hot CSR in one pass.
+
+    Vocabularies come from config, so nothing is fitted and every batch gets the
+    same column layout. Each column has len(vocab) slots plus a trailing
+    out-of-vocabulary slot, so every row has exactly len(FEATURE_COLS) active
+    entries. Missing values are handled like featurize() ("UNK" / False / 0).
+    """
+
+    def __init__(self, vocab: Optional[Dict[str, list]] = None):
+        vocab = vocab or FEATURE_VOCAB
+        self.columns = list(FEATURE_COLS)
+        self.vocab = {c: list(vocab[c]) for c in self.columns}
+        self.sizes = np.array([len(self.vocab[c]) + 1 for c in self.columns], dtype=np.int32)
+        self.offsets = np.concatenate([[0], np.cumsum(self.sizes)[:-1]]).astype(np.int32)
+        self.n_features = int(self.sizes.sum())
+
+        self._lookup = {c: {v: i for i, v in enumerate(self.vocab[c])} for c in self.columns}
+        self._oov = {c: len(self.vocab[c]) for c in self.columns}
+        self._missing = {c: self._lookup[c].get(_MISSING[c], self._oov[c]) for c in self.columns}
+
+    def _code(self, c: str, v: Any) -> int:
+        # scalar normalization shared by the frame and single-row paths
+        if v is None or v != v:  # None / NaN
+            return self._missing[c]
+        if c in NUM_COLS:
+            try:
+                v = int(float(v))
+            except (TypeError, ValueError):
+                v = 0
+        elif c in BOOL_COLS:
+            v = bool(v)
+        code = self._lookup[c].get(v)
+        if code is None and c not in NUM_COLS and c not in BOOL_COLS:
+            # e.g. shell tagged as int 2 in a CSV import, or personnel read as 11.0
+            # from a CSV column with blanks
+            if isinstance(v, (float, np.floating)) and float(v).is_integer():
+                v = int(v)
+            code = self._lookup[c].get(str(v))
+        return self._oov[c] if code is None else code
+
+    def schema_hash(self) -> str:
+        """
+        Identifies the column layout; a model trained under another layout is unusable.
+        """
+        spec = {"columns": self.columns, "vocab": {c: [str(v) for v in self.vocab[c]] for c in self.columns}, "oov_slot": True}
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()
+
+    # ---- vectorized (frames) ----
+    def _column_codes(self, c: str, s: pd.Series) -> np.ndarray:
+        # factorize once, then only map the handful of distinct values
+        k, uniques = pd.factorize(s)
+        table = np.fromiter((self._code(c, u) for u in uniques), dtype=np.int32, count=len(uniques))
+        table = np.append(table, np.int32(self._missing[c]))  # k == -1 -> missing
+        return table[k]
+
+    def codes(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Dense (n_rows, len(FEATURE_COLS)) int32 vocabulary codes, one column per feature.
+        """
+        out = np.empty((len(df), len(self.columns)), dtype=np.int32)
+        for j, c in enumerate(self.columns):
+            if c in df.columns:
+                out[:, j] = self._column_codes(c, df[c])
+            else:
+                out[:, j] = self._missing[c]
+        return out
+
+    def transform(self, df: pd.DataFrame) -> "sparse.csr_matrix":
+        from scipy import sparse  # deferred: row/dict prediction paths never build a matrix
+
+        idx = self.codes(df) + self.offsets
+        n, k = idx.shape
+        data = np.ones(n * k, dtype=np.float64)
+        indptr = np.arange(0, n * k + 1, k, dtype=np.int64)
+        return sparse.csr_matrix((data, idx.ravel(), indptr), shape=(n, self.n_features))
+
+    # ---- single-row fast path (dicts, no pandas) ----
+    def codes_row(self, row: Mapping[str, Any]) -> List[int]:
+        return [self._code(c, row.get(c)) for c in self.columns]
+
+    def transform_row(self, row: Mapping[str, Any]) -> np.ndarray:
+        """
+        Active one-hot column indices for one play (len(FEATURE_COLS) of them).
+        """
+        return np.asarray(self.codes_row(row), dtype=np.int32) + self.offsets
+
+ENCODER = FeatureEncoder()
@@ -0,0 +1,60 @@
+import numpy as np
+from typing import Any, Dict, List, Sequence
+
+class LinearModel:
+    """
+    Exported linear play-type model: coefficients + intercepts + class names.
+    Saved/loaded as a versioned .npy artifact by model/artifact.py.
+
+    Scoring is a NumPy gather/sum over the active one-hot columns produced by
+    FeatureEncoder.transform_row, so no pandas or sklearn objects are touched.
+    link is how scores become probabilities:
+      "softmax" multinomial LogisticRegression
+      "ovr"     one-vs-rest (SGDClassifier log_loss), sigmoid then renormalize
+      "binary"  two classes, single coefficient row
+    """
+
+    def __init__(self, coef_t: np.ndarray, intercept: np.ndarray, classes: Sequence[str], link: str):
+        # coef_t is (n_features, n_score_rows) so one play is a row gather.
+        # np.asarray keeps memory-mapped arrays mapped (no copy when already float64).
+        self.coef_t = np.asarray(coef_t, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes: List[str] = [str(c) for c in classes]
+        self.link = link
+        self.manifest: Dict[str, Any] = {}
+
+    @classmethod
+    def from_sklearn(cls, clf) -> "LinearModel":
+        coef = np.asarray(clf.coef_)
+        if coef.shape[0] == 1:
+            link = "binary"
+        elif type(clf).__name__ == "SGDClassifier" or getattr(clf, "multi_class", "auto") == "ovr":
+            link = "ovr"
+        else:
+            link = "softmax"
+        return cls(np.ascontiguousarray(coef.T, dtype=np.float64), np.asarray(clf.intercept_), list(clf.classes_), link)
+
+    def _probs(self, scores: np.ndarray) -> np.ndarray:
+        if self.link == "softmax":
+            scores = scores - scores.max(axis=-1, keepdims=True)
+            e = np.exp(scores)
+            return e / e.sum(axis=-1, keepdims=True)
+        p = 1.0 / (1.0 + np.exp(-scores))
+        if self.link == "binary":
+            return np.concatenate([1.0 - p, p], axis=-1)
+        return p / p.sum(axis=-1, keepdims=True)
+
+    def predict_proba_indices(self, active: np.ndarray) -> np.ndarray:
+        """
+        Probabilities for one play given its active one-hot column indices.
+        """
+        return self._probs(self.intercept + self.coef_t[active].sum(axis=0))
+
+    def predict_proba_matrix(self, X) -> np.ndarray:
+        """
+        Probabilities for a batch; X is the encoder's CSR matrix (or dense array).
+        """
+        return self._probs(np.asarray(X @ self.coef_t) + self.intercept)
+
+    def proba_dict(self, probs: np.ndarray) -> Dict[str, float]:
+        return dict(zip(self.classes, probs.tolist()))
@@ -1,19 +1,27 @@
-import joblib
-import pandas as pd
-from config import MODEL_PATH
-from model.features import featurize
-
-_cached = None
-
-def load_model():
-    global _cached
-    if _cached is None:
-        _cached = joblib.load(MODEL_PATH)
-    return _cached
-
-def predict_proba(df_one_play: pd.DataFrame) -> pd.DataFrame:
-    model = load_model()
-    X = featurize(df_one_play)
-    probs = model.predict_proba(X)
-    classes = model.classes_
-    return pd.DataFrame(probs, columns=[f"p_{c}" for c in classes])
+import pandas as pd
+from typing import Any, Dict, Mapping, Sequence, Union
+from model.features import ENCODER, FEATURE_COLS
+from model.linear import LinearModel
+from model.registry import ModelRegistry
+
+# Follows MODEL_PATH/CURRENT; a retrain is picked up without restarting the dashboard
+REGISTRY = ModelRegistry()
+
+def load_model() -> LinearModel:
+    return REGISTRY.get()
+
+def predict_proba(df_one_play: pd.DataFrame) -> pd.DataFrame:
+    model = load_model()
+    X = ENCODER.transform(df_one_play)
+    probs = model.predict_proba_matrix(X)
+    return pd.DataFrame(probs, columns=[f"p_{c}" for c in model.classes])
+
+def predict_proba_fast(situation: Union[Mapping[str, Any], Sequence[Any]]) -> Dict[str, float]:
+    """
+    Single-play fast path: situation dict (or a key tuple in FEATURE_COLS order)
+    -> {call_type: prob}. No DataFrames, no sklearn; tens of microseconds per play.
+    """
+    if not isinstance(situation, Mapping):
+        situation = dict(zip(FEATURE_COLS, situation))
+    lm = load_model()
+    return lm.proba_dict(lm.predict_proba_indices(ENCODER.transform_row(situation)))
@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import MODEL_PATH
+from model.artifact import ArtifactError, CURRENT_FILE, current_version, data_fingerprint, load_artifact, staleness
+from model.linear import LinearModel
+
+class ModelRegistry:
+    """
+    Serves the CURRENT model artifact and follows retrains without restarts.
+
+    get() is the only call on the request path. At most every poll_s it stats
+    MODEL_PATH/CURRENT; when the version changed it starts a background load and
+    keeps serving the model it has. The finished load is swapped in with a single
+    reference assignment, so a request that already holds a model finishes on it.
+    The replaced model stays loaded for rollback().
+
+    Each loaded version is checked against the data it was trained on (see
+    artifact.staleness). A stale one is served with the reason in status()["stale"],
+    or with refuse_stale=True treated like a failed load.
+    """
+
+    def __init__(self, root: Path = MODEL_PATH, poll_s: float = 2.0, refuse_stale: bool = False):
+        self.root = Path(root)
+        self.poll_s = float(poll_s)
+        self.refuse_stale = bool(refuse_stale)
+        self.last_error: Optional[str] = None
+        self._stale: Dict[str, str] = {}  # version -> why it no longer matches its training data
+
+        self._lock = threading.Lock()
+        self._active: Optional[LinearModel] = None
+        self._previous: Optional[LinearModel] = None
+        self._loading: Optional[str] = None
+        self._skip_versions = set()  # failed or rolled-back versions we won't auto-follow
+        self._pinned = False
+        self._last_check = 0.0
+        self._current_mtime: Optional[int] = None
+
+    # -----------------------------
+    # Request path
+    # -----------------------------
+    def get(self) -> LinearModel:
+        m = self._active
+        if m is None:
+            return self._load_blocking()
+        if not self._pinned:
+            self._maybe_refresh()
+        return m
+
+    def _version_of(self, m: Optional[LinearModel]) -> Optional[str]:
+        return m.manifest.get("model_version") if m is not None else None
+
+    def _maybe_refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._last_check < self.poll_s:
+            return
+        self._last_check = now
+
+        mtime = self._stat_current()
+        if mtime is None or mtime == self._current_mtime:
+            return
+        self._follow(mtime)
+
+    def _follow(self, mtime: int) -> None:
+        # CURRENT (as of mtime) counts as seen only once it needs no load or its load
+        # has started; while another load runs it stays unseen and is retried
+        v = current_version(self.root)
+        if v is None:
+            return
+        with self._lock:
+            if v == self._version_of(self._active) or v in self._skip_versions:
+                self._current_mtime = mtime
+                return
+            if self._loading is not None:
+                return
+            self._loading = v
+            self._current_mtime = mtime
+        threading.Thread(target=self._load_background, args=(v,), daemon=True).start()
+
+    # -----------------------------
+    # Loading
+    # -----------------------------
+    def _warm(self, m: LinearModel) -> LinearModel:
+        # fault the mmapped pages in now instead of on the first live request
+        float(m.coef_t.sum()) + float(m.intercept.sum())
+        return m
+
+    def _open(self, version: Optional[str] = None) -> LinearModel:
+        m = load_artifact(version, root=self.root)
+        # deferred: the history/store readers are only needed once per loaded version
+        from historical import historical_files
+        from storage import last_write_seq
+        t = m.manifest.get("training", {})
+        fp = data_fingerprint(historical_files(), {"leagues": t.get("leagues"), "seasons": t.get("seasons")})
+        reason = staleness(m.manifest, fp, last_write_seq())
+        v = self._version_of(m)
+        if reason is None:
+            self._stale.pop(v, None)
+            return m
+        if self.refuse_stale:
+            raise ArtifactError(f"Artifact {v} is stale: {reason}. Retrain.")
+        self._stale[v] = reason
+        return m
+
+    def _load_blocking(self) -> LinearModel:
+        with self._lock:
+            if self._active is None:
+                self._active = self._warm(self._open())
+                self._current_mtime = self._stat_current()
+            return self._active
+
+    def _stat_current(self) -> Optional[int]:
+        try:
+            return os.stat(self.root / CURRENT_FILE).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load_background(self, version: str) -> None:
+        try:
+            m = self._warm(self._open(version))
+        except (ArtifactError, OSError, ValueError) as e:
+            self.last_error = f"{version}: {e}"
+            self._skip_versions.add(version)
+            with self._lock:
+                self._loading = None
+        else:
+            with self._lock:
+                self._previous, self._active = self._active, m
+                self._loading = None
+                self.last_error = None
+
+        # CURRENT may have moved on while this version was loading
+        mtime = self._stat_current()
+        if mtime is not None and mtime != self._current_mtime and not self._pinned:
+            self._follow(mtime)
+
+    def reload(self) -> LinearModel:
+        """
+        Load CURRENT now (blocking) and swap it in; clears a rollback pin.
+        """
+        m = self._warm(self._open())
+        with self._lock:
+            self._previous, self._active = self._active, m
+            self._pinned = False
+            self._skip_versions.discard(self._version_of(m))
+            self._current_mtime = self._stat_current()
+        return m
+
+    # -----------------------------
+    # Operator controls
+    # -----------------------------
+    def rollback(self) -> LinearModel:
+        """
+        Swap back to the previous (still warm) model and stop following the bad version.
+        A newer retrain is picked up again as usual.
+        """
+        with self._lock:
+            if self._previous is None:
+                raise RuntimeError("No previous model to roll back to.")
+            bad = self._version_of(self._active)
+            self._active, self._previous = self._previous, self._active
+            if bad is not None:
+                self._skip_versions.add(bad)
+            return self._active
+
+    def install(self, model: LinearModel, pin: bool = True) -> None:
+        """
+        Serve an in-memory model (benchmarks, notebooks). pin=True stops auto-reload.
+        """
+        with self._lock:
+            self._previous, self._active = self._active, model
+            self._pinned = pin
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "active": self._version_of(self._active),
+            "previous": self._version_of(self._previous),
+            "loading": self._loading,
+            "pinned": self._pinned,
+            "skipped": sorted(self._skip_versions),
+            "last_error": self.last_error,
+            "stale": self._stale.get(self._version_of(self._active)),
+        }
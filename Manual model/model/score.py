@@ -0,0 +1,149 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from config import DB_PATH, HIST_DIR, SCORED_DIR, TRAIN_BATCH_ROWS
+from historical import historical_dataset, historical_source
+from model.artifact import current_version, load_artifact
+from model.features import ENCODER, FEATURE_COLS
+
+SOURCES = {"events": DB_PATH, "historical": HIST_DIR}
+
+def _dataset(source) -> ds.Dataset:
+    # the partitioned history may mix Parquet and Arrow files; historical.py knows how to open it
+    if Path(source) == HIST_DIR:
+        return historical_dataset()
+    return ds.dataset(str(source), format="parquet", partitioning="hive")
+
+# -----------------------------
+# One shard
+# -----------------------------
+def _score_shard(
+    source: str,
+    out_path: str,
+    version: str,
+    batch_rows: int,
+    game_ids: Optional[list] = None,
+    null_game: bool = False,
+) -> int:
+    """
+    Stream a (filtered) source through encoder + model and write one Parquet file:
+    rows whose game_id is in game_ids, rows without a game_id (null_game), or all.
+    Only the current batch is in memory; the model arrays are memory-mapped.
+    """
+    model = load_artifact(version)
+    prob_cols = [f"p_{c}" for c in model.classes]
+
+    dset = _dataset(source)
+    feat_cols = [c for c in FEATURE_COLS if c in dset.schema.names]
+    filt = None
+    if game_ids is not None:
+        filt = ds.field("game_id").isin(game_ids)
+    elif null_game:
+        filt = ds.field("game_id").is_null()
+
+    writer = None
+    n = 0
+    try:
+        for rb in dset.to_batches(batch_size=batch_rows, filter=filt):
+            if rb.num_rows == 0:
+                continue
+            X = ENCODER.transform(rb.select(feat_cols).to_pandas())
+            probs = model.predict_proba_matrix(X)
+
+            tbl = pa.Table.from_batches([rb])
+            for j, name in enumerate(prob_cols):
+                tbl = tbl.append_column(name, pa.array(probs[:, j]))
+
+            if writer is None:
+                schema = tbl.schema.with_metadata({b"model_version": version.encode("utf-8")})
+                writer = pq.ParquetWriter(out_path, schema)
+            writer.write_table(tbl.replace_schema_metadata(writer.schema.metadata))
+            n += rb.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return n
+
+# -----------------------------
+# Driver
+# -----------------------------
+def _shard_game_ids(source: Path, workers: int) -> Tuple[List[list], bool]:
+    """
+    game_id values (in the column's own type) split into up to `workers` shards, and
+    whether any rows have no game_id (those get a shard of their own).
+    """
+    dset = _dataset(source)
+    if "game_id" not in dset.schema.names:
+        return [], False
+    # only the game_id column is read to plan the shards
+    uniq = pc.unique(dset.to_table(columns=["game_id"]).column("game_id"))
+    has_null = uniq.null_count > 0
+    values = sorted(g for g in uniq.to_pylist() if g is not None)
+    return [list(part) for part in np.array_split(np.array(values, dtype=object), workers) if len(part)], has_null
+
+def score_dataset(
+    source: Path,
+    out_dir: Path = SCORED_DIR,
+    batch_rows: int = TRAIN_BATCH_ROWS,
+    workers: int = 1,
+) -> Dict[str, object]:
+    """
+    Score every row of a Parquet file/dataset and write out_dir/part-*.parquet with
+    the source columns plus p_<call_type> columns. workers > 1 shards by game_id,
+    one output file per shard. All shards use the same model version.
+    """
+    source = Path(source)
+    if not source.exists():
+        raise FileNotFoundError(f"No dataset at {source}")
+    version = current_version()
+    if version is None:
+        raise RuntimeError("No model artifact. Train one with: python -m model.train")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for old in out_dir.glob("part-*.parquet"):
+        old.unlink()
+
+    t0 = time.perf_counter()
+    shards, has_null = _shard_game_ids(source, workers) if workers > 1 else ([], False)
+    if not shards:
+        # one worker, or nothing to split on (empty source, no game_id column)
+        n = _score_shard(str(source), str(out_dir / "part-00000.parquet"), version, batch_rows)
+        files = 1
+    else:
+        jobs = [(g, False) for g in shards] + ([(None, True)] if has_null else [])
+        with ProcessPoolExecutor(max_workers=min(len(jobs), workers)) as ex:
+            futs = [
+                ex.submit(_score_shard, str(source), str(out_dir / f"part-{i:05d}.parquet"), version, batch_rows, g, null)
+                for i, (g, null) in enumerate(jobs)
+            ]
+            n = sum(f.result() for f in futs)
+        files = len(jobs)
+
+    return {"rows": n, "files": files, "model_version": version, "out_dir": str(out_dir),
+            "wall_s": time.perf_counter() - t0}
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Batch-score a play dataset with the current model artifact.")
+    ap.add_argument("--source", default="events",
+                    help="'events', 'historical', or a path to a Parquet file/dataset")
+    ap.add_argument("--out", default=str(SCORED_DIR), help="output directory for part-*.parquet")
+    ap.add_argument("--batch-rows", type=int, default=TRAIN_BATCH_ROWS)
+    ap.add_argument("--workers", type=int, default=1, help="processes; >1 shards by game_id")
+    args = ap.parse_args()
+
+    src = SOURCES.get(args.source, Path(args.source))
+    if args.source == "historical":
+        src = historical_source() or src
+    res = score_dataset(src, Path(args.out), batch_rows=args.batch_rows, workers=args.workers)
+    print(f"Scored {res['rows']} plays with model {res['model_version']} "
+          f"-> {res['out_dir']} ({res['files']} file(s), {res['wall_s']:.1f}s)")
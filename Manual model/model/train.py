@@ -1,66 +1,213 @@
-import joblib
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-
-from config import MODEL_PATH
-from storage import load_events, load_historical
-from model.features import featurize
-
-def train_playtype_model(min_labeled: int = 200):
-    """
-    Trains on (historical + your tagged labeled plays), if historical exists.
-    """
-    df_live = load_events()
-    df_hist = load_historical()
-
-    frames = []
-    if not df_hist.empty:
-        frames.append(df_hist)
-    if not df_live.empty:
-        frames.append(df_live)
-
-    if not frames:
-        raise RuntimeError("No data found. Add historical_events.parquet or tag some plays.")
-
-    df = __import__("pandas").concat(frames, ignore_index=True)
-    df = df[df["outcome"].notna()].copy()
-
-    if len(df) < min_labeled:
-        raise RuntimeError(f"Need at least {min_labeled} labeled plays total. Currently: {len(df)}")
-
-    X = featurize(df)
-    y = df["outcome"].astype(str)
-
-    cat = ["pv_possession", "clock_bucket", "dist_bucket", "field_zone",
-           "opp_personnel", "opp_formation", "def_shell", "pressure"]
-    bools = ["hurry_up"]
-    num = ["quarter", "down"]
-
-    pre = ColumnTransformer(
-        transformers=[
-            ("cat", OneHotEncoder(handle_unknown="ignore"), cat),
-            ("bool", "passthrough", bools),
-            ("num", "passthrough", num),
-        ],
-        remainder="drop"
-    )
-
-    clf = LogisticRegression(max_iter=400)
-    pipe = Pipeline([("pre", pre), ("clf", clf)])
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.25, random_state=42, stratify=y
-    )
-    pipe.fit(X_train, y_train)
-    acc = pipe.score(X_test, y_test)
-
-    joblib.dump(pipe, MODEL_PATH)
-    return acc
-
-if __name__ == "__main__":
-    acc = train_playtype_model()
-    print(f"Saved model -> {MODEL_PATH}")
-    print(f"Holdout accuracy: {acc:.3f}")
+import argparse
+import numpy as np
+import pyarrow.parquet as pq
+
+from config import ARTIFACTS_DIR, MODEL_PATH, MODEL_STATE_PATH, DB_PATH, OUTCOMES, TRAIN_BATCH_ROWS, ensure_dir
+from storage import load_events, last_write_seq, outcome_labels, write_seqs, SEQ_COL
+from historical import historical_files, iter_historical_batches, load_historical
+from model.features import FEATURE_COLS, ENCODER
+from model.linear import LinearModel
+from model.artifact import ArtifactError, save_artifact, read_manifest, data_fingerprint
+
+TARGET_CLASSES = np.array([o for o in OUTCOMES if o != "unknown"])
+
+def _read_training_meta() -> dict:
+    try:
+        return read_manifest().get("training", {})
+    except ArtifactError:
+        return {}
+
+def load_labeled(min_labeled: int = 200, leagues=None, seasons=None):
+    """
+    Historical + tagged plays that have an outcome label, as one frame.
+    Only the model's columns are read from history; leagues/seasons narrow it further.
+    Tagged plays are labeled by storage.outcome_labels (call_type when outcome is unset).
+    """
+    df_live = load_events()
+    if not df_live.empty:
+        labels = outcome_labels(df_live)
+        df_live = df_live.assign(outcome=labels) if labels is not None else df_live.iloc[0:0]
+    df_hist = load_historical(FEATURE_COLS + ["outcome"], leagues=leagues, seasons=seasons, labeled_only=True)
+
+    frames = []
+    if not df_hist.empty:
+        frames.append(df_hist)
+    if not df_live.empty:
+        frames.append(df_live)
+
+    if not frames:
+        raise RuntimeError("No data found. Add historical data (data/historical/) or tag some plays.")
+
+    df = __import__("pandas").concat(frames, ignore_index=True)
+    if "outcome" not in df.columns:
+        raise RuntimeError(f"Need at least {min_labeled} labeled plays total. Currently: 0")
+    df = df[df["outcome"].notna()].copy()
+
+    if len(df) < min_labeled:
+        raise RuntimeError(f"Need at least {min_labeled} labeled plays total. Currently: {len(df)}")
+    return df
+
+def train_playtype_model(min_labeled: int = 200, leagues=None, seasons=None):
+    """
+    Trains on (historical + your tagged labeled plays), if historical exists.
+    """
+    # sklearn is only needed to fit (~1 s to import); prediction never loads it
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import train_test_split
+
+    store_seq = last_write_seq()
+    df = load_labeled(min_labeled, leagues, seasons)
+
+    X = ENCODER.transform(df)
+    y = df["outcome"].astype(str).to_numpy()
+
+    clf = LogisticRegression(max_iter=400)
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.25, random_state=42, stratify=y
+    )
+    clf.fit(X_train, y_train)
+    acc = clf.score(X_test, y_test)
+
+    training = {"mode": "full", "n_labeled": int(len(df)), "holdout_accuracy": float(acc),
+                "leagues": leagues, "seasons": seasons, "store_seq": store_seq}
+    fp = data_fingerprint(historical_files(), {"leagues": leagues, "seasons": seasons})
+    save_artifact(LinearModel.from_sklearn(clf), training, fp)
+    return acc
+
+# -----------------------------
+# Out-of-core training
+# -----------------------------
+def _iter_labeled_batches(path, batch_rows: int, min_seq: int = None):
+    """
+    Yield labeled plays from the event store Parquet file one row batch at a time,
+    labeled by storage.outcome_labels. Only the feature/label columns are read, so
+    memory is bounded by batch_rows. min_seq keeps rows written after that write.
+    """
+    pf = pq.ParquetFile(path)
+    names = set(pf.schema_arrow.names)
+    if not {"outcome", "call_type"} & names:
+        return
+    cols = [c for c in FEATURE_COLS + ["outcome", "call_type", SEQ_COL] if c in names]
+
+    for rb in pf.iter_batches(batch_size=batch_rows, columns=cols):
+        df = rb.to_pandas()
+        df["outcome"] = outcome_labels(df)
+        df = df[df["outcome"].notna()]
+        if min_seq is not None:
+            df = df[write_seqs(df) > min_seq]
+        if not df.empty:
+            yield df
+
+def train_playtype_model_streaming(
+    batch_rows: int = TRAIN_BATCH_ROWS,
+    warm_start: bool = False,
+    epochs: int = 1,
+    leagues=None,
+    seasons=None,
+) -> int:
+    """
+    Out-of-core training: stream Parquet row batches through the fixed-vocabulary
+    encoder into SGDClassifier.partial_fit.
+
+    warm_start=True continues the last streaming artifact and only consumes event-store
+    rows written after its watermark, the last storage write it read (historical data
+    is already in the model). A play relabeled since then is fed again, so the model
+    moves toward the corrected label; n_labeled counts it once per time it was fed.
+    Returns the number of labeled plays consumed.
+    """
+    import joblib
+    from sklearn.linear_model import SGDClassifier
+
+    meta = _read_training_meta()
+
+    if warm_start:
+        if meta.get("mode") != "stream" or not MODEL_STATE_PATH.exists():
+            raise RuntimeError("Warm start needs a previous streaming artifact. Run with --stream first.")
+        if meta.get("trained_through_seq") is None:
+            raise RuntimeError("The last streaming artifact has no write watermark. Run with --stream first.")
+        clf = joblib.load(MODEL_STATE_PATH)
+        watermark = int(meta["trained_through_seq"])
+        leagues, seasons = meta.get("leagues"), meta.get("seasons")
+    else:
+        clf = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=42)
+        watermark = None
+
+    n_seen = 0
+    for _ in range(max(1, int(epochs))):
+        hist = [] if warm_start else iter_historical_batches(
+            FEATURE_COLS + ["outcome"], leagues=leagues, seasons=seasons, labeled_only=True, batch_rows=batch_rows)
+        live = _iter_labeled_batches(DB_PATH, batch_rows, min_seq=watermark if warm_start else None) if DB_PATH.exists() else []
+
+        for is_live, batches in ((False, hist), (True, live)):
+            for df in batches:
+                y = df["outcome"].astype(str)
+                keep = y.isin(TARGET_CLASSES).to_numpy()
+                if not keep.any():
+                    continue
+                clf.partial_fit(ENCODER.transform(df)[keep], y[keep], classes=TARGET_CLASSES)
+                n_seen += int(keep.sum())
+
+                if is_live:
+                    batch_max = int(write_seqs(df).max())
+                    watermark = batch_max if watermark is None else max(watermark, batch_max)
+
+    if n_seen == 0:
+        if warm_start:
+            return 0
+        raise RuntimeError("No labeled data found. Add historical data (data/historical/) or tag some plays.")
+
+    watermark = 0 if watermark is None else watermark  # no store rows read yet: a warm start takes them all
+    training = {
+        "mode": "stream",
+        "trained_through_seq": watermark,
+        "store_seq": watermark,
+        "leagues": leagues,
+        "seasons": seasons,
+        "n_labeled": int(meta.get("n_labeled", 0) if warm_start else 0) + n_seen,
+    }
+    joblib.dump(clf, ensure_dir(MODEL_STATE_PATH))
+    fp = data_fingerprint(historical_files(), {"leagues": leagues, "seasons": seasons})
+    save_artifact(LinearModel.from_sklearn(clf), training, fp)
+    return n_seen
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Train the play-type model.")
+    ap.add_argument("--stream", action="store_true",
+                    help="out-of-core: stream Parquet batches into partial_fit")
+    ap.add_argument("--warm-start", action="store_true",
+                    help="continue the last streaming artifact with newly tagged plays only")
+    ap.add_argument("--batch-rows", type=int, default=TRAIN_BATCH_ROWS)
+    ap.add_argument("--epochs", type=int, default=1)
+    ap.add_argument("--cv", action="store_true",
+                    help="stratified k-fold CV over C x feature subsets instead of training")
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--C", type=float, nargs="+", default=None, help="regularization grid (default: model.cv.C_GRID)")
+    ap.add_argument("--subsets", nargs="+", default=None, help="feature subsets (default: all in model.cv.FEATURE_SUBSETS)")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--leagues", nargs="+", default=None, help="historical leagues to use (default: all)")
+    ap.add_argument("--seasons", type=int, nargs="+", default=None, help="historical seasons to use (default: all)")
+    args = ap.parse_args()
+
+    if args.cv:
+        from model.cv import cross_validate_grid
+        df = load_labeled(leagues=args.leagues, seasons=args.seasons)
+        report = cross_validate_grid(df, folds=args.folds, c_grid=args.C,
+                                     subsets=args.subsets, max_workers=args.workers)
+        out = ensure_dir(ARTIFACTS_DIR / "cv_report.csv")
+        report.to_csv(out, index=False)
+        print(report.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+        print(f"{len(report)} configs x {args.folds} folds in {report.attrs['total_wall_s']:.1f}s "
+              f"on {report.attrs['workers']} worker(s) -> {out}")
+    elif args.stream or args.warm_start:
+        n = train_playtype_model_streaming(args.batch_rows, warm_start=args.warm_start, epochs=args.epochs,
+                                           leagues=args.leagues, seasons=args.seasons)
+        if n == 0:
+            print("No new labeled plays since the last artifact; model unchanged.")
+        else:
+            print(f"Saved model -> {MODEL_PATH}")
+            print(f"Streamed {n} labeled plays")
+    else:
+        acc = train_playtype_model(leagues=args.leagues, seasons=args.seasons)
+        print(f"Saved model -> {MODEL_PATH}")
+        print(f"Holdout accuracy: {acc:.3f}")
@@ -0,0 +1,167 @@
+import http.client
+import json
+import socket
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import SERVICE_HOST, SERVICE_PORT, NOTIFY_PORT
+
+# Dashboard panels a viewer can refresh independently
+PANELS = ("situation", "posteriors", "previews", "epa", "summary", "plays")
+
+# Fields that only change what a panel shows, never the numbers behind it
+_SILENT_FIELDS = {"ts", "meta"}
+_SITUATION_FIELDS = {
+    "quarter", "clock_bucket", "hurry_up", "down", "dist_bucket", "field_zone",
+    "goal_to_go", "pv_possession", "def_shell", "pressure", "opp_personnel", "opp_formation",
+}
+_RESULT_FIELDS = {"first_down", "td", "yards_bucket", "turnover", "pass_result"}
+
+_sock: Optional[socket.socket] = None
+
+# -----------------------------
+# Publish (storage writes)
+# -----------------------------
+def publish_play_changed(
+    session_id: str,
+    game_id: str,
+    play_nos: Iterable[int],
+    kind: str,
+    fields: Iterable[str],
+    version: Tuple[int, int],
+) -> None:
+    """
+    Fire-and-forget UDP datagram to the hub (service.py). Never blocks or raises:
+    with no hub running the write path is unaffected.
+    """
+    global _sock
+    event = {
+        "type": "play_changed",
+        "session_id": str(session_id),
+        "game_id": str(game_id),
+        "play_nos": sorted(int(p) for p in play_nos),
+        "kind": kind,  # "tag" (new play), "label" (edited play) or "import"
+        "fields": sorted(set(fields)),
+        "version": list(version),
+        "ts": time.time(),
+    }
+    try:
+        if _sock is None:
+            _sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        _sock.sendto(json.dumps(event).encode("utf-8"), (SERVICE_HOST, NOTIFY_PORT))
+    except OSError:
+        pass
+
+def panels_for(event: Dict[str, Any], latest_play_no: Optional[int]) -> Set[str]:
+    """
+    Which panels a change can move. A new play or an edit to the latest play moves
+    everything; a label fixed on an older play only moves counts-based panels.
+    """
+    fields = set(event.get("fields", [])) - _SILENT_FIELDS
+    if not fields:
+        return set()
+    plays = event.get("play_nos", [])
+    if event.get("kind") != "label" or latest_play_no is None or max(plays, default=0) >= latest_play_no:
+        return set(PANELS)
+
+    out = {"plays", "posteriors", "summary"}
+    if fields & (_RESULT_FIELDS | {"call_type", "down"}):
+        out |= {"epa", "previews"}
+    if fields & _SITUATION_FIELDS:
+        out |= {"epa"}
+    return out
+
+# -----------------------------
+# Subscribe (viewers)
+# -----------------------------
+def iter_events(host: str = SERVICE_HOST, port: int = SERVICE_PORT, timeout: float = 30.0,
+                session_id: Optional[str] = None, game_id: Optional[str] = None):
+    """
+    Yield change events from the service's /events stream (server-sent events).
+    """
+    path = "/events"
+    if session_id and game_id:
+        path += f"?session_id={session_id}&game_id={game_id}"
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request("GET", path, headers={"Accept": "text/event-stream"})
+        resp = conn.getresponse()
+        if resp.status != 200:
+            raise ConnectionError(f"/events returned {resp.status}")
+        while True:
+            line = resp.fp.readline()
+            if not line:
+                return
+            if line.startswith(b"data:"):
+                yield json.loads(line[5:].strip())
+    finally:
+        conn.close()
+
+class ChangeListener:
+    """
+    Background subscriber that keeps, per (session, game), the store version of the
+    last change and the last change seen by each panel.
+
+    Viewers key their caches on token(session, game, panel) instead of the global
+    store version, so a tag in another game doesn't recompute this one. Without a
+    hub the tokens are None and callers fall back to storage.store_version().
+    """
+
+    def __init__(self, host: str = SERVICE_HOST, port: int = SERVICE_PORT):
+        self.host, self.port = host, int(port)
+        self.connected = False
+        self.last_error: Optional[str] = None
+        self._epoch = 0  # bumped per (re)connect so tokens from before a gap are never reused
+        self._lock = threading.Lock()
+        self._games: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        delay = 0.5
+        while True:
+            try:
+                for ev in iter_events(self.host, self.port):
+                    if not self.connected:
+                        # anything may have changed while we were away
+                        with self._lock:
+                            self._games.clear()
+                            self._epoch += 1
+                        self.connected = True
+                    delay = 0.5
+                    if ev.get("type") == "play_changed":
+                        self._apply(ev)
+            except (OSError, ConnectionError, ValueError) as e:
+                self.last_error = str(e)
+            self.connected = False
+            time.sleep(delay)
+            delay = min(delay * 2, 10.0)
+
+    def _apply(self, ev: Dict[str, Any]) -> None:
+        key = (ev["session_id"], ev["game_id"])
+        version = tuple(ev.get("version", ()))
+        with self._lock:
+            g = self._games.setdefault(key, {"latest_play_no": None, "version": None, "panels": {}})
+            panels = panels_for(ev, g["latest_play_no"])
+            plays = ev.get("play_nos", [])
+            if plays:
+                g["latest_play_no"] = max(plays + [g["latest_play_no"] or 0])
+            if panels:
+                g["version"] = version
+                for p in panels:
+                    g["panels"][p] = version
+
+    def token(self, session_id: str, game_id: str, panel: Optional[str] = None):
+        if not self.connected:
+            return None
+        with self._lock:
+            base = ("since_connect", self._epoch)
+            g = self._games.get((session_id, game_id))
+            if g is None:
+                return base
+            return g["panels"].get(panel, base) if panel else (g["version"] or base)
+
+    def games(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return list(self._games)
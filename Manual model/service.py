@@ -0,0 +1,428 @@
+import argparse
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from config import SERVICE_HOST, SERVICE_PORT, NOTIFY_PORT
+from storage import load_events, list_session_game, store_version
+from analytics.dashboard import compute_dashboard
+from analytics.prior_tables import PriorWatcher, version as prior_version
+from tracing import snapshot as stage_snapshot, prometheus_text
+
+# Encoded responses kept per (store version, priors version, session, game, sliders)
+RESULT_CACHE_SIZE = 256
+# Requests per route kept for the latency percentiles
+LATENCY_WINDOW = 2048
+MAX_BODY_BYTES = 8 * 1024 * 1024
+# /events keep-alive; subscribers treat ~2 missed pings as a dead hub
+SSE_PING_S = 10.0
+SSE_QUEUE_SIZE = 256
+
+# -----------------------------
+# JSON
+# -----------------------------
+def _jsonable(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {str(k): _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    return obj
+
+def _encode(obj: Any) -> bytes:
+    return json.dumps(_jsonable(obj), separators=(",", ":")).encode("utf-8")
+
+# -----------------------------
+# Warm state
+# -----------------------------
+class DashboardCache:
+    """
+    Event store frame (reloaded only when store_version() changes) plus an LRU of
+    encoded dashboard responses. A write to the store or a prior table reload changes
+    the key, so old entries are never served; they just age out.
+    """
+
+    def __init__(self, size: int = RESULT_CACHE_SIZE):
+        self.size = int(size)
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[tuple] = None
+        self._events = pd.DataFrame()
+        self._results: "OrderedDict[tuple, bytes]" = OrderedDict()
+        # requests are computed on executor threads
+        self._lock = threading.Lock()
+
+    def events(self) -> Tuple[tuple, pd.DataFrame]:
+        v = store_version()
+        with self._lock:
+            if v != self._version:
+                self._events = load_events()
+                self._version = v
+            return v, self._events
+
+    def games(self):
+        _, df = self.events()
+        if df.empty:
+            return []
+        pairs = df[["session_id", "game_id"]].drop_duplicates()
+        return [{"session_id": s, "game_id": g} for s, g in pairs.itertuples(index=False)]
+
+    def dashboard(self, session_id: str, game_id: str, league_mix_cfb: float, prior_strength: float,
+                  summaries: bool = True) -> Tuple[bytes, bool]:
+        v, df = self.events()
+        key = (v, prior_version(), session_id, game_id, round(league_mix_cfb, 4), round(prior_strength, 4), summaries)
+        with self._lock:
+            body = self._results.get(key)
+            if body is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return body, True
+            self.misses += 1
+
+        plays = list_session_game(df, session_id, game_id)
+        if plays.empty:
+            raise LookupError(f"No plays for session {session_id!r} / game {game_id!r}.")
+        body = _encode(compute_dashboard({
+            "plays": plays,
+            "league_mix_cfb": league_mix_cfb,
+            "prior_strength": prior_strength,
+            "summaries": summaries,
+        }))
+        with self._lock:
+            self._results[key] = body
+            while len(self._results) > self.size:
+                self._results.popitem(last=False)
+        return body, False
+
+    def warm(self) -> int:
+        """
+        Load the store and precompute every game at the default sliders.
+        """
+        n = 0
+        for g in self.games():
+            try:
+                self.dashboard(g["session_id"], g["game_id"], 0.5, 1.0)
+                n += 1
+            except (LookupError, ValueError):
+                pass
+        return n
+
+# -----------------------------
+# Latency metrics
+# -----------------------------
+class LatencyStats:
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = int(window)
+        self._ms: Dict[str, deque] = {}
+        self._count: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+
+    def record(self, route: str, ms: float, ok: bool) -> None:
+        self._ms.setdefault(route, deque(maxlen=self.window)).append(ms)
+        self._count[route] = self._count.get(route, 0) + 1
+        if not ok:
+            self._errors[route] = self._errors.get(route, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        for route, buf in self._ms.items():
+            a = np.fromiter(buf, dtype=float)
+            p50, p95, p99 = np.percentile(a, [50, 95, 99])
+            out[route] = {
+                "count": self._count[route],
+                "errors": self._errors.get(route, 0),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": float(a.max()),
+            }
+        return out
+
+# -----------------------------
+# HTTP
+# -----------------------------
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+ROUTES = {"/health", "/metrics", "/games", "/dashboard", "/events"}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+def _float_arg(params: Dict[str, Any], name: str, default: float, lo: float, hi: float) -> float:
+    raw = params.get(name, default)
+    try:
+        x = float(raw)
+    except (TypeError, ValueError):
+        raise HttpError(400, f"{name} must be a number")
+    if not (lo <= x <= hi):
+        raise HttpError(400, f"{name} must be in [{lo}, {hi}]")
+    return x
+
+def _bool_arg(params: Dict[str, Any], name: str, default: bool) -> bool:
+    raw = params.get(name, default)
+    if isinstance(raw, bool):
+        return raw
+    return str(raw).lower() in ("1", "true", "yes", "y")
+
+class DashboardService:
+    """
+    Minimal asyncio HTTP/1.1 server (stdlib only), JSON in / JSON out.
+
+      GET  /health
+      GET  /metrics                   per-route latency percentiles + cache hit rate
+      GET  /metrics?format=prometheus stage latency histograms (tracing.py) as Prometheus text
+      GET  /games                     session/game pairs in the event store
+      GET  /dashboard?session_id=..&game_id=..&league_mix_cfb=..&prior_strength=..
+      POST /dashboard                 same fields as a JSON body; or "plays": [...]
+                                      to score plays that aren't in the store
+      GET  /events[?session_id=..&game_id=..]
+                                      server-sent "play_changed" events (see notify.py)
+
+    It is also the pub/sub hub: storage writes send play_changed datagrams to
+    NOTIFY_PORT, which are fanned out to /events subscribers and re-warm the game.
+    """
+
+    def __init__(self, cache: Optional[DashboardCache] = None):
+        self.cache = cache or DashboardCache()
+        self.stats = LatencyStats()
+        self.started = time.time()
+        self.published = 0
+        self._subs: Dict[asyncio.Queue, Tuple[Optional[str], Optional[str]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.priors: Optional[PriorWatcher] = None  # started by serve()
+
+    # --- pub/sub ---
+    def publish(self, event: Dict[str, Any]) -> None:
+        self.published += 1
+        for q, (sid, gid) in list(self._subs.items()):
+            if sid is not None and (sid, gid) != (event.get("session_id"), event.get("game_id")):
+                continue
+            if q.full():
+                # slow subscriber: drop its oldest event rather than stall the hub
+                q.get_nowait()
+            q.put_nowait(event)
+
+        # recompute the changed game now, so the next request is a cache hit
+        sid, gid = event.get("session_id"), event.get("game_id")
+        if sid and gid and self._loop is not None:
+            self._loop.run_in_executor(None, self._rewarm, sid, gid)
+
+    def _rewarm(self, session_id: str, game_id: str) -> None:
+        try:
+            self.cache.dashboard(session_id, game_id, 0.5, 1.0)
+        except (LookupError, ValueError):
+            pass
+
+    async def _stream_events(self, writer: asyncio.StreamWriter, params: Dict[str, Any]) -> None:
+        q: asyncio.Queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+        sid, gid = params.get("session_id"), params.get("game_id")
+        self._subs[q] = (sid, gid) if sid and gid else (None, None)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                         b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+            writer.write(b"data: " + _encode({"type": "hello", "store_version": list(store_version())}) + b"\n\n")
+            await writer.drain()
+            while True:
+                try:
+                    ev = await asyncio.wait_for(q.get(), timeout=SSE_PING_S)
+                except asyncio.TimeoutError:
+                    ev = {"type": "ping"}
+                writer.write(b"data: " + _encode(ev) + b"\n\n")
+                await writer.drain()
+        finally:
+            self._subs.pop(q, None)
+
+    # --- routes ---
+    def _dashboard(self, params: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+        mix = _float_arg(params, "league_mix_cfb", 0.5, 0.0, 1.0)
+        strength = _float_arg(params, "prior_strength", 1.0, 0.0, 100.0)
+        summaries = _bool_arg(params, "summaries", True)
+
+        if params.get("plays") is not None:
+            if not isinstance(params["plays"], list):
+                raise HttpError(400, "plays must be a list of play objects")
+            try:
+                body = _encode(compute_dashboard({"plays": params["plays"], "league_mix_cfb": mix,
+                                                  "prior_strength": strength, "summaries": summaries}))
+            except ValueError as e:
+                raise HttpError(400, str(e))
+            return body, {"X-Cache": "none"}
+
+        sid, gid = params.get("session_id"), params.get("game_id")
+        if not sid or not gid:
+            raise HttpError(400, "session_id and game_id are required (or pass plays)")
+        try:
+            body, hit = self.cache.dashboard(str(sid), str(gid), mix, strength, summaries)
+        except LookupError as e:
+            raise HttpError(404, str(e))
+        return body, {"X-Cache": "hit" if hit else "miss"}
+
+    def _metrics(self) -> bytes:
+        total = self.cache.hits + self.cache.misses
+        return _encode({
+            "uptime_s": time.time() - self.started,
+            "routes": self.stats.snapshot(),
+            "stages": stage_snapshot(),  # empty unless PV_TRACE=1
+            "events": {"published": self.published, "subscribers": len(self._subs)},
+            "cache": {"hits": self.cache.hits, "misses": self.cache.misses,
+                      "hit_rate": self.cache.hits / total if total else None,
+                      "entries": len(self.cache._results)},
+            "priors": None if self.priors is None else {"reloads": self.priors.reloads,
+                                                        "last_changed": self.priors.last_changed,
+                                                        "last_error": self.priors.last_error},
+        })
+
+    def handle(self, method: str, target: str, body: bytes) -> Tuple[int, bytes, Dict[str, str]]:
+        url = urlsplit(target)
+        params: Dict[str, Any] = dict(parse_qsl(url.query))
+        path = url.path.rstrip("/") or "/"
+
+        if path == "/health":
+            return 200, _encode({"ok": True, "store_version": list(store_version()),
+                                 "priors": {name: ver for name, ver, _ in prior_version()}}), {}
+        if path == "/metrics":
+            if params.get("format") == "prometheus":
+                return 200, prometheus_text().encode("utf-8"), {"Content-Type": "text/plain; version=0.0.4"}
+            return 200, self._metrics(), {}
+        if path == "/games":
+            return 200, _encode(self.cache.games()), {}
+        if path == "/dashboard":
+            if method == "POST":
+                try:
+                    payload = json.loads(body or b"{}")
+                except json.JSONDecodeError:
+                    raise HttpError(400, "body is not valid JSON")
+                if not isinstance(payload, dict):
+                    raise HttpError(400, "body must be a JSON object")
+                params.update(payload)
+            elif method != "GET":
+                raise HttpError(405, "use GET or POST")
+            out, headers = self._dashboard(params)
+            return 200, out, headers
+        raise HttpError(404, f"no route {path}")
+
+    # --- transport ---
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "malformed request line")
+
+        headers = {}
+        while True:
+            h = await reader.readline()
+            if h in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = h.decode("latin-1").partition(":")
+            headers[k.strip().lower()] = v.strip()
+
+        # the body is never read after a bad length, so the error response also closes the connection
+        try:
+            n = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HttpError(400, "content-length must be a non-negative integer")
+        if n < 0:
+            raise HttpError(400, "content-length must be a non-negative integer")
+        if n > MAX_BODY_BYTES:
+            raise HttpError(413, "body too large")
+        body = await reader.readexactly(n) if n else b""
+        keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+        return method.upper(), target, body, keep_alive
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                t0 = time.perf_counter()
+                route = "?"
+                keep_alive = False
+                headers: Dict[str, str] = {}
+                try:
+                    req = await self._read_request(reader)
+                    if req is None:
+                        break
+                    method, target, body, keep_alive = req
+                    route = urlsplit(target).path.rstrip("/") or "/"
+                    route = route if route in ROUTES else "other"
+                    if route == "/events" and method == "GET":
+                        await self._stream_events(writer, dict(parse_qsl(urlsplit(target).query)))
+                        break
+                    # compute off the event loop so slow misses don't stall other clients
+                    status, out, headers = await loop.run_in_executor(None, self.handle, method, target, body)
+                except HttpError as e:
+                    status, out = e.status, _encode({"error": str(e)})
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    status, out = 500, _encode({"error": f"{type(e).__name__}: {e}"})
+
+                ms = (time.perf_counter() - t0) * 1000.0
+                self.stats.record(route, ms, status < 400)
+                head = [
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                    f"Content-Type: {headers.pop('Content-Type', 'application/json')}",
+                    f"Content-Length: {len(out)}",
+                    f"X-Elapsed-Ms: {ms:.3f}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ] + [f"{k}: {v}" for k, v in headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + out)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = SERVICE_HOST, port: int = SERVICE_PORT, warm: bool = True) -> None:
+        if warm:
+            n = self.cache.warm()
+            print(f"Warmed {n} game(s) at store version {self.cache._version}")
+        self.priors = PriorWatcher()  # edited prior files go live without a restart
+        self._loop = asyncio.get_running_loop()
+        await self._loop.create_datagram_endpoint(lambda: _NotifyProtocol(self), local_addr=(SERVICE_HOST, NOTIFY_PORT))
+        server = await asyncio.start_server(self._client, host, port)
+        print(f"Serving dashboard on http://{host}:{port} (change events on udp {SERVICE_HOST}:{NOTIFY_PORT})")
+        async with server:
+            await server.serve_forever()
+
+class _NotifyProtocol(asyncio.DatagramProtocol):
+    def __init__(self, service: DashboardService):
+        self.service = service
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            event = json.loads(data)
+        except ValueError:
+            return
+        if isinstance(event, dict) and event.get("type") == "play_changed":
+            self.service.publish(event)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Headless dashboard service (JSON over HTTP).")
+    ap.add_argument("--host", default=SERVICE_HOST, help="0.0.0.0 to serve sideline tablets on the LAN")
+    ap.add_argument("--port", type=int, default=SERVICE_PORT)
+    ap.add_argument("--no-warm", action="store_true", help="skip precomputing games at startup")
+    args = ap.parse_args()
+    try:
+        asyncio.run(DashboardService().serve(args.host, args.port, warm=not args.no_warm))
+    except KeyboardInterrupt:
+        pass
@@ -1,55 +1,166 @@
-import pandas as pd
-from config import DB_PATH
-
-KEY_COLS = ["session_id", "game_id", "play_no"]
-
-def load_events() -> pd.DataFrame:
-    if DB_PATH.exists():
-        return pd.read_parquet(DB_PATH)
-    return pd.DataFrame()
-
-def upsert_event(event_dict: dict) -> None:
-    df = load_events()
-    new = pd.DataFrame([event_dict])
-
-    if df.empty:
-        out = new
-    else:
-        out = pd.concat([df, new], ignore_index=True)
-        out = out.drop_duplicates(subset=KEY_COLS, keep="last")
-
-    out.to_parquet(DB_PATH, index=False)
-
-def upsert_many(df_new: pd.DataFrame) -> None:
-    if df_new is None or df_new.empty:
-        return
-    for c in KEY_COLS:
-        if c not in df_new.columns:
-            raise ValueError(f"Missing required column: {c}")
-
-    df = load_events()
-    if df.empty:
-        out = df_new.copy()
-    else:
-        out = pd.concat([df, df_new], ignore_index=True)
-        out = out.drop_duplicates(subset=KEY_COLS, keep="last")
-
-    out.to_parquet(DB_PATH, index=False)
-
-def list_session_game(df: pd.DataFrame, session_id: str, game_id: str) -> pd.DataFrame:
-    if df.empty:
-        return df
-    sub = df[(df["session_id"] == session_id) & (df["game_id"] == game_id)].copy()
-    if sub.empty:
-        return sub
-    return sub.sort_values(["play_no", "ts"]).drop_duplicates(subset=["play_no"], keep="last")
-
-def get_play(df: pd.DataFrame, session_id: str, game_id: str, play_no: int) -> pd.DataFrame:
-    if df.empty:
-        return df
-    sub = df[
-        (df["session_id"] == session_id) &
-        (df["game_id"] == game_id) &
-        (df["play_no"] == play_no)
-    ]
-    return sub.tail(1)
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from typing import Optional
+import config
+from config import DB_PATH, ensure_dir
+from notify import publish_play_changed
+from tracing import span, traced
+
+KEY_COLS = ["session_id", "game_id", "play_no"]
+# Every write stamps the rows it wrote with the next sequence number, so readers
+# can find what changed since they last looked (analytics/rollups.py) without
+# rescanning every play. Rows from before the column existed read as 0.
+SEQ_COL = "write_seq"
+
+def load_events() -> pd.DataFrame:
+    if DB_PATH.exists():
+        with span("storage.read"):
+            return pd.read_parquet(DB_PATH)
+    return pd.DataFrame()
+
+def store_version() -> tuple:
+    """
+    Cheap change token for the event store (changes on every write). Cache key for the dashboard.
+    """
+    try:
+        st = DB_PATH.stat()
+    except FileNotFoundError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+def _next_seq(df: pd.DataFrame) -> int:
+    if df.empty or SEQ_COL not in df.columns:
+        return 1
+    last = df[SEQ_COL].max()
+    return 1 if pd.isna(last) else int(last) + 1
+
+def _stamped(out: pd.DataFrame) -> pd.DataFrame:
+    # older rows come back NaN after a concat; keep the column integral
+    out[SEQ_COL] = out[SEQ_COL].fillna(0).astype("int64")
+    return out
+
+def last_write_seq() -> int:
+    """
+    Newest SEQ_COL stamp in the store (0 when empty or unstamped); reads that one column.
+    """
+    if not DB_PATH.exists():
+        return 0
+    pf = pq.ParquetFile(DB_PATH)
+    if SEQ_COL not in pf.schema_arrow.names:
+        return 0
+    last = pc.max(pf.read(columns=[SEQ_COL]).column(SEQ_COL)).as_py()
+    return 0 if last is None else int(last)
+
+def _publishes() -> bool:
+    # only the configured store talks to the hub; tools and checks that point DB_PATH
+    # at a scratch copy write silently, with no opt-out of their own
+    return DB_PATH == config.DB_PATH
+
+def write_seqs(df: pd.DataFrame) -> pd.Series:
+    """
+    Each row's SEQ_COL stamp; rows written before storage kept it count as the oldest write (0).
+    """
+    if SEQ_COL not in df.columns:
+        return pd.Series(0, index=df.index, dtype="int64")
+    return df[SEQ_COL].fillna(0).astype("int64")
+
+def outcome_labels(df: pd.DataFrame) -> Optional[pd.Series]:
+    """
+    Each row's outcome label. Tagged plays carry their label as call_type and never
+    write outcome, so call_type fills any missing outcome. None when df has neither.
+    """
+    if df is None or df.empty or not {"outcome", "call_type"} & set(df.columns):
+        return None
+    if "outcome" not in df.columns:
+        return df["call_type"]
+    if "call_type" not in df.columns:
+        return df["outcome"]
+    return df["outcome"].fillna(df["call_type"])
+
+def _same(a, b) -> bool:
+    try:
+        if pd.isna(a) and pd.isna(b):
+            return True
+    except (TypeError, ValueError):
+        pass
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+def _changed_fields(old: pd.DataFrame, event_dict: dict) -> list:
+    if old.empty:
+        return list(event_dict)
+    prev = old.iloc[-1].to_dict()
+    return [k for k, v in event_dict.items() if not _same(prev.get(k), v)]
+
+@traced("storage.upsert_event")
+def upsert_event(event_dict: dict) -> tuple:
+    """
+    Write one play (replacing any earlier copy). Returns the store version stamped
+    right after the write, the same one published to the hub.
+    """
+    df = load_events()
+    new = pd.DataFrame([event_dict]).assign(**{SEQ_COL: _next_seq(df)})
+
+    if df.empty:
+        out = new
+        old = df
+    else:
+        old = get_play(df, event_dict["session_id"], event_dict["game_id"], event_dict["play_no"])
+        out = pd.concat([df, new], ignore_index=True)
+        out = out.drop_duplicates(subset=KEY_COLS, keep="last")
+
+    with span("storage.write"):
+        _stamped(out).to_parquet(ensure_dir(DB_PATH), index=False)
+    version = store_version()
+    if _publishes():
+        publish_play_changed(
+            event_dict["session_id"], event_dict["game_id"], [event_dict["play_no"]],
+            kind="tag" if old.empty else "label",
+            fields=_changed_fields(old, event_dict),
+            version=version,
+        )
+    return version
+
+@traced("storage.upsert_many")
+def upsert_many(df_new: pd.DataFrame) -> None:
+    if df_new is None or df_new.empty:
+        return
+    for c in KEY_COLS:
+        if c not in df_new.columns:
+            raise ValueError(f"Missing required column: {c}")
+
+    df = load_events()
+    stamped = df_new.assign(**{SEQ_COL: _next_seq(df)})
+    # duplicate keys within one batch collapse too, so the store holds one row per play
+    out = stamped if df.empty else pd.concat([df, stamped], ignore_index=True)
+    out = out.drop_duplicates(subset=KEY_COLS, keep="last")
+
+    with span("storage.write"):
+        _stamped(out).to_parquet(ensure_dir(DB_PATH), index=False)
+    if not _publishes():
+        return
+    version = store_version()
+    for (sid, gid), part in df_new.groupby(["session_id", "game_id"], sort=False):
+        publish_play_changed(sid, gid, part["play_no"].tolist(), kind="import",
+                             fields=list(df_new.columns), version=version)
+
+def list_session_game(df: pd.DataFrame, session_id: str, game_id: str) -> pd.DataFrame:
+    if df.empty:
+        return df
+    sub = df[(df["session_id"] == session_id) & (df["game_id"] == game_id)].copy()
+    if sub.empty:
+        return sub
+    return sub.sort_values(["play_no", "ts"]).drop_duplicates(subset=["play_no"], keep="last")
+
+def get_play(df: pd.DataFrame, session_id: str, game_id: str, play_no: int) -> pd.DataFrame:
+    if df.empty:
+        return df
+    sub = df[
+        (df["session_id"] == session_id) &
+        (df["game_id"] == game_id) &
+        (df["play_no"] == play_no)
+    ]
+    return sub.tail(1)
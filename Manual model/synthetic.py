@@ -0,0 +1,334 @@
+import itertools
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config import (
+    CLOCK_BUCKETS, PERSONNEL, FORMATION, SHELL, PRESSURE, YARDS_BUCKETS, TURNOVER_RESULT,
+    TWO_PT_PRIOR, fg_in_range,
+)
+from analytics.prior_tables import on_swap
+from analytics.priors_model import (
+    OFFENSE_KEYS, call_prior_alpha, fourth_tri_prior, pressure_prior_alpha, timeout_prior_alpha,
+)
+from analytics.ep_model import ZONE_LADDER, next_state_from_result
+
+# Whole games are simulated in lockstep: one vectorized step per play number across
+# every game in the batch. Situations and calls come from the prior tables, results
+# from the small per-call model below, and the next situation from a table built by
+# running next_state_from_result once per (state, result) combination.
+PLAYS_PER_GAME = 150
+GAMES_PER_BATCH = 20_000
+SCRIPT_PLAYS = 15  # opening script: clock_bucket SCRIPT_START
+
+DOWNS = [1, 2, 3, 4]
+DISTS = ["SHORT", "MEDIUM", "LONG", "X_LONG"]
+ZONES = ZONE_LADDER  # own goal -> opponent goal
+QUARTERS = [1, 2, 3, 4]
+FOURTH = ["GO", "PUNT", "FIELD_GOAL"]
+CALLS = OFFENSE_KEYS + ["PUNT", "FIELD_GOAL"]
+PASS_CALLS = {"PASS_QUICK", "PASS_DROPBACK", "PLAY_ACTION", "SCREEN", "SHOT"}
+
+# P(yards bucket | call), over YARDS_BUCKETS = NA, NEG, 0-2, 3-6, 7-10, 11-20, 21+
+YARDS_BY_CALL = {
+    "RUN":           [0, .10, .30, .33, .15, .09, .03],
+    "PASS_QUICK":    [0, .05, .35, .25, .20, .12, .03],
+    "PASS_DROPBACK": [0, .08, .38, .14, .16, .16, .08],
+    "PLAY_ACTION":   [0, .07, .33, .12, .16, .20, .12],
+    "SCREEN":        [0, .12, .30, .28, .16, .10, .04],
+    "SHOT":          [0, .04, .55, .03, .05, .13, .20],
+    "SACK":          [0, 1, 0, 0, 0, 0, 0],
+    "PENALTY":       [1, 0, 0, 0, 0, 0, 0],
+    "PUNT":          [1, 0, 0, 0, 0, 0, 0],
+    "FIELD_GOAL":    [1, 0, 0, 0, 0, 0, 0],
+}
+# P(turnover | call) and the share of those returned for a score
+TURNOVER_RATE = {"RUN": .012, "PASS_QUICK": .015, "PASS_DROPBACK": .025, "PLAY_ACTION": .025,
+                 "SCREEN": .01, "SHOT": .05, "SACK": .03}
+RETURN_TD_SHARE = .07
+# Yards bucket index that always / sometimes moves the chains, per dist
+FD_SURE = {"SHORT": 3, "MEDIUM": 4, "LONG": 5, "X_LONG": 6}
+FD_MAYBE = {"SHORT": (2, .5), "MEDIUM": (3, .3), "LONG": (4, .3), "X_LONG": (5, .4)}
+# P(TD | zone, yards bucket index >= k)
+TD_BY_ZONE = {"LOW_RED": (3, .6), "HIGH_RED": (5, .7), "MIDFIELD": (6, .35), "OWN_SIDE": (6, .12), "BACKED_UP": (6, .05)}
+
+# -----------------------------
+# Tables (built from the priors; dropped when they reload)
+# -----------------------------
+def _clock_index(n_plays: int) -> np.ndarray:
+    # play t -> quarter, clock bucket by minutes left in its quarter
+    per_q = n_plays / 4.0
+    t = np.arange(n_plays)
+    mins = 15.0 * (1.0 - (t % per_q) / per_q)
+    edges = [(10, "15-10"), (7, "10-7"), (6, "7-6"), (5, "OTHER"), (3, "5-3"), (2, "3-2"), (-1, "2-0")]
+    lab = np.select([mins > e for e, _ in edges], [CLOCK_BUCKETS.index(b) for _, b in edges])
+    lab[:SCRIPT_PLAYS] = CLOCK_BUCKETS.index("SCRIPT_START")
+    return lab
+
+def _cdf(p: np.ndarray) -> np.ndarray:
+    p = np.asarray(p, dtype=float)
+    p = p / np.clip(p.sum(axis=-1, keepdims=True), 1e-12, None)
+    return np.cumsum(p, axis=-1)
+
+def _draw(cdf_rows: np.ndarray, rng) -> np.ndarray:
+    # one categorical draw per row of a (n, k) CDF
+    u = rng.random((cdf_rows.shape[0], 1))
+    return np.minimum((u > cdf_rows).sum(axis=1), cdf_rows.shape[1] - 1)
+
+class _Tables:
+    def __init__(self):
+        # offense call | league(CFB=0, NFL=1), down, dist, zone, clock, hurry, gtg
+        shape = (2, 4, 4, 5, len(CLOCK_BUCKETS), 2, 2)
+        self.call = np.zeros(shape + (len(OFFENSE_KEYS),))
+        for idx in itertools.product(*[range(s) for s in shape]):
+            lg, d, di, z, c, h, g = idx
+            a = call_prior_alpha(
+                down=DOWNS[d], dist_bucket=DISTS[di], field_zone=ZONES[z], clock_bucket=CLOCK_BUCKETS[c],
+                hurry_up=bool(h), league_mix_cfb=1.0 - lg, prior_strength=1.0, goal_to_go=bool(g),
+            )
+            self.call[idx] = [a[k] for k in OFFENSE_KEYS]
+        self.call = _cdf(self.call)
+
+        # 4th-down GO / PUNT / FIELD_GOAL | league, dist, zone
+        self.fourth = np.zeros((2, 4, 5, 3))
+        for lg, di, z in itertools.product(range(2), range(4), range(5)):
+            w = 1.0 - lg
+            p = fourth_tri_prior(DISTS[di], ZONES[z], league_mix_cfb=w, strength=1.0,
+                                 fg_in_range=fg_in_range(ZONES[z], w))
+            self.fourth[lg, di, z] = [p.get(k, 0.0) for k in FOURTH]
+        self.fourth = _cdf(self.fourth)
+
+        # P(5+ rushers | down, dist); P(timeout | quarter, clock, hurry)
+        self.p_press5 = np.zeros((4, 4))
+        for d, di in itertools.product(range(4), range(4)):
+            p = pressure_prior_alpha(DOWNS[d], DISTS[di], strength=1.0)
+            self.p_press5[d, di] = p["5+"] / sum(p.values())
+        self.p_timeout = np.zeros((4, len(CLOCK_BUCKETS), 2))
+        for q, c, h in itertools.product(range(4), range(len(CLOCK_BUCKETS)), range(2)):
+            t = timeout_prior_alpha(QUARTERS[q], CLOCK_BUCKETS[c], bool(h), strength=1.0)
+            self.p_timeout[q, c, h] = t["YES"] / (t["YES"] + t["NO"])
+
+        self.yards = _cdf([YARDS_BY_CALL[k] for k in CALLS])
+        self.p_turnover = np.array([TURNOVER_RATE.get(k, 0.0) for k in CALLS])
+        self.is_pass = np.array([k in PASS_CALLS for k in CALLS])
+
+        # next situation | zone, down, dist, gtg, first_down, yards bucket
+        shape = (5, 4, 4, 2, 2, len(YARDS_BUCKETS))
+        self.nxt_zone = np.zeros(shape, dtype=np.int8)
+        self.nxt_down = np.zeros(shape, dtype=np.int8)
+        self.nxt_dist = np.zeros(shape, dtype=np.int8)
+        self.nxt_gtg = np.zeros(shape, dtype=bool)
+        for idx in itertools.product(*[range(s) for s in shape]):
+            z, d, di, g, fd, yb = idx
+            s2 = next_state_from_result(
+                {"field_zone": ZONES[z], "down": DOWNS[d], "dist_bucket": DISTS[di], "clock_bucket": "OTHER", "goal_to_go": bool(g)},
+                {"first_down": bool(fd), "yards_bucket": YARDS_BUCKETS[yb], "td": False, "turnover": "NONE"},
+            )
+            self.nxt_zone[idx] = ZONES.index(s2["field_zone"])
+            self.nxt_down[idx] = DOWNS.index(int(s2["down"]))
+            self.nxt_dist[idx] = DISTS.index(s2["dist_bucket"])
+            self.nxt_gtg[idx] = bool(s2["goal_to_go"])
+
+_TABLES: Optional[_Tables] = None
+
+def tables() -> _Tables:
+    global _TABLES
+    if _TABLES is None:
+        _TABLES = _Tables()
+    return _TABLES
+
+@on_swap
+def _drop_tables(changed) -> None:
+    global _TABLES
+    _TABLES = None  # rebuilt from the new priors on next use
+
+# -----------------------------
+# Simulation
+# -----------------------------
+def _strings(values, idx: np.ndarray, null: Optional[np.ndarray] = None) -> pa.Array:
+    # dictionary-encode then decode: builds a plain string column without Python objects
+    arr = pa.DictionaryArray.from_arrays(pa.array(idx.astype(np.int32), mask=null), pa.array([str(v) for v in values]))
+    return arr.cast(pa.string())
+
+def simulate_batch(
+    n_games: int,
+    plays_per_game: int = PLAYS_PER_GAME,
+    league: str = "CFB",
+    season: int = 2025,
+    seed: int = 0,
+    game_offset: int = 0,
+    session_id: str = "synthetic",
+) -> pa.Table:
+    """
+    n_games full games as an event-store table (TagEvent columns + outcome + league).
+    """
+    T = tables()
+    rng = np.random.default_rng(seed)
+    G, P = int(n_games), int(plays_per_game)
+    lg = 0 if league.upper() == "CFB" else 1
+    clock_t = _clock_index(P)
+    quarter_t = np.minimum(np.arange(P) * 4 // P, 3)
+
+    # per-game state
+    pv_off = rng.random(G) < 0.5  # does PV have the ball
+    zone = np.full(G, ZONES.index("OWN_SIDE"), dtype=np.int8)
+    down = np.zeros(G, dtype=np.int8)
+    dist = np.full(G, DISTS.index("MEDIUM"), dtype=np.int8)
+    gtg = np.zeros(G, dtype=bool)
+
+    cols = {k: np.zeros((P, G), dtype=np.int8) for k in
+            ["zone", "down", "dist", "call", "yards", "turnover", "fourth", "pass_result", "two_pt"]}
+    flags = {k: np.zeros((P, G), dtype=bool) for k in ["pv_off", "gtg", "hurry", "first_down", "td", "press5", "timeout"]}
+
+    for t in range(P):
+        c, q = clock_t[t], quarter_t[t]
+        late = CLOCK_BUCKETS[c] in ("3-2", "2-0") and QUARTERS[q] in (2, 4)
+        hurry = rng.random(G) < (0.45 if late else 0.06)
+
+        # call: 4th down picks GO/PUNT/FG first; everything else samples the offense prior
+        call = _draw(T.call[lg, down, dist, zone, c, hurry.astype(int), gtg.astype(int)], rng)
+        fourth = np.full(G, -1, dtype=np.int8)
+        on4 = down == 3
+        if on4.any():
+            f = _draw(T.fourth[lg, dist[on4], zone[on4]], rng)
+            fourth[on4] = f
+            call[on4] = np.where(f == 1, CALLS.index("PUNT"), np.where(f == 2, CALLS.index("FIELD_GOAL"), call[on4]))
+
+        # result
+        yards = _draw(T.yards[call], rng)
+        is_pass = T.is_pass[call]
+        to = np.zeros(G, dtype=np.int8)
+        lost = rng.random(G) < T.p_turnover[call]
+        ret = rng.random(G) < RETURN_TD_SHARE
+        to[lost & is_pass] = np.where(ret[lost & is_pass], TURNOVER_RESULT.index("PICK6"), TURNOVER_RESULT.index("INT"))
+        to[lost & ~is_pass] = np.where(ret[lost & ~is_pass], TURNOVER_RESULT.index("SCOOP6"), TURNOVER_RESULT.index("FUMBLE"))
+
+        sure = np.array([FD_SURE[d] for d in DISTS])[dist]
+        maybe_k = np.array([FD_MAYBE[d][0] for d in DISTS])[dist]
+        maybe_p = np.array([FD_MAYBE[d][1] for d in DISTS])[dist]
+        fd = (yards >= sure) | ((yards == maybe_k) & (rng.random(G) < maybe_p))
+        td_k = np.array([TD_BY_ZONE[z][0] for z in ZONES])[zone]
+        td_p = np.array([TD_BY_ZONE[z][1] for z in ZONES])[zone]
+        td = (yards >= td_k) & (rng.random(G) < td_p)
+        special = (call == CALLS.index("PUNT")) | (call == CALLS.index("FIELD_GOAL"))
+        td &= (to == 0) & ~special
+        fd = (fd | td) & (to == 0) & ~special
+
+        pass_res = np.where(is_pass, np.where(yards >= 3, 1, np.where(rng.random(G) < 0.8, 2, 1)), 0)
+        two_pt = np.where(td, (rng.random(G) < TWO_PT_PRIOR["TWO"] / sum(TWO_PT_PRIOR.values())).astype(np.int8), -1)
+
+        # record the snap
+        for k, v in [("zone", zone), ("down", down), ("dist", dist), ("call", call), ("yards", yards),
+                     ("turnover", to), ("fourth", fourth), ("pass_result", pass_res), ("two_pt", two_pt)]:
+            cols[k][t] = v
+        flags["pv_off"][t], flags["gtg"][t], flags["hurry"][t] = pv_off, gtg, hurry
+        flags["first_down"][t], flags["td"][t] = fd, td
+        flags["press5"][t] = rng.random(G) < T.p_press5[down, dist]
+        flags["timeout"][t] = rng.random(G) < T.p_timeout[q, c, hurry.astype(int)]
+
+        # advance: same drive via the next_state_from_result table, else a new drive
+        key = (zone, down, dist, gtg.astype(int), fd.astype(int), yards)
+        zone2, down2, dist2, gtg2 = T.nxt_zone[key], T.nxt_down[key], T.nxt_dist[key], T.nxt_gtg[key]
+        failed_4th = (down == 3) & ~fd & ~special
+        flip_spot = (to == TURNOVER_RESULT.index("INT")) | (to == TURNOVER_RESULT.index("FUMBLE")) | failed_4th
+        kickoff = td | special | (to == TURNOVER_RESULT.index("PICK6")) | (to == TURNOVER_RESULT.index("SCOOP6"))
+        new_drive = flip_spot | kickoff
+
+        zone = np.where(flip_spot, len(ZONES) - 1 - zone, np.where(kickoff, ZONES.index("OWN_SIDE"), zone2)).astype(np.int8)
+        down = np.where(new_drive, 0, down2).astype(np.int8)
+        dist = np.where(new_drive, DISTS.index("MEDIUM"), dist2).astype(np.int8)
+        gtg = np.where(new_drive, False, gtg2 | ((down == 0) & (zone == ZONES.index("LOW_RED"))))
+        pv_off = np.where(new_drive, ~pv_off, pv_off)
+
+    # flatten game-major: row = game * P + play
+    flat = lambda a: a.T.reshape(-1)
+    n = G * P
+    game_no = np.repeat(np.arange(game_offset, game_offset + G), P)
+    opp = rng.integers(0, 40, G)
+    call_all = flat(cols["call"]).astype(np.int32)
+    fourth_all = flat(cols["fourth"])
+    two_all = flat(cols["two_pt"])
+    sample = lambda vals: rng.integers(1, len(vals), n)  # skip "UNK"
+
+    return pa.table({
+        "ts": pa.array(1_700_000_000.0 + game_no * 86_400.0 + np.tile(np.arange(P) * 30.0, G)),
+        "session_id": pa.array(np.full(n, session_id)),
+        "game_id": _strings([f"syn{g:07d}" for g in range(game_offset, game_offset + G)], np.repeat(np.arange(G), P)),
+        "play_no": pa.array(np.tile(np.arange(1, P + 1), G)),
+        "quarter": pa.array(np.tile(quarter_t + 1, G).astype(np.int64)),
+        "clock_bucket": _strings(CLOCK_BUCKETS, np.tile(clock_t, G)),
+        "hurry_up": pa.array(flat(flags["hurry"])),
+        "down": pa.array(flat(cols["down"]).astype(np.int64) + 1),
+        "dist_bucket": _strings(DISTS, flat(cols["dist"])),
+        "field_zone": _strings(ZONES, flat(cols["zone"])),
+        "goal_to_go": pa.array(flat(flags["gtg"])),
+        "pv_possession": _strings(["PV_DEF", "PV_OFF"], flat(flags["pv_off"]).astype(np.int8)),
+        "opponent": _strings([f"OPP{i:02d}" for i in range(40)], np.repeat(opp, P)),
+        "season": pa.array(np.full(n, int(season), dtype=np.int32)),
+        "opp_personnel": _strings(PERSONNEL, sample(PERSONNEL)),
+        "opp_formation": _strings(FORMATION, sample(FORMATION)),
+        "def_shell": _strings(SHELL, sample(SHELL)),
+        "pressure": _strings(PRESSURE, np.where(flat(flags["press5"]), PRESSURE.index("5+"), PRESSURE.index("4"))),
+        "call_type": _strings(CALLS, call_all),
+        "first_down": pa.array(flat(flags["first_down"])),
+        "td": pa.array(flat(flags["td"])),
+        "yards_bucket": _strings(YARDS_BUCKETS, flat(cols["yards"])),
+        "pass_result": _strings(["NA", "COMPLETE", "INCOMPLETE"], flat(cols["pass_result"])),
+        "turnover": _strings(TURNOVER_RESULT, flat(cols["turnover"])),
+        "fourth_decision": _strings(["GO", "NO_GO", "NO_GO"], np.maximum(fourth_all, 0), null=fourth_all < 0),
+        "two_pt_decision": _strings(["KICK", "TWO"], np.maximum(two_all, 0), null=two_all < 0),
+        "timeout_used": pa.array(flat(flags["timeout"])),
+        "outcome": _strings(CALLS, call_all),
+        "league": pa.array(np.full(n, league.upper())),
+    })
+
+def iter_synthetic_batches(
+    n_games: int,
+    plays_per_game: int = PLAYS_PER_GAME,
+    league: str = "CFB",
+    season: int = 2025,
+    seed: int = 0,
+    games_per_batch: int = GAMES_PER_BATCH,
+    session_id: str = "synthetic",
+) -> Iterator[pa.Table]:
+    """
+    Synthetic games in batches of games_per_batch (memory is bounded by one batch).
+    """
+    for i, start in enumerate(range(0, int(n_games), int(games_per_batch))):
+        g = min(int(games_per_batch), int(n_games) - start)
+        yield simulate_batch(g, plays_per_game, league, season, seed=seed + i, game_offset=start, session_id=session_id)
+
+def generate_games(n_games: int, **kw) -> pd.DataFrame:
+    """
+    In-memory frame of synthetic plays (see simulate_batch for keyword arguments).
+    """
+    return pa.concat_tables(list(iter_synthetic_batches(n_games, **kw))).to_pandas()
+
+def generate_plays(n_plays: int, plays_per_game: int = PLAYS_PER_GAME, **kw) -> pd.DataFrame:
+    """
+    Exactly n_plays synthetic plays (whole games, last one cut short).
+    """
+    n_games = -(-int(n_plays) // int(plays_per_game))
+    return generate_games(n_games, plays_per_game=plays_per_game, **kw).iloc[:int(n_plays)].reset_index(drop=True)
+
+def write_synthetic(path: Union[str, Path], n_games: int, **kw) -> int:
+    """
+    Stream synthetic games to one Parquet file in the event-store layout. Returns plays written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer, n = None, 0
+    try:
+        for table in iter_synthetic_batches(n_games, **kw):
+            if writer is None:
+                writer = pq.ParquetWriter(str(path), table.schema)
+            writer.write_table(table)
+            n += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return n
@@ -0,0 +1,99 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from model.features import ENCODER, FEATURE_COLS, FEATURE_VOCAB
+from model.linear import LinearModel
+from model.artifact import ArtifactError, current_version
+import model.predict as predict
+
+def random_situations(n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    cols = {c: rng.choice(np.array(FEATURE_VOCAB[c], dtype=object), n) for c in FEATURE_COLS}
+    return [{c: cols[c][i] for c in FEATURE_COLS} for i in range(n)]
+
+def _synthetic_model(n: int = 5000):
+    from sklearn.linear_model import LogisticRegression
+    rows = random_situations(n, seed=1)
+    df = pd.DataFrame(rows)
+    y = np.where(df["down"] >= 3, "PASS_DROPBACK", np.where(df["dist_bucket"] == "SHORT", "RUN", "PASS_QUICK"))
+    return LogisticRegression(max_iter=400).fit(ENCODER.transform(df), y)
+
+def _sklearn_twin(model: LinearModel):
+    """
+    sklearn estimator with the artifact's coefficients and link, so the sklearn
+    path is timed on the same model as the fast path.
+    """
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+    clf = SGDClassifier(loss="log_loss") if model.link == "ovr" else LogisticRegression()
+    clf.coef_ = np.ascontiguousarray(np.asarray(model.coef_t).T)
+    clf.intercept_ = np.array(model.intercept)
+    clf.classes_ = np.array(model.classes)
+    return clf
+
+def _per_call_us(fn, items) -> np.ndarray:
+    out = np.empty(len(items))
+    for i, it in enumerate(items):
+        t0 = time.perf_counter()
+        fn(it)
+        out[i] = (time.perf_counter() - t0) * 1e6
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-play latency: sklearn predict_proba vs NumPy fast path.")
+    ap.add_argument("--n", type=int, default=2000, help="plays to score")
+    ap.add_argument("--synthetic", action="store_true", help="use a throwaway model instead of the trained artifact")
+    args = ap.parse_args()
+
+    # sklearn reference: the old DataFrame -> encoder -> sklearn predict_proba path,
+    # always on the model being served so the speedup compares like with like
+    synthetic = args.synthetic or current_version() is None
+    if synthetic:
+        clf = _synthetic_model()
+        predict.REGISTRY.install(LinearModel.from_sklearn(clf))
+        print("model: synthetic LogisticRegression")
+    else:
+        try:
+            model = predict.load_model()
+        except ArtifactError as e:
+            raise SystemExit(str(e))
+        clf = _sklearn_twin(model)
+        print(f"model: artifact {model.manifest['model_version']} ({model.link})")
+
+    def sklearn_path(df):
+        probs = clf.predict_proba(ENCODER.transform(df))
+        return pd.DataFrame(probs, columns=[f"p_{c}" for c in clf.classes_])
+
+    plays = random_situations(args.n)
+    frames = [pd.DataFrame([p]) for p in plays]
+
+    # warm up + correctness (fast path vs the batch and sklearn paths on the same model)
+    for p, f in zip(plays[:50], frames[:50]):
+        fast = predict.predict_proba_fast(p)
+        batch = predict.predict_proba(f).iloc[0]
+        ref = sklearn_path(f).iloc[0]
+        err = max(max(abs(fast[c] - batch[f"p_{c}"]) for c in fast), max(abs(fast[c] - ref[f"p_{c}"]) for c in fast))
+        if err > 1e-9:
+            raise AssertionError(f"fast path disagrees with the reference by {err:.2e}")
+
+    slow_us = _per_call_us(sklearn_path, frames)
+    batch_us = _per_call_us(predict.predict_proba, frames)
+    fast_us = _per_call_us(predict.predict_proba_fast, plays)
+
+    for name, us in [
+        ("sklearn predict_proba (DataFrame)", slow_us),
+        ("predict_proba (DataFrame + NumPy)", batch_us),
+        ("predict_proba_fast (NumPy)", fast_us),
+    ]:
+        p50, p99 = np.percentile(us, [50, 99])
+        print(f"{name:38s} p50 {p50:9.1f} us   p99 {p99:9.1f} us")
+    print(f"speedup (p50): {np.median(slow_us) / np.median(fast_us):.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bench_suite import BENCH_DIR, run_meta, compare
+
+REPS = 7
+# Top-level packages that make a process "full stack"; reported per target
+HEAVY = ["pandas", "numpy", "pyarrow", "scipy", "sklearn", "joblib", "streamlit"]
+
+# name -> python argv (run from the repo root). Scripts exercise the cheap exits
+# (usage / --help), which should not pay for the stack they only need for real work.
+TARGETS = {
+    "python (baseline)": ["-c", "pass"],
+    "import config": ["-c", "import config"],
+    "import notify": ["-c", "import notify"],
+    "import tracing": ["-c", "import tracing"],
+    "import analytics.priors_model": ["-c", "import analytics.priors_model"],
+    "import storage": ["-c", "import storage"],
+    "import analytics.dashboard": ["-c", "import analytics.dashboard"],
+    "import model.predict": ["-c", "import model.predict"],
+    "import model.train": ["-c", "import model.train"],
+    "import service": ["-c", "import service"],
+    "tools/import_tags_csv.py (usage)": ["tools/import_tags_csv.py"],
+    "tools/import_historical.py (usage)": ["tools/import_historical.py"],
+    "tools/export_events.py --help": ["tools/export_events.py", "--help"],
+    "model.train --help": ["-m", "model.train", "--help"],
+}
+
+def _env() -> dict:
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PYTHONDONTWRITEBYTECODE="1")
+    env.pop("PV_TRACE", None)
+    return env
+
+def time_target(argv: list, reps: int) -> dict:
+    """
+    Wall time of `python argv` over reps fresh processes (after one warm-up for the OS file cache).
+    """
+    cmd = [sys.executable] + argv
+    times = []
+    for i in range(reps + 1):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if i:
+            times.append(time.perf_counter() - t0)
+    a = np.array(times)
+    return {"reps": reps, "p50_s": float(np.median(a)), "min_s": float(a.min())}
+
+def heavy_imports(argv: list) -> list:
+    # one -X importtime run: which heavy top-level packages the target pulled in
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + argv, cwd=ROOT, env=_env(),
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    names = {line.rsplit("|", 1)[-1].strip() for line in proc.stderr.splitlines() if line.startswith("import time:")}
+    return [m for m in HEAVY if m in names]
+
+def main():
+    ap = argparse.ArgumentParser(description="Time interpreter + import startup of modules and CLI entry points.")
+    ap.add_argument("--reps", type=int, default=REPS)
+    ap.add_argument("--only", nargs="*", help="run only targets whose name contains one of these")
+    ap.add_argument("--out", help=f"results JSON (default {BENCH_DIR}/startup-<commit>.json)")
+    ap.add_argument("--compare", help="earlier startup results JSON to print ratios against")
+    args = ap.parse_args()
+
+    meta = run_meta(["startup"])
+    results = []
+    for name, argv in TARGETS.items():
+        if args.only and not any(s in name for s in args.only):
+            continue
+        r = {"name": name, "scale": "startup", **time_target(argv, args.reps), "heavy": heavy_imports(argv)}
+        results.append(r)
+        print(f"{name:40s} p50 {r['p50_s'] * 1e3:8.1f} ms   min {r['min_s'] * 1e3:8.1f} ms   loads: {', '.join(r['heavy']) or '-'}")
+
+    out = {"meta": meta, "results": results}
+    commit = (meta["git_commit"] or "nogit")[:12]
+    path = Path(args.out) if args.out else BENCH_DIR / f"startup-{commit}{'-dirty' if meta['git_dirty'] else ''}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(out, indent=2), encoding="utf-8")
+    print(f"\nWrote {path}")
+
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config import ARTIFACTS_DIR
+import storage
+from synthetic import generate_plays
+from analytics.empirical import CountTrie, blended_probs_for_condition
+from analytics.priors_model import call_prior_alpha, posterior_mean
+from analytics.ep_model import epa_for_row
+from analytics.similarity import SimilarityIndex
+from model.features import ENCODER, featurize
+from model.linear import LinearModel
+import model.predict as predict
+
+BENCH_DIR = ARTIFACTS_DIR / "bench"
+SCALES = {"1k": 1_000, "100k": 100_000, "10M": 10_000_000}
+PLAYS_PER_GAME = 150
+# Stop repeating a case after this much wall time (or max reps), whichever first
+MIN_TIME_S = 0.5
+MAX_REPS = 50
+
+# -----------------------------
+# Data
+# -----------------------------
+def make_plays(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    n labeled plays in the event-store layout, PLAYS_PER_GAME per game, from the synthetic game simulator.
+    """
+    df = generate_plays(n, plays_per_game=PLAYS_PER_GAME, seed=seed, session_id="bench")
+    df["game_id"] = "g" + (np.arange(n) // PLAYS_PER_GAME).astype(str)
+    return df
+
+def _synthetic_model() -> LinearModel:
+    # fixed throwaway model so predict timings don't depend on what's been trained
+    from sklearn.linear_model import LogisticRegression
+    df = featurize(make_plays(5000, seed=1))
+    y = np.where(df["down"] >= 3, "PASS_DROPBACK", np.where(df["dist_bucket"] == "SHORT", "RUN", "PASS_QUICK"))
+    return LinearModel.from_sklearn(LogisticRegression(max_iter=400).fit(ENCODER.transform(df), y))
+
+# -----------------------------
+# Timing
+# -----------------------------
+def time_case(fn, setup=None, min_time: float = MIN_TIME_S, max_reps: int = MAX_REPS) -> dict:
+    """
+    Repeat fn() (after setup(), untimed) until min_time has elapsed or max_reps runs.
+    """
+    times = []
+    t_end = time.perf_counter() + min_time
+    while len(times) < max_reps and (not times or time.perf_counter() < t_end):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    a = np.array(times)
+    return {"reps": len(a), "p50_s": float(np.median(a)), "min_s": float(a.min()), "mean_s": float(a.mean())}
+
+def cases(n: int, workdir: Path):
+    """
+    (name, rows, fn, setup) for one scale. Data is built once per scale, outside the timings.
+    """
+    plays = make_plays(n)
+    db = workdir / f"events_{n}.parquet"
+    plays.to_parquet(db, index=False)
+    storage.DB_PATH = db  # point the store at the bench file, never the real one
+    base_bytes = db.read_bytes()
+
+    def reset_store():
+        db.write_bytes(base_bytes)
+
+    one = plays.iloc[[-1]].to_dict("records")[0]
+    one.update({"play_no": PLAYS_PER_GAME + 1, "ts": time.time()})
+    batch = make_plays(min(1000, n), seed=2).assign(session_id="bench_new")
+    game = plays[plays["game_id"] == "g0"].to_dict("records")
+    live = plays[plays["game_id"] == "g0"]
+    cond = {k: one[k] for k in ["pv_possession", "quarter", "clock_bucket", "hurry_up", "down", "dist_bucket",
+                                 "field_zone", "opp_personnel", "opp_formation", "def_shell", "pressure"]}
+    feats = featurize(plays)
+    hist = CountTrie.from_frame(plays)
+    sim = SimilarityIndex.from_frame(plays, "hist")
+
+    def prior_posterior():
+        alpha = call_prior_alpha(down=3, dist_bucket="MEDIUM", field_zone="MIDFIELD", clock_bucket="OTHER",
+                                 hurry_up=False, league_mix_cfb=0.5, prior_strength=1.0)
+        posterior_mean(alpha, {"RUN": 4, "PASS_QUICK": 6})
+
+    return [
+        ("upsert_event", n, lambda: storage.upsert_event(one), reset_store),
+        ("upsert_many", n, lambda: storage.upsert_many(batch), reset_store),
+        ("load_events", n, storage.load_events, None),
+        ("list_session_game", n, lambda: storage.list_session_game(plays, "bench", "g0"), None),
+        ("blended_probs_for_condition", n, lambda: blended_probs_for_condition(cond, plays, live), None),
+        ("blended_probs (prebuilt hist trie)", n, lambda: blended_probs_for_condition(cond, hist, live), None),
+        ("SimilarityIndex.from_frame", n, lambda: SimilarityIndex.from_frame(plays, "hist"), None),
+        ("comparable scenarios top-10", n, lambda: sim.query(cond, 10), None),
+        ("call_prior_alpha+posterior_mean", 1, prior_posterior, None),
+        ("epa_for_row (one game)", len(game), lambda: [epa_for_row(r, league_mix_cfb=0.5) for r in game], None),
+        ("featurize", n, lambda: featurize(plays), None),
+        ("predict_proba", n, lambda: predict.predict_proba(feats), None),
+    ]
+
+# -----------------------------
+# Results
+# -----------------------------
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def run_meta(scales) -> dict:
+    import pyarrow
+    return {
+        "git_commit": _git("rev-parse", "HEAD") or None,
+        "git_dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scales": list(scales),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "pyarrow": pyarrow.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+def compare(base: dict, new: dict) -> None:
+    old = {(r["name"], r["scale"]): r["p50_s"] for r in base["results"]}
+    print(f"\nvs {(base['meta'].get('git_commit') or '?')[:10]} (p50, >1 = slower now)")
+    for r in new["results"]:
+        b = old.get((r["name"], r["scale"]))
+        if b:
+            print(f"  {r['scale']:>5s}  {r['name']:34s} {r['p50_s'] / b:6.2f}x")
+
+def main():
+    ap = argparse.ArgumentParser(description="Time the storage / empirical / prior / EP / model hot paths.")
+    ap.add_argument("--scales", nargs="+", default=["1k", "100k"], choices=list(SCALES),
+                    help="play counts to run at (10M needs several GB of RAM)")
+    ap.add_argument("--only", nargs="*", help="run only cases whose name contains one of these")
+    ap.add_argument("--min-time", type=float, default=MIN_TIME_S, help="seconds to spend repeating each case")
+    ap.add_argument("--out", help=f"results JSON (default {BENCH_DIR}/<commit>.json)")
+    ap.add_argument("--compare", help="earlier results JSON to print ratios against")
+    args = ap.parse_args()
+
+    predict.REGISTRY.install(_synthetic_model())
+    meta = run_meta(args.scales)
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="pv_bench_") as tmp:
+        for scale in args.scales:
+            n = SCALES[scale]
+            for name, rows, fn, setup in cases(n, Path(tmp)):
+                if args.only and not any(s in name for s in args.only):
+                    continue
+                fn()  # warm up (imports, caches, first-touch of the file)
+                r = {"name": name, "scale": scale, "rows": int(rows), **time_case(fn, setup, min_time=args.min_time)}
+                results.append(r)
+                print(f"{scale:>5s}  {name:34s} p50 {r['p50_s'] * 1e3:10.3f} ms   min {r['min_s'] * 1e3:10.3f} ms   ({r['reps']} reps)")
+
+    out = {"meta": meta, "results": results}
+    path = Path(args.out) if args.out else BENCH_DIR / f"{(meta['git_commit'] or 'nogit')[:12]}{'-dirty' if meta['git_dirty'] else ''}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(out, indent=2), encoding="utf-8")
+    print(f"\nWrote {path}")
+
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), out)
+
+if __name__ == "__main__":
+    main()
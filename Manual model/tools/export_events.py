@@ -0,0 +1,39 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config import EXPORT_DIR, EXPORT_BATCH_ROWS
+
+def main():
+    ap = argparse.ArgumentParser(description="Stream tagged plays to Parquet / Arrow IPC / CSV, or re-import an export.")
+    ap.add_argument("out", nargs="?", help="output file (.parquet, .arrow/.feather, .csv); default data/exports/events-<time>.parquet")
+    ap.add_argument("--sessions", nargs="*", help="only these session_ids")
+    ap.add_argument("--games", nargs="*", help="only these game_ids")
+    ap.add_argument("--start", help="ts >= this (date/time or epoch seconds)")
+    ap.add_argument("--end", help="ts < this (date/time or epoch seconds)")
+    ap.add_argument("--batch-rows", type=int, default=EXPORT_BATCH_ROWS)
+    ap.add_argument("--import", dest="import_path", help="re-import an export file into the event store (upsert)")
+    args = ap.parse_args()
+
+    from export import export_events, read_export
+    from storage import upsert_many
+
+    if args.import_path:
+        df = read_export(args.import_path)
+        upsert_many(df)
+        print(f"Imported + upserted {len(df)} rows from {args.import_path}")
+        return
+
+    out = Path(args.out) if args.out else EXPORT_DIR / time.strftime("events-%Y%m%d-%H%M%S.parquet")
+    t0 = time.perf_counter()
+    n = export_events(
+        out, sessions=args.sessions, games=args.games, start=args.start, end=args.end, batch_rows=args.batch_rows,
+    )
+    print(f"Wrote {n} plays -> {out} ({time.perf_counter() - t0:.2f}s)")
+
+if __name__ == "__main__":
+    main()
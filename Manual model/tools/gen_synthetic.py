@@ -0,0 +1,39 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config import DATA_DIR, DB_PATH, LEAGUES
+from synthetic import PLAYS_PER_GAME, GAMES_PER_BATCH, write_synthetic, generate_games
+from storage import upsert_many
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate synthetic games from the config priors in the event-store layout.")
+    ap.add_argument("out", nargs="?", help="output Parquet (default data/synthetic/<league>-<games>g-seed<seed>.parquet)")
+    ap.add_argument("--games", type=int, default=1000)
+    ap.add_argument("--plays", type=int, default=PLAYS_PER_GAME, help="plays per game")
+    ap.add_argument("--league", default="CFB", choices=LEAGUES)
+    ap.add_argument("--season", type=int, default=2025)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--batch-games", type=int, default=GAMES_PER_BATCH)
+    ap.add_argument("--store", action="store_true", help=f"upsert into the live event store ({DB_PATH}) instead of a file")
+    args = ap.parse_args()
+
+    kw = dict(plays_per_game=args.plays, league=args.league, season=args.season, seed=args.seed)
+    t0 = time.perf_counter()
+    if args.store:
+        df = generate_games(args.games, games_per_batch=args.batch_games, **kw)
+        upsert_many(df)
+        print(f"Upserted {len(df)} synthetic plays into {DB_PATH} ({time.perf_counter() - t0:.2f}s)")
+        return
+
+    out = Path(args.out) if args.out else DATA_DIR / "synthetic" / f"{args.league.lower()}-{args.games}g-seed{args.seed}.parquet"
+    n = write_synthetic(out, args.games, games_per_batch=args.batch_games, **kw)
+    print(f"Wrote {n} plays -> {out} ({time.perf_counter() - t0:.2f}s)")
+    print("Load as history with: python tools/import_historical.py", out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config import LEAGUES
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python tools/import_historical.py path/to/plays.(parquet|csv) [LEAGUE SEASON] [--arrow]")
+        print("Without LEAGUE SEASON the file must have 'league' and 'season' columns.")
+        sys.exit(1)
+
+    src = Path(sys.argv[1])
+    if not src.exists():
+        print(f"File not found: {src}")
+        sys.exit(1)
+    args = [a for a in sys.argv[2:] if a != "--arrow"]
+    fmt = "ipc" if "--arrow" in sys.argv else "parquet"
+
+    import pandas as pd
+    from historical import write_historical
+
+    df = pd.read_csv(src) if src.suffix == ".csv" else pd.read_parquet(src)
+
+    if args:
+        if len(args) != 2:
+            raise ValueError("Pass both LEAGUE and SEASON, or neither")
+        df["league"], df["season"] = args[0].upper(), int(args[1])
+    for c in ("league", "season"):
+        if c not in df.columns:
+            raise ValueError(f"Missing required column: {c}")
+
+    df["league"] = df["league"].astype(str).str.upper()
+    unknown = sorted(set(df["league"]) - set(LEAGUES))
+    if unknown:
+        raise ValueError(f"Unknown league(s) {unknown}; expected one of {LEAGUES}")
+
+    for (league, season), part in df.groupby(["league", "season"], sort=True):
+        out = write_historical(part, league, int(season), fmt=fmt)
+        print(f"Wrote {len(part)} plays -> {out}")
+
+if __name__ == "__main__":
+    main()
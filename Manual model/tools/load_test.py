@@ -0,0 +1,226 @@
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import multiprocessing as mp
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config import ARTIFACTS_DIR, DB_PATH, CALL_TYPES
+import storage
+from storage import KEY_COLS
+from synthetic import generate_games
+
+LOAD_DIR = ARTIFACTS_DIR / "load"
+# Fields a station fills when it tags the pre-snap situation; the rest come with the label
+RESULT_FIELDS = ["call_type", "first_down", "td", "yards_bucket", "pass_result", "turnover",
+                 "fourth_decision", "two_pt_decision", "timeout_used", "outcome"]
+
+# -----------------------------
+# Scripts
+# -----------------------------
+def tagger_script(plays: pd.DataFrame, session_id: str, game_id: str, relabel_frac: float, seed: int) -> list:
+    """
+    (op, event) sequence for one station: submit play n, label play n, and now and
+    then relabel an earlier play with a different call.
+    """
+    rng = np.random.default_rng(seed)
+    rows = plays.assign(session_id=session_id, game_id=game_id).to_dict("records")
+    ops = []
+    for i, row in enumerate(rows):
+        tag = {k: (None if k in RESULT_FIELDS else v) for k, v in row.items()}
+        ops.append(("submit", tag))
+        ops.append(("label", dict(row)))
+        if i and rng.random() < relabel_frac:
+            old = dict(rows[int(rng.integers(0, i))])
+            old["call_type"] = str(rng.choice([c for c in CALL_TYPES if c != old["call_type"]]))
+            ops.append(("relabel", old))
+    return ops
+
+# -----------------------------
+# Taggers
+# -----------------------------
+def run_tagger(db: str, ops: list, rate: float, t_start: float, writer: int) -> dict:
+    """
+    Replay ops through storage.upsert_event at `rate` ops/s from wall time t_start.
+    Returns latencies and, per play, the ts of the last successful write (the
+    expected final row).
+    """
+    storage.DB_PATH = Path(db)
+    lat = {}
+    errors = []
+    last_ts = {}
+    while time.time() < t_start:
+        time.sleep(0.001)
+    t0 = time.perf_counter()
+    for n, (op, ev) in enumerate(ops):
+        due = t0 + n / rate if rate > 0 else 0.0
+        wait = due - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        ev = dict(ev, ts=time.time(), meta={"source": "load_test", "writer": writer, "seq": n})
+        s = time.perf_counter()
+        try:
+            storage.upsert_event(ev)
+        except Exception as e:
+            errors.append(f"{op}: {type(e).__name__}: {e}")
+            continue
+        lat.setdefault(op, []).append(time.perf_counter() - s)
+        last_ts[(ev["session_id"], ev["game_id"], int(ev["play_no"]))] = ev["ts"]
+    return {"lat": lat, "errors": errors, "last_ts": last_ts, "elapsed_s": time.perf_counter() - t0}
+
+def _process_main(q, *args) -> None:
+    try:
+        q.put(run_tagger(*args))
+    except Exception as e:  # surface a crashed worker instead of hanging the parent
+        q.put({"lat": {}, "errors": [f"worker: {type(e).__name__}: {e}"], "last_ts": {}, "elapsed_s": 0.0})
+
+def run_taggers(db: Path, scripts: list, rate: float, mode: str, burst: bool = False) -> list:
+    # stations are spread evenly over one op interval (burst: all start on the same instant)
+    t0 = time.time() + 0.5
+    n = len(scripts)
+    starts = [t0 if burst or rate <= 0 else t0 + i / (rate * n) for i in range(n)]
+    if mode == "thread":
+        out = [None] * n
+        def work(i):
+            out[i] = run_tagger(str(db), scripts[i], rate, starts[i], i)
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(len(scripts))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return out
+
+    q = mp.Queue()
+    procs = [mp.Process(target=_process_main, args=(q, str(db), s, rate, starts[i], i)) for i, s in enumerate(scripts)]
+    for p in procs:
+        p.start()
+    out = [q.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return out
+
+# -----------------------------
+# Report
+# -----------------------------
+def read_store(db: Path):
+    # interleaved whole-file rewrites can leave a torn file behind; that is a result, not a crash
+    try:
+        return pd.read_parquet(db), None
+    except (OSError, ValueError) as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def integrity(df, expected: dict) -> dict:
+    """
+    Compare the store with the last write each tagger believes succeeded, per KEY_COLS.
+    lost: play missing; stale: an older version of the play won; duplicated: key stored twice.
+    """
+    if df is None:
+        return {"plays": len(expected), "lost": len(expected), "stale": 0, "duplicated": 0, "examples": []}
+    df = df[df["meta"].map(lambda m: isinstance(m, dict) and m.get("source") == "load_test")]
+    dup = int(df.duplicated(subset=KEY_COLS).sum())
+    stored = {(s, g, int(p)): ts for s, g, p, ts in df[KEY_COLS + ["ts"]].itertuples(index=False, name=None)}
+    lost = [k for k in expected if k not in stored]
+    stale = [k for k, ts in expected.items() if k in stored and stored[k] != ts]
+    return {"plays": len(expected), "lost": len(lost), "stale": len(stale), "duplicated": dup,
+            "examples": [list(k) for k in (lost + stale)[:5]]}
+
+def latency_table(results: list) -> dict:
+    ops = sorted({op for r in results for op in r["lat"]})
+    out = {}
+    for op in ops + ["all"]:
+        a = np.array([x for r in results for k, xs in r["lat"].items() if op in ("all", k) for x in xs])
+        if a.size:
+            p50, p95, p99 = np.percentile(a, [50, 95, 99]) * 1e3
+            out[op] = {"n": int(a.size), "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+                       "max_ms": float(a.max() * 1e3)}
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="Concurrent tagging stations against the storage layer (on a copy of the store).")
+    ap.add_argument("--taggers", type=int, default=4, help="simulated stations")
+    ap.add_argument("--mode", choices=["thread", "process"], default="process")
+    ap.add_argument("--plays", type=int, default=40, help="plays each station tags (each = submit + label)")
+    ap.add_argument("--rate", type=float, default=2.0, help="ops per second per station (0 = as fast as possible)")
+    ap.add_argument("--relabel-frac", type=float, default=0.1, help="chance of relabeling an older play after each label")
+    ap.add_argument("--burst", action="store_true", help="start every station on the same instant instead of staggered")
+    ap.add_argument("--shared-game", action="store_true", help="all stations tag one game (disjoint play numbers)")
+    ap.add_argument("--seed-store", action="store_true", help=f"start from a copy of {DB_PATH} instead of an empty store")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help=f"results JSON (default {LOAD_DIR}/load-<time>.json)")
+    ap.add_argument("--fail-on-loss", action="store_true", help="exit 1 if any update was lost, stale or duplicated")
+    args = ap.parse_args()
+
+    games = generate_games(args.taggers, plays_per_game=args.plays, seed=args.seed)
+    scripts = []
+    for i, (_, plays) in enumerate(games.groupby("game_id", sort=True)):
+        plays = plays.drop(columns=["league"]).reset_index(drop=True)
+        if args.shared_game:
+            plays["play_no"] = plays["play_no"] * args.taggers + i  # interleaved, never colliding
+        gid = "shared" if args.shared_game else f"station{i}"
+        scripts.append(tagger_script(plays, "load_test", gid, args.relabel_frac, args.seed + i))
+
+    with tempfile.TemporaryDirectory(prefix="pv_load_") as tmp:
+        db = Path(tmp) / "events.parquet"
+        if args.seed_store and DB_PATH.exists():
+            shutil.copyfile(DB_PATH, db)
+        size0 = db.stat().st_size if db.exists() else 0
+        rows0 = len(pd.read_parquet(db)) if db.exists() else 0
+
+        t0 = time.perf_counter()
+        results = run_taggers(db, scripts, args.rate, args.mode, burst=args.burst)
+        wall = time.perf_counter() - t0 - 0.5
+
+        expected = {}
+        for r in results:
+            expected.update(r["last_ts"])
+        final, corrupt = read_store(db)
+        check = integrity(final, expected)
+        size1 = db.stat().st_size if db.exists() else 0
+        rows1 = len(final) if final is not None else 0
+
+    n_ops = sum(len(s) for s in scripts)
+    n_ok = sum(len(xs) for r in results for xs in r["lat"].values())
+    errors = [e for r in results for e in r["errors"]]
+    report = {
+        "config": vars(args),
+        "ops": n_ops,
+        "ok": n_ok,
+        "errors": len(errors),
+        "error_examples": errors[:5],
+        "wall_s": wall,
+        "throughput_ops_s": n_ok / wall if wall > 0 else None,
+        "latency": latency_table(results),
+        "integrity": check,
+        "store_unreadable": corrupt,
+        "file": {"bytes_start": size0, "bytes_end": size1, "rows_start": rows0, "rows_end": rows1,
+                 "bytes_per_row": size1 / rows1 if rows1 else None},
+    }
+
+    print(f"{args.taggers} {args.mode} taggers, {n_ops} ops in {wall:.1f}s -> {report['throughput_ops_s']:.1f} ops/s, {len(errors)} errors")
+    if errors:
+        print(f"  first error: {errors[0]}")
+    for op, s in report["latency"].items():
+        print(f"  {op:8s} n={s['n']:5d}  p50 {s['p50_ms']:8.1f} ms  p95 {s['p95_ms']:8.1f} ms  p99 {s['p99_ms']:8.1f} ms  max {s['max_ms']:8.1f} ms")
+    print(f"  integrity: {check['plays']} plays, lost {check['lost']}, stale {check['stale']}, duplicated {check['duplicated']}")
+    print(f"  file: {size0} -> {size1} bytes ({rows0} -> {rows1} rows)")
+    if corrupt:
+        print(f"  STORE UNREADABLE after the run: {corrupt}")
+
+    out = Path(args.out) if args.out else LOAD_DIR / time.strftime("load-%Y%m%d-%H%M%S.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    print(f"Wrote {out}")
+
+    if args.fail_on_loss and (corrupt or check["lost"] or check["stale"] or check["duplicated"]):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import gc
+import os
+import sys
+import json
+import time
+import ctypes
+import argparse
+import tempfile
+import tracemalloc
+import multiprocessing as mp
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config import ARTIFACTS_DIR, MEM_BUDGETS, MEM_BUDGET_BASE_MB
+import storage
+from synthetic import generate_plays
+from analytics.empirical import EMPIRICAL_COLS, CountTrie, blended_probs_for_condition
+from analytics.dashboard import prepare_live, compute_dashboard
+from analytics.rollups import build_rollups
+from analytics.similarity import SimilarityIndex
+from model.features import featurize
+
+MEM_DIR = ARTIFACTS_DIR / "mem"
+# Plays in the one "game" handed to the dashboard (its EPA table copies the game frame)
+DASH_PLAYS = 20_000
+MB = 1024 * 1024
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# -----------------------------
+# Cases
+# -----------------------------
+def cases(n: int, workdir: Path):
+    """
+    (name, input frame, fn) per operation. Inputs are built once, before any measurement.
+    """
+    plays = generate_plays(n, seed=0)
+    game = plays.iloc[:min(n, DASH_PLAYS)].assign(session_id="mem", game_id="g0")
+    game["play_no"] = range(1, len(game) + 1)
+    batch = generate_plays(min(n, 1000), seed=1).assign(session_id="mem_new")
+    db = workdir / "events.parquet"
+    plays.to_parquet(db, index=False)
+    cond = plays.iloc[-1][[c for c in EMPIRICAL_COLS if c != "outcome"]].to_dict()
+
+    def upsert():
+        storage.DB_PATH = db  # the copy under workdir, never the real store
+        storage.upsert_many(batch)
+
+    def load():
+        storage.DB_PATH = db
+        return storage.load_events()
+
+    return [
+        ("load_events", plays, load),
+        ("upsert_many", plays, upsert),
+        ("CountTrie.from_frame", plays, lambda: CountTrie.from_frame(plays)),
+        ("blended_probs_for_condition", plays, lambda: blended_probs_for_condition(cond, plays, game)),
+        ("SimilarityIndex.from_frame", plays, lambda: SimilarityIndex.from_frame(plays, "hist")),
+        ("featurize", plays, lambda: featurize(plays)),
+        ("build_rollups", plays, lambda: build_rollups(plays)),
+        ("prepare_live", game, lambda: prepare_live(game)),
+        ("compute_dashboard", game, lambda: compute_dashboard({"plays": game})),
+    ]
+
+# -----------------------------
+# Measurement (one forked child per case and mode)
+# -----------------------------
+def _rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * _PAGE
+
+def _peak_rss() -> int:
+    # VmHWM: the kernel resets it to the current RSS on fork, so in the child it is this case's peak
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    raise OSError("no VmHWM")
+
+def _release_free_memory() -> None:
+    # hand freed heap back to the OS so reused pages don't hide a new allocation
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+    try:
+        import pyarrow as pa
+        pa.default_memory_pool().release_unused()
+    except (ImportError, AttributeError):
+        pass
+
+def _measure(fn, mode: str, q) -> None:
+    try:
+        if mode == "rss":
+            rss0 = _rss()
+            t0 = time.perf_counter()
+            fn()
+            q.put({"peak_rss_bytes": max(0, _peak_rss() - rss0), "seconds": time.perf_counter() - t0})
+        else:
+            tracemalloc.start()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            blocks = sum(s.count for s in tracemalloc.take_snapshot().statistics("filename"))
+            tracemalloc.stop()
+            q.put({"peak_traced_bytes": peak, "retained_blocks": blocks})
+    except Exception as e:
+        q.put({"error": f"{type(e).__name__}: {e}"})
+
+def profile_case(fn) -> dict:
+    """
+    Peak RSS growth (no tracing) and tracemalloc peak / retained blocks (separate run,
+    since tracing inflates RSS) for one call of fn.
+    """
+    ctx = mp.get_context("fork")
+    out = {}
+    for mode in ("rss", "tracemalloc"):
+        _release_free_memory()
+        q = ctx.Queue()
+        p = ctx.Process(target=_measure, args=(fn, mode, q))
+        p.start()
+        out.update(q.get())
+        p.join()
+    return out
+
+def budget_bytes(name: str, input_bytes: int) -> int:
+    return int(MEM_BUDGETS[name] * input_bytes + MEM_BUDGET_BASE_MB * MB)
+
+# -----------------------------
+# Main
+# -----------------------------
+def main():
+    ap = argparse.ArgumentParser(description="Peak memory per big-frame operation on synthetic data, checked against MEM_BUDGETS.")
+    ap.add_argument("--plays", type=int, default=1_000_000, help="synthetic plays in the season-sized frame")
+    ap.add_argument("--only", nargs="*", help="run only cases whose name contains one of these")
+    ap.add_argument("--out", help=f"results JSON (default {MEM_DIR}/mem-<time>.json)")
+    ap.add_argument("--no-fail", action="store_true", help="report budget breaches without a nonzero exit")
+    args = ap.parse_args()
+
+    if not Path("/proc/self/status").exists():
+        sys.exit("mem_profile needs Linux /proc (peak RSS per forked case).")
+
+    results, breaches = [], []
+    with tempfile.TemporaryDirectory(prefix="pv_mem_") as tmp:
+        for name, frame, fn in cases(args.plays, Path(tmp)):
+            if args.only and not any(s in name for s in args.only):
+                continue
+            input_bytes = int(frame.memory_usage(deep=True).sum())
+            r = {"name": name, "rows": len(frame), "input_bytes": input_bytes, **profile_case(fn)}
+            if "error" not in r:
+                r["budget_bytes"] = budget_bytes(name, input_bytes)
+                r["x_input"] = r["peak_rss_bytes"] / input_bytes if input_bytes else None
+                r["ok"] = r["peak_rss_bytes"] <= r["budget_bytes"]
+                if not r["ok"]:
+                    breaches.append(name)
+            results.append(r)
+            if "error" in r:
+                print(f"{name:30s} ERROR {r['error']}")
+                continue
+            print(f"{name:30s} input {input_bytes / MB:8.1f} MB  peak RSS +{r['peak_rss_bytes'] / MB:8.1f} MB "
+                  f"({r['x_input']:.2f}x; budget {r['budget_bytes'] / MB:.1f} MB)  traced {r['peak_traced_bytes'] / MB:8.1f} MB  "
+                  f"retained blocks {r['retained_blocks']:7d}  {r['seconds']:.2f}s  {'ok' if r['ok'] else 'OVER BUDGET'}")
+
+    out = Path(args.out) if args.out else MEM_DIR / time.strftime("mem-%Y%m%d-%H%M%S.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"plays": args.plays, "results": results}, indent=2), encoding="utf-8")
+    print(f"\nWrote {out}")
+
+    if breaches:
+        print(f"Over budget: {', '.join(breaches)}")
+        if not args.no_fail:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import sys
+import argparse
+import tempfile
+import traceback
+from pathlib import Path
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import storage
+import historical
+import analytics.rollups as rollups
+from synthetic import generate_plays
+
+APP = ROOT / "app.py"
+
+# -----------------------------
+# Helpers
+# -----------------------------
+CHECKS = []
+
+def check(fn):
+    CHECKS.append(fn)
+    return fn
+
+def use_workdir(workdir: Path) -> None:
+    """
+    Point every store the checks touch at workdir, never the real data folder.
+    """
+    storage.DB_PATH = workdir / "events.parquet"
+    historical.HIST_DIR = workdir / "historical"
+    historical.HIST_PATH = workdir / "historical_events.parquet"
+    rollups.ROLLUP_PATH = workdir / "rollups.parquet"
+
+def run_app(session_id: str, game_id: str):
+    # deferred: only the app checks need streamlit
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(APP), default_timeout=120)
+    at.session_state["session_id"] = session_id
+    at.session_state["game_id"] = game_id
+    at.run()
+    assert not at.exception, f"app raised: {[e.value for e in at.exception]}"
+    return at
+
+# -----------------------------
+# Checks
+# -----------------------------
+@check
+def scouting_renders_with_empty_game(workdir: Path) -> None:
+    """
+    Other games have plays, the current one has none: the dashboard tab warns and
+    the scouting tab still renders its report.
+    """
+    generate_plays(300, plays_per_game=150, seed=0, session_id="s1").to_parquet(storage.DB_PATH, index=False)
+    at = run_app("s1", "no_plays_yet")
+    assert any("No plays yet" in w.value for w in at.warning), "dashboard tab did not warn about the empty game"
+    assert any("Season Scouting" in h.value for h in at.subheader), "scouting tab did not render"
+    assert at.selectbox(key="scout_opp").options, "scouting tab has no opponents to pick"
+
+@check
+def rollups_refresh_matches_full_build(workdir: Path) -> None:
+    """
+    After unstamped history, an import, a label, a new play and an out-of-band trim,
+    the incrementally refreshed table equals one built from scratch.
+    """
+    def same(step: str) -> None:
+        events = storage.load_events()
+        inc, full = rollups.refresh_rollups(events), rollups.build_rollups(events)
+        cols = [c for c in rollups.ROLLUP_COLS if c != "n"]
+        a, b = (t.sort_values(cols).reset_index(drop=True) for t in (inc, full))
+        pd.testing.assert_frame_equal(a, b, check_dtype=False, obj=f"rollups after {step}")
+
+    generate_plays(3000, plays_per_game=150, seed=0, session_id="s1").to_parquet(storage.DB_PATH, index=False)
+    same("unstamped history")
+    storage.upsert_many(generate_plays(300, plays_per_game=150, seed=1, session_id="s2"))
+    same("import")
+    events = storage.load_events()
+    row = events.iloc[5].to_dict()
+    row["call_type"] = "SHOT" if row.get("call_type") != "SHOT" else "RUN"
+    storage.upsert_event(row)
+    same("label")
+    row = events.iloc[7].to_dict()
+    row["play_no"] = int(events["play_no"].max()) + 1
+    storage.upsert_event(row)
+    same("new play")
+    storage.load_events().iloc[:-200].to_parquet(storage.DB_PATH, index=False)
+    same("trim")
+
+@check
+def labeled_tag_is_comparable(workdir: Path) -> None:
+    """
+    A play tagged and labeled in the app (call_type set, no outcome column) is a live
+    comparable for its own situation, alone in the store and next to imported plays.
+    """
+    from schemas import TagEvent, now_ts
+    from analytics.similarity import SimilarityIndex, comparable_scenarios
+    from model.features import FEATURE_COLS
+
+    tag = TagEvent(
+        ts=now_ts(), session_id="s1", game_id="g1", play_no=1, quarter=4, clock_bucket="2-0",
+        hurry_up=True, down=4, dist_bucket="X_LONG", field_zone="BACKED_UP", goal_to_go=False,
+        pv_possession="PV_OFF", opp_personnel="22", opp_formation="empty", def_shell="0", pressure="5+",
+        meta={"source": "regression_checks"},
+    ).to_dict()
+    storage.upsert_event(tag)
+    storage.upsert_event(dict(tag, ts=now_ts(), call_type="SCREEN"))
+
+    cond = {c: tag[c] for c in FEATURE_COLS}
+    for step in ("tagged only", "with imported plays"):
+        comps = comparable_scenarios(cond, [SimilarityIndex.from_frame(storage.load_events(), "live")], k=5)
+        hit = comps[(comps["source"] == "live") & (comps["session_id"] == "s1") & (comps["play_no"] == 1)]
+        assert len(hit) == 1, f"{step}: labeled tag missing from comparables"
+        assert hit["distance"].iloc[0] == 0 and hit["outcome"].iloc[0] == "SCREEN", f"{step}: {hit.to_dict('records')}"
+        storage.upsert_many(generate_plays(300, plays_per_game=150, seed=2, session_id="s2"))
+
+# -----------------------------
+# Main
+# -----------------------------
+def main():
+    ap = argparse.ArgumentParser(description="Behavioral regression checks, each on a throwaway data folder.")
+    ap.add_argument("--only", nargs="*", help="run checks whose name contains any of these")
+    args = ap.parse_args()
+
+    failed = []
+    for fn in CHECKS:
+        if args.only and not any(s in fn.__name__ for s in args.only):
+            continue
+        with tempfile.TemporaryDirectory() as tmp:
+            use_workdir(Path(tmp))
+            try:
+                fn(Path(tmp))
+            except Exception:
+                failed.append(fn.__name__)
+                print(f"FAIL {fn.__name__}")
+                traceback.print_exc()
+                continue
+        print(f"ok   {fn.__name__}")
+
+    if failed:
+        print(f"\n{len(failed)} failed: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
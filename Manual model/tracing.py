@@ -0,0 +1,204 @@
+import atexit
+import bisect
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import TRACE_ENV, TRACE_DIR, TRACE_FLUSH_S
+
+# Stage spans for the tag -> recommendation path. Off unless PV_TRACE=1: span() then
+# hands back one shared no-op context manager, so instrumented code pays a call and
+# a flag check. When on, each stage feeds a log-bucket histogram (~9% wide buckets
+# from 10 us to ~40 s) that p50/p95/p99 are read from; every TRACE_FLUSH_S and at
+# exit the process writes TRACE_DIR/<role>.json and <role>.prom (Prometheus text).
+BOUNDS_S = [1e-5 * 2 ** (i / 8) for i in range(0, 177)]
+QUANTILES = (0.5, 0.95, 0.99)
+# Prometheus buckets: every 8th bound (powers of two), so the text stays small
+PROM_EVERY = 8
+
+_enabled = os.environ.get(TRACE_ENV, "").strip().lower() not in ("", "0", "false", "no")
+_lock = threading.Lock()
+_hists: Dict[str, "Histogram"] = {}
+_last_flush = time.monotonic()
+_role = (Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "") or "python"
+
+# -----------------------------
+# Histogram
+# -----------------------------
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BOUNDS_S) + 1)  # last bucket: above the top bound
+        self.count = 0
+        self.sum_s = 0.0
+        self.max_s = 0.0
+
+    def observe(self, s: float) -> None:
+        self.counts[bisect.bisect_left(BOUNDS_S, s)] += 1
+        self.count += 1
+        self.sum_s += s
+        if s > self.max_s:
+            self.max_s = s
+
+    def quantile(self, q: float) -> float:
+        # interpolate inside the bucket holding the q-th observation
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = BOUNDS_S[i - 1] if i > 0 else 0.0
+                hi = BOUNDS_S[i] if i < len(BOUNDS_S) else self.max_s
+                return min(lo + (hi - lo) * (rank - seen) / c, self.max_s)
+            seen += c
+        return self.max_s
+
+    def summary(self) -> Dict[str, float]:
+        out = {"count": self.count, "sum_s": self.sum_s, "max_s": self.max_s}
+        for q in QUANTILES:
+            out[f"p{int(q * 100)}_s"] = self.quantile(q)
+        return out
+
+# -----------------------------
+# Spans
+# -----------------------------
+class _Noop:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP = _Noop()
+
+class _Span:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.t0)
+        return False
+
+def enabled() -> bool:
+    return _enabled
+
+def enable(on: bool = True, role: Optional[str] = None) -> None:
+    """
+    Turn tracing on/off at runtime (tools, benchmarks); role names the metrics files.
+    """
+    global _enabled, _role
+    _enabled = bool(on)
+    if role:
+        _role = str(role)
+
+def span(name: str):
+    """
+    with span("storage.read"): ...  -- times the block into the `name` histogram.
+    """
+    return _Span(name) if _enabled else _NOOP
+
+def traced(name: str):
+    """
+    Decorator form of span() for whole functions.
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def record(name: str, seconds: float) -> None:
+    global _last_flush
+    with _lock:
+        h = _hists.get(name)
+        if h is None:
+            h = _hists[name] = Histogram()
+        h.observe(seconds)
+        due = time.monotonic() - _last_flush >= TRACE_FLUSH_S
+        if due:
+            _last_flush = time.monotonic()
+    if due:
+        flush()
+
+def reset() -> None:
+    with _lock:
+        _hists.clear()
+
+# -----------------------------
+# Export
+# -----------------------------
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """
+    {stage: {count, sum_s, max_s, p50_s, p95_s, p99_s}}, sorted by stage name.
+    """
+    with _lock:
+        return {name: _hists[name].summary() for name in sorted(_hists)}
+
+def prometheus_text() -> str:
+    """
+    Histograms in the Prometheus text exposition format (plus p50/p95/p99 gauges).
+    """
+    with _lock:
+        hists = {name: (list(h.counts), h.count, h.sum_s, h.summary()) for name, h in sorted(_hists.items())}
+    lines = [
+        "# HELP pv_stage_seconds Latency of one pipeline stage.",
+        "# TYPE pv_stage_seconds histogram",
+    ]
+    for name, (counts, n, total, _) in hists.items():
+        cum = 0
+        for i, b in enumerate(BOUNDS_S):
+            cum += counts[i]
+            if i % PROM_EVERY == 0:
+                lines.append(f'pv_stage_seconds_bucket{{stage="{name}",le="{b:.6g}"}} {cum}')
+        lines.append(f'pv_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {n}')
+        lines.append(f'pv_stage_seconds_sum{{stage="{name}"}} {total:.9g}')
+        lines.append(f'pv_stage_seconds_count{{stage="{name}"}} {n}')
+    lines += [
+        "# HELP pv_stage_quantile_seconds Estimated latency quantiles per stage.",
+        "# TYPE pv_stage_quantile_seconds gauge",
+    ]
+    for name, (_, _, _, s) in hists.items():
+        for q in QUANTILES:
+            lines.append(f'pv_stage_quantile_seconds{{stage="{name}",quantile="{q}"}} {s[f"p{int(q * 100)}_s"]:.9g}')
+    return "\n".join(lines) + "\n"
+
+def _write(path: Path, text: str) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+def flush(directory: Optional[Path] = None) -> Optional[Path]:
+    """
+    Write <role>.json and <role>.prom under TRACE_DIR. Returns the JSON path (None if nothing recorded).
+    """
+    stages = snapshot()
+    if not stages:
+        return None
+    directory = Path(directory) if directory is not None else TRACE_DIR
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        out = directory / f"{_role}.json"
+        _write(out, json.dumps({"role": _role, "pid": os.getpid(), "ts": time.time(), "stages": stages}, indent=2))
+        _write(directory / f"{_role}.prom", prometheus_text())
+    except OSError:
+        return None  # metrics never break the app
+    return out
+
+atexit.register(lambda: _enabled and flush())